@@ -0,0 +1,164 @@
+# ----- generic imports ---------------------------------------------------------
+import time
+
+# ----- Django imports --------------------------------------------------------
+from django.db import transaction
+
+# ----- Core imports ----------------------------------------------------------
+from .enums import ChangeModelStatus
+from .models import (
+    Membership,
+    MemberChange,
+    MembershipChange,
+    ArchivedMembership,
+    ArchivedMemberChange,
+    ArchivedMembershipChange,
+)
+
+PROCESSED_STATUSES = [ChangeModelStatus.APPROVED.value, ChangeModelStatus.DECLINED.value]
+
+
+# ---- Archive ----------------------------------------------------------------
+# Every batch is copied to the archive tables and deleted from the live ones in
+# its own short transaction, so the live tables are never locked for long and an
+# interrupted run loses nothing: the next one goes on from where it stopped.
+def _archive_change_fields(change):
+    return dict(
+        original_id=change.pk,
+        applicant_id=change.applicant_id,
+        responder_id=change.responder_id,
+        status=change.status,
+        created_at=change.created_at,
+    )
+
+
+def _archive_membership_changes(membership_changes):
+    ArchivedMembershipChange.objects.bulk_create(
+        [
+            ArchivedMembershipChange(
+                membership_original_id=membership_change.membership_id,
+                member_change_original_id=membership_change.member_id,
+                club_id=membership_change.club_id,
+                license_no=membership_change.license_no,
+                transfer_date=membership_change.transfer_date,
+                **_archive_change_fields(membership_change),
+            )
+            for membership_change in membership_changes
+        ]
+    )
+    MembershipChange.objects.filter(
+        pk__in=[membership_change.pk for membership_change in membership_changes]
+    ).delete_in_bulk()
+
+
+def archive_member_changes(before, batch_size):
+    """Archive a batch of processed member changes, with their membership change."""
+    with transaction.atomic():
+        member_changes = list(
+            MemberChange.objects.filter(status__in=PROCESSED_STATUSES, created_at__lt=before)
+            .exclude(membership_change__status=ChangeModelStatus.PENDING.value)
+            .order_by("pk")[:batch_size]
+        )
+        if not member_changes:
+            return 0
+
+        member_change_ids = [member_change.pk for member_change in member_changes]
+
+        # the membership changes go first, they reference the member changes
+        membership_changes = list(MembershipChange.objects.filter(member_id__in=member_change_ids))
+        if membership_changes:
+            _archive_membership_changes(membership_changes)
+
+        ArchivedMemberChange.objects.bulk_create(
+            [
+                ArchivedMemberChange(
+                    member_id=member_change.member_id,
+                    changes=member_change.changes,
+                    photo=member_change.photo.name or None,
+                    **_archive_change_fields(member_change),
+                )
+                for member_change in member_changes
+            ]
+        )
+        MemberChange.objects.filter(pk__in=member_change_ids).delete_in_bulk()
+
+    return len(member_changes)
+
+
+def archive_membership_changes(before, batch_size):
+    """Archive a batch of processed membership changes not linked to a member change."""
+    with transaction.atomic():
+        membership_changes = list(
+            MembershipChange.objects.filter(
+                status__in=PROCESSED_STATUSES, created_at__lt=before, member__isnull=True
+            ).order_by("pk")[:batch_size]
+        )
+        if membership_changes:
+            _archive_membership_changes(membership_changes)
+
+    return len(membership_changes)
+
+
+def archive_memberships(before, batch_size):
+    """Archive a batch of memberships closed before the date."""
+    with transaction.atomic():
+        memberships = list(
+            Membership.objects.filter(
+                transfer_date__isnull=False,
+                transfer_date__lt=before.date(),
+                # still referenced by a change waiting for a review
+                membership_changes__isnull=True,
+            ).order_by("pk")[:batch_size]
+        )
+        if not memberships:
+            return 0
+
+        ArchivedMembership.objects.bulk_create(
+            [
+                ArchivedMembership(
+                    original_id=membership.pk,
+                    member_id=membership.member_id,
+                    club_id=membership.club_id,
+                    license_no=membership.license_no,
+                    transfer_date=membership.transfer_date,
+                )
+                for membership in memberships
+            ]
+        )
+        Membership.objects.filter(
+            pk__in=[membership.pk for membership in memberships]
+        ).delete_in_bulk()
+
+    return len(memberships)
+
+
+ARCHIVE_STEPS = (
+    ("member changes", archive_member_changes),
+    ("membership changes", archive_membership_changes),
+    ("memberships", archive_memberships),
+)
+
+
+def archive_history(before, batch_size=500, max_batches=None, pause=0):
+    """Archive everything closed before the datetime, return the archived rows by step.
+
+    `max_batches` bounds the batches of every step, `pause` is the time slept
+    between two batches, to leave room to the requests.
+    """
+    archived = {}
+
+    for name, archive_batch in ARCHIVE_STEPS:
+        archived[name] = 0
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            rows = archive_batch(before, batch_size)
+            archived[name] += rows
+            batches += 1
+
+            if rows < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+    return archived
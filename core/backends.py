@@ -0,0 +1,44 @@
+# ----- Django imports --------------------------------------------------------
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+# ----- Core imports ----------------------------------------------------------
+from .constants import USER_CACHE_KEY, USER_CACHE_TIMEOUT
+
+
+# ---- Authentication -----------------------------------------------------------
+class CachedModelBackend(ModelBackend):
+    """ModelBackend loading the user of each request from the cache.
+
+    The user is cached with its groups, so that the admin checks of the views
+    don't query them either. The signals drop the cached user when the user or
+    its groups change, the password included. The router reads them from the
+    primary, a lagging replica would cache revoked groups.
+    """
+
+    def get_user(self, user_id):
+        key = USER_CACHE_KEY.format(user_id)
+        user = cache.get(key)
+
+        if user is None:
+            user = (
+                get_user_model()
+                ._default_manager.prefetch_related("groups")
+                .filter(pk=user_id)
+                .first()
+            )
+            if user is None:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+
+        return user if self.user_can_authenticate(user) else None
+
+
+def invalidate_cached_users(*user_ids):
+    keys = [USER_CACHE_KEY.format(user_id) for user_id in user_ids if user_id is not None]
+    if keys:
+        cache.delete_many(keys)
+        # a request may cache the user again before the change is committed
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,30 @@
+# ----- generic imports ---------------------------------------------------------
+import math
+import statistics
+
+
+# ---- Statistics ---------------------------------------------------------------
+def percentile(values, percent):
+    """Return the nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize_latencies(latencies, elapsed):
+    """Summarize the latencies (seconds) of requests run in `elapsed` seconds.
+
+    The latencies are returned in milliseconds.
+    """
+    if not latencies:
+        return {"requests": 0, "throughput": 0.0}
+
+    return {
+        "requests": len(latencies),
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "mean": statistics.fmean(latencies) * 1000,
+        "p50": percentile(latencies, 50) * 1000,
+        "p90": percentile(latencies, 90) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "max": max(latencies) * 1000,
+    }
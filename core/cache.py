@@ -0,0 +1,83 @@
+# ----- Django imports --------------------------------------------------------
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+# ----- Core imports ----------------------------------------------------------
+from .constants import (
+    SHELL_CACHE_TIMEOUT,
+    SHELL_VERSION_CACHE_KEY,
+    SHELL_USER_CACHE_KEY,
+)
+from .utils import get_user_club
+from .versions import get_versions, bump_versions
+
+# ---- Roles ------------------------------------------------------------------
+ANONYMOUS_ROLE = "anonymous"
+NO_ROLE = "none"
+
+# the permissions checked by the header and sidebar through `perms.core.*`
+SHELL_ROLE_PERMISSIONS = (
+    ("fstb_admin", "core.fstb_admin_permissions"),
+    ("club_admin", "core.club_admin_permissions"),
+)
+
+
+# ---- Shell fragments ----------------------------------------------------------
+def get_shell_version():
+    return get_versions([SHELL_VERSION_CACHE_KEY])[0]
+
+
+def bump_shell_version():
+    """Invalidate every cached header, sidebar and card fragment."""
+    bump_versions([SHELL_VERSION_CACHE_KEY])
+
+
+def get_user_role(user):
+    roles = [role for role, perm in SHELL_ROLE_PERMISSIONS if user.has_perm(perm)]
+    return "+".join(roles) if roles else NO_ROLE
+
+
+def build_user_shell(user):
+    # cached longer than a replica lags, read from the primary as the versions
+    club = get_user_club(user, using=DEFAULT_DB_ALIAS)
+
+    return {
+        "role": get_user_role(user),
+        "club_id": club.pk if club else None,
+    }
+
+
+def get_user_shell(user):
+    """Return the values keying the cached page fragments of the given user.
+
+    The role and club are cached per user, so that a cache hit on the header,
+    the sidebar and the cards costs a single `get_many` and no query.
+    """
+    if not user or not user.is_authenticated:
+        return {
+            "role": ANONYMOUS_ROLE,
+            "club_id": None,
+            "version": get_shell_version(),
+            "timeout": SHELL_CACHE_TIMEOUT,
+        }
+
+    user_key = SHELL_USER_CACHE_KEY.format(user.pk)
+    cached = cache.get_many([SHELL_VERSION_CACHE_KEY, user_key])
+
+    version = cached.get(SHELL_VERSION_CACHE_KEY)
+    if version is None:
+        version = get_shell_version()
+
+    shell = cached.get(user_key)
+    if shell is None:
+        shell = build_user_shell(user)
+        cache.set(user_key, shell, SHELL_CACHE_TIMEOUT)
+
+    return {**shell, "version": version, "timeout": SHELL_CACHE_TIMEOUT}
+
+
+def invalidate_user_shell(*user_ids):
+    """Forget the cached role and club of the given users."""
+    cache.delete_many(
+        [SHELL_USER_CACHE_KEY.format(user_id) for user_id in user_ids if user_id]
+    )
@@ -0,0 +1,172 @@
+# ----- Django imports --------------------------------------------------------
+from django.apps import apps
+from django.core.files import File
+from django.db.models.fields.files import FieldFile
+
+
+# ---- Member changes ---------------------------------------------------------
+# A MemberChange stores only what the applicant changed: the new value of the
+# scalar fields and the added and removed ids of the many-to-many fields, e.g.
+#   {"name": "Jane", "roles": {"added": [2], "removed": [1]}}
+# A new photo is kept on the change itself, the diff only records that the
+# photo changed.
+MEMBER_CHANGE_FIELDS = (
+    "name",
+    "surname",
+    "house_number",
+    "street",
+    "city",
+    "zip_code",
+    "date_of_birth",
+    "nationality",
+    "affiliation_year",
+)
+MEMBER_CHANGE_M2M_FIELDS = ("roles", "exams", "js")
+PHOTO_FIELD = "photo"
+ADDED = "added"
+REMOVED = "removed"
+
+
+def _get_member_model():
+    return apps.get_model("core", "Member")
+
+
+def _to_python(name, value):
+    return _get_member_model()._meta.get_field(name).to_python(value)
+
+
+def _get_related_ids(member, name):
+    if member is None:
+        return set()
+    return set(getattr(member, name).values_list("pk", flat=True))
+
+
+def _is_new_photo(member, photo):
+    if isinstance(photo, File) and not isinstance(photo, FieldFile):
+        return True  # an uploaded file
+
+    current = member.photo.name if member is not None and member.photo else ""
+    return (photo.name if photo else "") != current
+
+
+def get_member_diff(member, values):
+    """Return the changes turning the member into the values, all of them for a new member."""
+    changes = {}
+
+    for name in MEMBER_CHANGE_FIELDS:
+        value = _to_python(name, values[name])
+        if member is None or value != _to_python(name, getattr(member, name)):
+            changes[name] = value
+
+    for name in MEMBER_CHANGE_M2M_FIELDS:
+        ids = {obj.pk for obj in values[name]}
+        current_ids = _get_related_ids(member, name)
+        if ids != current_ids:
+            changes[name] = {
+                ADDED: sorted(ids - current_ids),
+                REMOVED: sorted(current_ids - ids),
+            }
+
+    return changes
+
+
+def record_member_change(member, values, applicant):
+    """Save the changes of the values (cleaned data of a member form) as a MemberChange.
+
+    `member` is None when the change creates a new member.
+    """
+    member_change_model = apps.get_model("core", "MemberChange")
+
+    member_change = member_change_model(
+        member=member,
+        applicant=applicant,
+        changes=get_member_diff(member, values),
+    )
+
+    photo = values.get(PHOTO_FIELD)
+    if _is_new_photo(member, photo):
+        member_change.changes[PHOTO_FIELD] = photo.name if photo else ""
+        member_change.photo = photo or None
+
+    member_change.save()
+    return member_change
+
+
+def apply_member_change(member, member_change):
+    """Write only the changed fields of the change, on a new member if `member` is None."""
+    changes = member_change.changes
+
+    if member is None:
+        member = _get_member_model()()
+
+    update_fields = [name for name in MEMBER_CHANGE_FIELDS if name in changes]
+    for name in update_fields:
+        setattr(member, name, _to_python(name, changes[name]))
+
+    if PHOTO_FIELD in changes:
+        member.photo = member_change.photo.name or None
+        update_fields.append(PHOTO_FIELD)
+
+    if member.pk is None:
+        member.save()
+    elif update_fields:
+        member.save(update_fields=update_fields)
+
+    for name in MEMBER_CHANGE_M2M_FIELDS:
+        if name in changes:
+            related = getattr(member, name)
+            related.remove(*changes[name][REMOVED])
+            related.add(*changes[name][ADDED])
+
+    return member
+
+
+# ---- Review -----------------------------------------------------------------
+def get_changed_field_labels(changes):
+    member_model = _get_member_model()
+    names = MEMBER_CHANGE_FIELDS + MEMBER_CHANGE_M2M_FIELDS + (PHOTO_FIELD,)
+
+    return [member_model._meta.get_field(name).verbose_name for name in names if name in changes]
+
+
+def get_member_change_rows(member_change):
+    """Return a row for every field of the change, with the current and the new value."""
+    member_model = _get_member_model()
+    member = member_change.member
+    changes = member_change.changes
+    rows = []
+
+    for name in MEMBER_CHANGE_FIELDS:
+        if name in changes:
+            rows.append(
+                {
+                    "label": member_model._meta.get_field(name).verbose_name,
+                    "current": getattr(member, name) if member else None,
+                    "new": _to_python(name, changes[name]),
+                }
+            )
+
+    for name in MEMBER_CHANGE_M2M_FIELDS:
+        if name in changes:
+            field = member_model._meta.get_field(name)
+            related = field.related_model.objects.in_bulk(
+                changes[name][ADDED] + changes[name][REMOVED]
+            )
+            rows.append(
+                {
+                    "label": field.verbose_name,
+                    "added": [related[pk] for pk in changes[name][ADDED] if pk in related],
+                    "removed": [related[pk] for pk in changes[name][REMOVED] if pk in related],
+                }
+            )
+
+    if PHOTO_FIELD in changes:
+        rows.append(
+            {
+                "label": member_model._meta.get_field(PHOTO_FIELD).verbose_name,
+                "current_photo": member.photo if member else None,
+                "new_photo": member_change.photo,
+            }
+        )
+
+    return rows
@@ -8,6 +8,7 @@ SHOW_MESSAGE = "showMessage"
 ADDED_MESSAGE = _("{model} added")
 UPDATED_MESSAGE = _("{model} updated")
 DELETED_MESSAGE = _("{model} deleted")
+RESTORED_MESSAGE = _("{model} restored")
 
 APPROVED_MESSAGE = _("{model} approved")
 DECLINED_MESSAGE = _("{model} declined")
@@ -19,3 +20,24 @@ TABLE_ITEM_REMOVE_URL = "remove_{}"
 TABLE_ITEM_ADD_URL = "add_{}"
 
 ADD_EDIT_TEMPLATE = "datatable/{}_create_form.html"
+
+ROW_ID = "object_{}"
+ROW_CHANGED_EVENT = "rowChanged"
+ROW_ADDED = "added"
+ROW_UPDATED = "updated"
+ROW_DELETED = "deleted"
+
+# ----- Database routing ------------------------------------------------------
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+PRIMARY_STICKY_COOKIE = "read_primary"
+
+# ----- Cache -----------------------------------------------------------------
+SHELL_CACHE_TIMEOUT = 60 * 60 * 24  # one day, fragments are invalidated explicitly
+SHELL_VERSION_CACHE_KEY = "core:version:shell"
+SHELL_USER_CACHE_KEY = "core:shell:user:{}"
+VERSION_CACHE_TIMEOUT = 60 * 60 * 24  # versions are reloaded from the database
+MODEL_VERSION_CACHE_KEY = "core:version:{}"
+MODEL_CLUB_VERSION_CACHE_KEY = "core:version:{}:club:{}"
+MODEL_ALL_CLUBS_VERSION_CACHE_KEY = "core:version:{}:clubs"
+USER_CACHE_KEY = "core:user:{}"
+USER_CACHE_TIMEOUT = 60 * 60  # one hour, users are invalidated explicitly
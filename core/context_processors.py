@@ -1,13 +1,28 @@
+# ----- Django imports --------------------------------------------------------
+from django.utils.functional import SimpleLazyObject
+
 # ----- Core imports --------------------------------------------------------
+from .cache import get_user_shell
 from .utils import get_user_club, get_user_member
 
 
+def _get_lazy_core_context(request):
+    # built once per request: the context processors run on every render, and
+    # each value is only loaded by the first template that uses it
+    if not hasattr(request, "_core_context"):
+        logged_in_user = request.user
+
+        request._core_context = {
+            "logged_in_user_member": SimpleLazyObject(lambda: get_user_member(logged_in_user)),
+            "logged_in_user_member_club": SimpleLazyObject(lambda: get_user_club(logged_in_user)),
+            # keys of the cached header, sidebar and card fragments
+            "shell": SimpleLazyObject(lambda: get_user_shell(logged_in_user)),
+        }
+
+    return request._core_context
+
+
 def core_context(request):
     """Add core context to all templates. To give access to global variables"""
 
-    logged_in_user = request.user
-
-    return {
-        "logged_in_user_member": get_user_member(logged_in_user),
-        "logged_in_user_member_club": get_user_club(logged_in_user),
-    }
+    return _get_lazy_core_context(request)
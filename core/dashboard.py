@@ -0,0 +1,129 @@
+# ----- Django imports --------------------------------------------------------
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+# ----- Core imports ----------------------------------------------------------
+from .enums import CompetitionRegistrationStatus
+from .models import CompetitionRegistration, RegistrationCount
+
+
+# ---- Registration counts ----------------------------------------------------
+# The dashboard reads the number of registrations of each competition,
+# discipline, division, club and status from RegistrationCount, kept up to
+# date on every save and delete of a registration. Opening it costs the number
+# of cells, not the number of registrations.
+REGISTRATION_KEY_FIELDS = ("competition_id", "discipline_id", "division_id", "club_id", "status")
+
+
+def get_registration_key(registration):
+    return tuple(getattr(registration, field) for field in REGISTRATION_KEY_FIELDS)
+
+
+def get_stored_registration_key(pk):
+    """Return the key of the registration as saved, None if it isn't."""
+    return (
+        CompetitionRegistration.objects.filter(pk=pk)
+        .values_list(*REGISTRATION_KEY_FIELDS)
+        .first()
+    )
+
+
+def add_registration_count(key, delta):
+    """Add delta to the count of the cell of the key, in one update."""
+    filters = dict(zip(REGISTRATION_KEY_FIELDS, key))
+    counts = RegistrationCount.objects.filter(**filters)
+
+    if delta < 0:
+        # the cell may be gone already, deleted with its competition
+        counts.filter(count__gte=-delta).update(count=F("count") + delta)
+        counts.filter(count=0).delete()
+        return
+
+    if counts.update(count=F("count") + delta):
+        return
+    try:
+        with transaction.atomic():
+            RegistrationCount.objects.create(count=delta, **filters)
+    except IntegrityError:
+        # created meanwhile by a concurrent registration
+        counts.update(count=F("count") + delta)
+
+
+def move_registration_count(old_key, new_key):
+    if old_key == new_key:
+        return
+    if old_key is not None:
+        add_registration_count(old_key, -1)
+    if new_key is not None:
+        add_registration_count(new_key, 1)
+
+
+def rebuild_registration_counts(competitions=None):
+    """Count the registrations again with one GROUP BY query, returns the number of cells.
+
+    `competitions` limits the rebuild to their cells, after their registrations
+    were changed by a bulk update, that doesn't send the signals.
+    """
+    registrations = CompetitionRegistration.objects.all()
+    counts = RegistrationCount.objects.all()
+    if competitions is not None:
+        registrations = registrations.filter(competition__in=competitions)
+        counts = counts.filter(competition__in=competitions)
+
+    rows = registrations.values(*REGISTRATION_KEY_FIELDS).annotate(count=Count("pk")).order_by()
+
+    with transaction.atomic():
+        counts.delete()
+        cells = RegistrationCount.objects.bulk_create([RegistrationCount(**row) for row in rows])
+
+    return len(cells)
+
+
+# ---- Dashboard --------------------------------------------------------------
+def get_status_counts(rows, key_fields):
+    """Pivot the rows, one per key and status, to one per key with a count per status."""
+    statuses = [status.value for status in CompetitionRegistrationStatus]
+    table = {}
+    for row in rows:
+        key = tuple(row[field] for field in key_fields)
+        if key not in table:
+            table[key] = {
+                **{field: row[field] for field in key_fields},
+                "counts": dict.fromkeys(statuses, 0),
+                "total": 0,
+            }
+        table[key]["counts"][row["status"]] = row["count"]
+        table[key]["total"] += row["count"]
+
+    return [
+        {**cell, "counts": [cell["counts"][status] for status in statuses]}
+        for cell in table.values()
+    ]
+
+
+def get_competition_dashboard():
+    """Return the registration counts per competition, discipline and division, and per club."""
+    competition_names = {
+        "competition_name": F("competition__name"),
+        "discipline_name": F("discipline__name"),
+        "division_name": F("division__name"),
+    }
+    competition_fields = ("competition_id", "discipline_id", "division_id", *competition_names)
+    # the counts of a deleted competition or club stay until it is purged
+    counts = RegistrationCount.objects.filter(competition__deleted_at__isnull=True, club__deleted_at__isnull=True)
+    competition_rows = (
+        counts.values("status", "competition_id", "discipline_id", "division_id", **competition_names)
+        .annotate(count=Sum("count"))
+        .order_by(*competition_names, *competition_fields[:3])
+    )
+    club_rows = (
+        counts.values("status", "club_id", club_name=F("club__name"))
+        .annotate(count=Sum("count"))
+        .order_by("club_name", "club_id")
+    )
+
+    return {
+        "statuses": [status.value for status in CompetitionRegistrationStatus],
+        "competitions": get_status_counts(competition_rows, competition_fields),
+        "clubs": get_status_counts(club_rows, ("club_id", "club_name")),
+    }
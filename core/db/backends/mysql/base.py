@@ -0,0 +1,58 @@
+# ----- Django imports --------------------------------------------------------
+from django.db.backends.mysql import base
+
+# ----- Core imports ----------------------------------------------------------
+from core.db.pool import get_pool, record_connection_created
+
+
+def is_connection_usable(connection):
+    try:
+        connection.ping()
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """MySQL backend taking its connections from a per-process pool.
+
+    The pool is used when the database settings have a POOL entry, see
+    `core.db.pool.get_pool`, otherwise it behaves as the Django backend.
+    """
+
+    def get_pool(self):
+        return get_pool(self.alias, self.settings_dict, check=is_connection_usable)
+
+    @property
+    def pooled(self):
+        return self.get_pool() is not None
+
+    def get_new_connection(self, conn_params):
+        pool = self.get_pool()
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        def connect():
+            connection = super(DatabaseWrapper, self).get_new_connection(conn_params)
+            # a reused connection is only a checkout, see count_connection_created
+            record_connection_created(self.alias)
+            return connection
+
+        return pool.acquire(connect)
+
+    def _close(self):
+        pool = self.get_pool()
+        if pool is None or self.connection is None:
+            return super()._close()
+
+        # a connection that raised errors is not trusted anymore
+        discard = self.errors_occurred
+
+        # never hand out a connection in the middle of a transaction
+        if not discard and (self.in_atomic_block or not self.autocommit):
+            try:
+                self.connection.rollback()
+            except base.Database.Error:
+                discard = True
+
+        pool.release(self.connection, discard=discard)
@@ -0,0 +1,231 @@
+# ----- generic imports ---------------------------------------------------------
+import threading
+import time
+from collections import Counter, deque
+
+# ----- Django imports --------------------------------------------------------
+from django.utils.translation import gettext_lazy as _
+
+
+# ---- Messages ----------------------------------------------------------------
+POOL_TIMEOUT_ERROR_MESSAGE = _(
+    "No database connection available after waiting {timeout} seconds."
+)
+
+
+# ---- Pool ---------------------------------------------------------------------
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """A bounded pool of database connections, shared by the threads of a process.
+
+    Works for both WSGI workers and ASGI, where the ORM runs in the threads of
+    `sync_to_async`. Idle connections are checked with `check` before being
+    handed out again, and replaced when broken or older than `max_lifetime`.
+    """
+
+    def __init__(self, max_size=4, timeout=10.0, max_lifetime=None, check=None):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.check = check
+
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, created_at), the last released on the right
+        # id(connection) -> (connection, created_at), the reference keeps the id unique
+        self._in_use = {}
+        self._size = 0
+
+        self._counters = Counter()
+        self._max_wait_time = 0.0
+
+    def acquire(self, connect):
+        """Return an idle connection, or a new one created with `connect()`."""
+        start = time.monotonic()
+        waited = False
+
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, created_at = self._idle.pop()
+                    break
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection, created_at = None, None
+                    break
+
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        POOL_TIMEOUT_ERROR_MESSAGE.format(timeout=self.timeout)
+                    )
+
+                waited = True
+                self._condition.wait(remaining)
+
+            if waited:
+                self._record_wait(time.monotonic() - start)
+
+        if connection is not None and not self._is_healthy(connection, created_at):
+            self._close_quietly(connection)
+            self._counters["reconnects"] += 1
+            connection = None
+
+        if connection is None:
+            try:
+                connection = connect()
+            except Exception:
+                self._discard_slot()
+                raise
+
+            created_at = time.monotonic()
+            self._counters["created"] += 1
+
+        with self._condition:
+            self._in_use[id(connection)] = (connection, created_at)
+            self._counters["acquired"] += 1
+
+        return connection
+
+    def release(self, connection, discard=False):
+        """Give a connection back, closing it if broken or too old."""
+        with self._condition:
+            _, created_at = self._in_use.pop(id(connection))
+
+            if discard or self._is_expired(created_at):
+                self._size -= 1
+            else:
+                self._idle.append((connection, created_at))
+                connection = None
+
+            self._condition.notify()
+
+        if connection is not None:
+            self._close_quietly(connection)
+
+    def close(self):
+        """Close the idle connections, the ones in use are closed on release."""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._condition.notify_all()
+
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def get_metrics(self):
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "open": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._in_use),
+                "acquired": self._counters["acquired"],
+                "created": self._counters["created"],
+                "reconnects": self._counters["reconnects"],
+                "waits": self._counters["waits"],
+                "timeouts": self._counters["timeouts"],
+                "wait_time_total": self._counters["wait_time_total"],
+                "wait_time_max": self._max_wait_time,
+            }
+
+    def _record_wait(self, wait_time):
+        self._counters["waits"] += 1
+        self._counters["wait_time_total"] += wait_time
+        self._max_wait_time = max(self._max_wait_time, wait_time)
+
+    def _discard_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _is_expired(self, created_at):
+        return (
+            self.max_lifetime is not None
+            and time.monotonic() - created_at > self.max_lifetime
+        )
+
+    def _is_healthy(self, connection, created_at):
+        if self._is_expired(created_at):
+            return False
+
+        try:
+            return self.check is None or self.check(connection)
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+# ---- Registry -----------------------------------------------------------------
+# one pool per database alias and process
+_pools = {}
+_pools_lock = threading.Lock()
+
+# per database alias, for pooled and plain aliases: the connections opened,
+# and the ones handed to a Django connection, a pooled one being handed out
+# again for every request reusing it
+_connects = Counter()
+_checkouts = Counter()
+
+
+def get_pool(alias, settings_dict, check=None):
+    """Return the pool of the alias, None if its settings have no POOL entry.
+
+    POOL accepts MAX_SIZE, TIMEOUT (seconds waited for a free connection) and
+    MAX_LIFETIME (seconds, should stay below the server wait_timeout).
+    """
+    options = settings_dict.get("POOL")
+    if not options:
+        return None
+
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(
+                max_size=options.get("MAX_SIZE", 4),
+                timeout=options.get("TIMEOUT", 10.0),
+                max_lifetime=options.get("MAX_LIFETIME"),
+                check=check,
+            )
+        return _pools[alias]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+
+
+def record_connection_created(alias):
+    _connects[alias] += 1
+
+
+def record_connection_checkout(alias):
+    _checkouts[alias] += 1
+
+
+def get_connection_metrics():
+    """Return the connection metrics of this process, per database alias."""
+    with _pools_lock:
+        pools = dict(_pools)
+
+    metrics = {
+        alias: {"connects": _connects[alias], "checkouts": _checkouts[alias]}
+        for alias in _connects.keys() | _checkouts.keys() | pools.keys()
+    }
+    for alias, pool in pools.items():
+        metrics[alias]["pool"] = pool.get_metrics()
+    return metrics
@@ -0,0 +1,188 @@
+# ----- generic imports ---------------------------------------------------------
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+# ----- Django imports --------------------------------------------------------
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.template import engines
+
+# ----- Core imports ----------------------------------------------------------
+from .constants import SHELL_VERSION_CACHE_KEY, VERSION_CACHE_TIMEOUT
+from .versions import get_versions
+
+# A deploy only does what changed since the previous one, told by the hashes
+# kept in the deploy manifest: the requirements are installed again when the
+# requirements file changed, and only the static files whose content changed
+# are copied.
+MANIFEST_FILE_NAME = ".deploy_manifest.json"
+TEMPLATE_EXTENSIONS = (".html", ".txt")
+
+
+# ---- Manifest ---------------------------------------------------------------
+def get_manifest_path():
+    return Path(settings.BASE_DIR) / MANIFEST_FILE_NAME
+
+
+def load_manifest(path=None):
+    path = path or get_manifest_path()
+    try:
+        with open(path) as manifest:
+            return json.load(manifest)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=None):
+    path = path or get_manifest_path()
+    with open(path, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+
+
+def get_file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ---- Timings ----------------------------------------------------------------
+class StepTimer:
+    """Time the steps of the deploy, reported at its end and kept to follow the deploy time."""
+
+    def __init__(self):
+        self.timings = []
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self):
+        return sum(seconds for _name, seconds in self.timings)
+
+    def as_record(self):
+        return {
+            "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "total": round(self.total, 3),
+            "steps": {name: round(seconds, 3) for name, seconds in self.timings},
+        }
+
+
+# ---- Commands ---------------------------------------------------------------
+def run_manage_command(*args):
+    """Run the management command in a new process, with the settings as they are on disk now."""
+    subprocess.run([sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), *args], check=True)
+
+
+# ---- Requirements -----------------------------------------------------------
+def have_requirements_changed(requirements_file, manifest):
+    """Tell whether the requirements file changed since the last deploy that installed it."""
+    return manifest.get("requirements") != get_file_hash(requirements_file)
+
+
+# ---- Static files -----------------------------------------------------------
+def get_source_static_files():
+    """Return the source path of every static file found by the finders, by its path in STATIC_ROOT."""
+    files = {}
+    for finder in get_finders():
+        for path, storage in finder.list(["CVS", ".*", "*~"]):
+            prefix = getattr(storage, "prefix", None)
+            target = os.path.join(prefix, path) if prefix else path
+            # the first finder wins, as with collectstatic
+            files.setdefault(target.replace(os.sep, "/"), storage.path(path))
+    return files
+
+
+def collect_changed_static_files(manifest):
+    """Copy the static files whose content changed to STATIC_ROOT, returns the copied, kept and removed.
+
+    A file whose size and modification time are the ones recorded isn't read
+    again, a checkout touching every file only costs one hash each.
+    """
+    recorded = manifest.get("static", {})
+    current = {}
+    copied = kept = 0
+
+    for target, source in get_source_static_files().items():
+        stat = os.stat(source)
+        entry = recorded.get(target)
+        if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+            file_hash = entry[2]
+        else:
+            file_hash = get_file_hash(source)
+        current[target] = [stat.st_size, stat.st_mtime_ns, file_hash]
+
+        destination = staticfiles_storage.path(target)
+        if entry and entry[2] == file_hash and os.path.exists(destination):
+            kept += 1
+            continue
+
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copy2(source, destination)
+        copied += 1
+
+    # only the files copied by a previous deploy are removed
+    removed = 0
+    for target in recorded.keys() - current.keys():
+        destination = staticfiles_storage.path(target)
+        if os.path.exists(destination):
+            os.remove(destination)
+            removed += 1
+
+    manifest["static"] = current
+    return copied, kept, removed
+
+
+# ---- Templates --------------------------------------------------------------
+def get_template_names(engine):
+    for template_dir in engine.template_dirs:
+        for root, _dirs, files in os.walk(template_dir):
+            for file_name in files:
+                if file_name.endswith(TEMPLATE_EXTENSIONS):
+                    yield os.path.relpath(os.path.join(root, file_name), template_dir).replace(os.sep, "/")
+
+
+def compile_templates():
+    """Compile every template, returns their number.
+
+    A syntax error fails the deploy instead of the first request rendering the
+    template, and the cached loader of the process keeps the compiled ones.
+    """
+    count = 0
+    for engine in engines.all():
+        for name in dict.fromkeys(get_template_names(engine)):
+            engine.get_template(name)
+            count += 1
+    return count
+
+
+# ---- Caches -----------------------------------------------------------------
+def warm_version_caches():
+    """Load every version in the cache shared by the workers, returns their number.
+
+    The choices, the lists and the structure fragments are keyed by these
+    versions, the first requests after a restart find them without a query.
+    """
+    version_model = apps.get_model("core", "ModelVersion")
+    versions = dict(version_model.objects.values_list("key", "version"))
+    cache.set_many(versions, VERSION_CACHE_TIMEOUT)
+
+    # created when missing
+    get_versions([SHELL_VERSION_CACHE_KEY])
+    return len(versions | {SHELL_VERSION_CACHE_KEY: None})
@@ -0,0 +1,73 @@
+# ----- Django imports --------------------------------------------------------
+from django.db.models import Prefetch
+from django.utils.translation import gettext as _
+
+# ----- Core imports ----------------------------------------------------------
+from .models import Discipline, Division, Member
+from .utils import calculate_age, check_age_rules
+
+
+# ---- Eligibility matrix -----------------------------------------------------
+def get_member_count_errors(discipline, count):
+    errors = []
+    if discipline.min_members_number is not None and count < discipline.min_members_number:
+        errors.append(
+            _("Not enough members: %(count)s, at least %(min)s")
+            % {"count": count, "min": discipline.min_members_number}
+        )
+    if discipline.max_members_number is not None and count > discipline.max_members_number:
+        errors.append(
+            _("Too many members: %(count)s, at most %(max)s")
+            % {"count": count, "max": discipline.max_members_number}
+        )
+    return errors
+
+
+def get_team_errors(discipline, division, member_ages):
+    """Return why the team doesn't fit the discipline and division, empty if it does."""
+    errors = get_member_count_errors(discipline, len(member_ages))
+    if division is not None:
+        errors += [
+            name + message + str(value)
+            for name, message, value in check_age_rules(division.year_rules.all(), member_ages)
+        ]
+    return errors
+
+
+def get_cell_key(team, discipline, division):
+    """Return the key of a (team, discipline, division) cell, as posted by the bulk registration."""
+    return f"{team.pk}-{discipline.pk}-{division.pk if division is not None else ''}"
+
+
+def get_eligibility_matrix(competition, teams):
+    """Return the columns, a discipline and one of its divisions, and for every team the errors of each column.
+
+    The disciplines, divisions, rules and members are loaded once, with one
+    query each, and the age of every member is computed once.
+    """
+    disciplines = Discipline.objects.filter(competition=competition).order_by("name", "pk").prefetch_related(
+        Prefetch(
+            "division_set",
+            queryset=Division.objects.order_by("name", "pk").prefetch_related("year_rules"),
+        )
+    )
+    columns = []
+    for discipline in disciplines:
+        divisions = list(discipline.division_set.all()) or [None]
+        columns += [{"discipline": discipline, "division": division} for division in divisions]
+
+    rows = []
+    for team in teams.prefetch_related(
+        Prefetch("members", queryset=Member.objects.only("pk", "name", "date_of_birth"))
+    ):
+        member_ages = [(member.name, calculate_age(member.date_of_birth)) for member in team.members.all()]
+        cells = [
+            {
+                "key": get_cell_key(team, column["discipline"], column["division"]),
+                "errors": get_team_errors(column["discipline"], column["division"], member_ages),
+            }
+            for column in columns
+        ]
+        rows.append({"team": team, "cells": cells})
+
+    return {"columns": columns, "rows": rows}
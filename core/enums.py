@@ -67,6 +67,8 @@ class CompetitionRegistrationStatus(Enum):
     DRAFT = 'Draft'
     REGISTERED = 'Registered'
     FINISHED = 'Finished'
+    # still a draft when the competition closed
+    EXPIRED = 'Expired'
 
     @classmethod
     def choices(cls):
@@ -97,7 +99,26 @@ class RuleCondition(Enum):
 
 
 class RuleOption(Enum):
+    # the age of every member
     YEAR = 'Year'
+    # one value for the whole team
+    AVERAGE_YEAR = 'AverageYear'
+    MIN_YEAR = 'MinYear'
+    MAX_YEAR = 'MaxYear'
+    SUM_YEAR = 'SumYear'
+    # the number of members with an age between the band bounds
+    YEAR_BAND_COUNT = 'YearBandCount'
+
+    @classmethod
+    def choices(cls):
+        return [(key.value, key.name) for key in cls]
+
+
+class JobStatus(Enum):
+    PENDING = 'Pending'
+    RUNNING = 'Running'
+    DONE = 'Done'
+    FAILED = 'Failed'
 
     @classmethod
     def choices(cls):
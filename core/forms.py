@@ -3,10 +3,10 @@ from django import forms
 from django.contrib import messages
 from django.contrib.auth.models import User, Group
 from django.core.validators import FileExtensionValidator
-from django.urls import reverse
+from django.urls import reverse, reverse_lazy
 from django.utils import formats
 from django.utils.datetime_safe import date
-from django.forms import ChoiceField, SelectMultiple
+from django.forms import ChoiceField, Select, SelectMultiple
 from django.utils.translation import gettext_lazy as _
 
 # ----- Core imports --------------------------------------------------------
@@ -26,6 +26,54 @@ class CustomSelectMultipleWidget(SelectMultiple):
     template_name = "widgets/custom_multi_select.html"  # Path to your custom template
 
 
+class RemoteSearchMixin:
+    """Render only the selected options, the others are searched on `search_url`.
+
+    The search url returns `{"results": [{"id": ..., "text": ...}], "more": ...}`
+    for the `q` and `page` parameters.
+    """
+
+    template_name = "widgets/remote_search_select.html"
+
+    def __init__(self, search_url, attrs=None):
+        super().__init__(attrs)
+        self.search_url = search_url
+
+    def use_required_attribute(self, initial):
+        # the search input is empty once a value is selected, checked by the field
+        return False
+
+    def optgroups(self, name, value, attrs=None):
+        # the choices are the model choice iterator of the field, only the
+        # selected rows are loaded instead of the whole queryset
+        pks = [pk for pk in value if str(pk).isdigit()]
+        if not pks:
+            return []
+
+        field = self.choices.field
+        options = [
+            self.create_option(name, obj.pk, field.label_from_instance(obj), True, index, attrs=attrs)
+            for index, obj in enumerate(self.choices.queryset.filter(pk__in=pks))
+        ]
+        return [(None, options, 0)]
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        # the attributes go to the search input, which selects nothing itself
+        context["widget"]["attrs"].pop("multiple", None)
+        context["widget"]["search_url"] = str(self.search_url)
+        context["widget"]["multiple"] = self.allow_multiple_selected
+        return context
+
+
+class RemoteSearchSelect(RemoteSearchMixin, Select):
+    pass
+
+
+class RemoteSearchSelectMultiple(RemoteSearchMixin, SelectMultiple):
+    pass
+
+
 class MemberForm(forms.ModelForm):
     name = forms.CharField(widget=forms.TextInput(), required=True)
 
@@ -250,16 +298,11 @@ class MemberMembershipForm(forms.Form):
         widget=forms.Select(attrs={"required": False}),
     )
 
-    members_users_with_user = Member.objects.filter(user__isnull=False).values_list(
-        "user", flat=True
-    )
-
-    users_without_member = User.objects.exclude(id__in=members_users_with_user)
-
     user_select = forms.ModelChoiceField(
-        queryset=users_without_member,
+        queryset=User.objects.filter(member__isnull=True),
         label="Select a User",
         required=False,
+        widget=RemoteSearchSelect(reverse_lazy("user_search_json")),
     )
 
     group_select = forms.ModelMultipleChoiceField(
@@ -381,8 +424,8 @@ class TeamForm(forms.ModelForm):
     )
     name = forms.CharField(widget=forms.TextInput(), required=True, label=_("Name"))
     members = forms.ModelMultipleChoiceField(
-        queryset=Member.objects.filter(),
-        widget=CustomSelectMultipleWidget(),
+        queryset=Member.objects.all(),
+        widget=RemoteSearchSelectMultiple(reverse_lazy("member_search_json")),
         required=True,
         label=_("Members"),
     )
@@ -445,7 +488,7 @@ class CompetitionRegistrationForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
 
         self.fields["competition"] = forms.ModelChoiceField(
-            queryset=Competition.objects.filter(status='Open'),
+            queryset=Competition.objects.open(),
             label=_("Select competition"),
             widget=forms.Select(
                 attrs={
@@ -473,6 +516,27 @@ class CompetitionRegistrationForm(forms.ModelForm):
         ]
 
 
+class BulkCompetitionRegistrationForm(forms.Form):
+    registrations = forms.MultipleChoiceField(choices=[], required=True, label=_("Registrations"))
+    status = forms.ChoiceField(
+        choices=[
+            (CompetitionRegistrationStatus.REGISTERED.value, CompetitionRegistrationStatus.REGISTERED.name),
+            (CompetitionRegistrationStatus.DRAFT.value, CompetitionRegistrationStatus.DRAFT.name),
+        ],
+        initial=CompetitionRegistrationStatus.REGISTERED.value,
+        label=_("Status"),
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
+
+    def __init__(self, *args, matrix, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # the cells of the eligibility matrix, a team in a discipline and division
+        self.fields["registrations"].choices = [
+            (cell["key"], cell["key"]) for row in matrix["rows"] for cell in row["cells"]
+        ]
+
+
 class InscribedMemberForm(forms.Form):
     competition_select = forms.ModelChoiceField(
         queryset=Competition.objects.all(),
@@ -484,6 +548,7 @@ class InscribedMemberForm(forms.Form):
         queryset=Member.objects.all(),
         required=True,
         label=_("Select a Member"),
+        widget=RemoteSearchSelect(reverse_lazy("member_search_json")),
     )
 
     def clean(self):
@@ -573,8 +638,23 @@ class YearRuleForm(forms.ModelForm):
         label=_("Condition")
     )
     value = forms.FloatField(widget=forms.NumberInput(), required=True, label=_("Value"))
+    band_min = forms.FloatField(widget=forms.NumberInput(), required=False, label=_("Band minimum age"))
+    band_max = forms.FloatField(widget=forms.NumberInput(), required=False, label=_("Band maximum age"))
     description = forms.CharField(widget=forms.Textarea(attrs={'rows': 4}), label=_("Description"), required=False)
 
+    def clean(self):
+        cleaned_data = super().clean()
+
+        if cleaned_data.get("option") == RuleOption.YEAR_BAND_COUNT.value:
+            band_min = cleaned_data.get("band_min")
+            band_max = cleaned_data.get("band_max")
+            if band_min is None and band_max is None:
+                raise forms.ValidationError(_("A band count rule needs a minimum or a maximum age"))
+            if band_min is not None and band_max is not None and band_min > band_max:
+                raise forms.ValidationError(_("The band minimum age is greater than its maximum age"))
+
+        return cleaned_data
+
     class Meta:
         model = YearRule
         fields = [
@@ -582,5 +662,7 @@ class YearRuleForm(forms.ModelForm):
             "option",
             "condition",
             "value",
+            "band_min",
+            "band_max",
             "description",
         ]
@@ -0,0 +1,197 @@
+# ----- generic imports ---------------------------------------------------------
+import logging
+import socket
+import traceback
+from datetime import timedelta
+
+# ----- Django imports --------------------------------------------------------
+from django.db import IntegrityError, transaction
+from django.utils.timezone import now
+
+# ----- Core imports ----------------------------------------------------------
+from .archive import archive_history
+from .dashboard import rebuild_registration_counts
+from .enums import JobStatus
+from .lifecycle import close_due_competitions
+from .member_rows import rebuild_member_rows
+from .models import Job
+from .search import rebuild_index
+from .trash import purge_deleted
+
+logger = logging.getLogger(__name__)
+
+# The jobs are rows of the Job table, run by `python manage.py run_jobs`. No
+# broker is needed, a job is claimed by a conditional update, that only one
+# worker wins, on MySQL as on SQLite.
+
+# seconds waited before the first retry, doubled on every other one
+RETRY_DELAY = 30
+# a running job not finished after this long is taken for lost with its worker
+STALE_AFTER = timedelta(hours=1)
+
+# ---- Registry ---------------------------------------------------------------
+JOBS = {}
+
+
+def register_job(name):
+    """Register the function as the job `name`, called with the job and its kwargs."""
+
+    def register(function):
+        JOBS[name] = function
+        return function
+
+    return register
+
+
+# ---- Queue ------------------------------------------------------------------
+def enqueue(name, key="", user=None, max_attempts=3, run_at=None, **kwargs):
+    """Queue the job, or return the one with the same name and key not finished yet.
+
+    The job runs as soon as a worker is free, or not before `run_at`.
+    """
+    if name not in JOBS:
+        raise ValueError(f"Unknown job {name}")
+
+    queued_key = get_queued_key(name, key)
+    while True:
+        queued = get_queued_job(queued_key)
+        if queued is not None:
+            return queued
+
+        try:
+            with transaction.atomic():
+                return Job.objects.create(
+                    name=name,
+                    key=key,
+                    queued_key=queued_key,
+                    kwargs=kwargs,
+                    created_by=user,
+                    max_attempts=max_attempts,
+                    run_at=run_at or now(),
+                )
+        except IntegrityError:
+            # queued by a concurrent request since the lookup, returned on the
+            # next one, unless it has finished meanwhile
+            continue
+
+
+def get_queued_key(name, key):
+    return f"{name}:{key}"
+
+
+def get_queued_job(queued_key):
+    return Job.objects.filter(queued_key=queued_key).first()
+
+
+def requeue_stale_jobs():
+    """Queue again the jobs left running by a worker that stopped, returns their number."""
+    return Job.objects.filter(
+        status=JobStatus.RUNNING.value, started_at__lt=now() - STALE_AFTER
+    ).update(status=JobStatus.PENDING.value, worker="")
+
+
+def claim_job(worker):
+    """Return the next due job, marked as running by the worker, None if there is none."""
+    while True:
+        pk = (
+            Job.objects.filter(status=JobStatus.PENDING.value, run_at__lte=now())
+            .order_by("run_at", "pk")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if pk is None:
+            return None
+
+        # claimed by another worker meanwhile when nothing is updated
+        if Job.objects.filter(pk=pk, status=JobStatus.PENDING.value).update(
+            status=JobStatus.RUNNING.value, worker=worker, started_at=now()
+        ):
+            return Job.objects.get(pk=pk)
+
+
+def get_worker_name(index=0):
+    return f"{socket.gethostname()}-{index}"
+
+
+# ---- Run --------------------------------------------------------------------
+def set_progress(job, done, total=100, message=""):
+    """Record how far the job is, shown by the job status fragment."""
+    job.progress = min(100, int(done * 100 / total)) if total else 100
+    job.message = message[:255]
+    Job.objects.filter(pk=job.pk).update(progress=job.progress, message=job.message)
+
+
+def run_job(job):
+    """Run the claimed job, retried later with a longer delay every time it fails."""
+    try:
+        result = JOBS[job.name](job, **job.kwargs)
+    except Exception:
+        logger.exception("Job %s %s failed", job.pk, job.name)
+        job.attempts += 1
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = JobStatus.PENDING.value
+            job.run_at = now() + timedelta(seconds=RETRY_DELAY * 2 ** (job.attempts - 1))
+        else:
+            job.status = JobStatus.FAILED.value
+            job.finished_at = now()
+            job.queued_key = None
+        job.save(update_fields=["attempts", "error", "status", "run_at", "finished_at", "queued_key"])
+        return job
+
+    job.status = JobStatus.DONE.value
+    job.progress = 100
+    job.result = result
+    job.finished_at = now()
+    # the same job can be queued again
+    job.queued_key = None
+    job.save(update_fields=["status", "progress", "result", "finished_at", "queued_key"])
+    return job
+
+
+def run_jobs(worker, max_jobs=None):
+    """Run the due jobs one after the other, returns the number of jobs run."""
+    count = 0
+    while max_jobs is None or count < max_jobs:
+        claimed = claim_job(worker)
+        if claimed is None:
+            return count
+
+        run_job(claimed)
+        count += 1
+
+    return count
+
+
+# ---- Jobs -------------------------------------------------------------------
+@register_job("archive_history")
+def archive_history_job(job, days=30, batch_size=500):
+    set_progress(job, 0, message="Archiving")
+    return archive_history(now() - timedelta(days=days), batch_size=batch_size)
+
+
+@register_job("rebuild_search_index")
+def rebuild_search_index_job(job, batch_size=1000):
+    set_progress(job, 0, message="Indexing the members")
+    return {"members": rebuild_index(batch_size=batch_size)}
+
+
+@register_job("rebuild_member_rows")
+def rebuild_member_rows_job(job, batch_size=500):
+    set_progress(job, 0, message="Writing the member rows")
+    return {"members": rebuild_member_rows(batch_size=batch_size)}
+
+
+@register_job("rebuild_registration_counts")
+def rebuild_registration_counts_job(job):
+    return {"cells": rebuild_registration_counts()}
+
+
+@register_job("close_competitions")
+def close_competitions_job(job):
+    return {"competitions": close_due_competitions()}
+
+
+@register_job("purge_deleted")
+def purge_deleted_job(job, batch_size=100):
+    return purge_deleted(batch_size=batch_size)
@@ -0,0 +1,53 @@
+# ----- Django imports --------------------------------------------------------
+from django.db import transaction
+from django.utils.timezone import now
+
+# ----- Core imports ----------------------------------------------------------
+from .dashboard import rebuild_registration_counts
+from .enums import CompetitionStatus, CompetitionRegistrationStatus
+from .models import Competition, CompetitionRegistration
+
+# the registration status a competition leaves behind when it closes
+TERMINAL_REGISTRATION_STATUSES = {
+    CompetitionRegistrationStatus.DRAFT.value: CompetitionRegistrationStatus.EXPIRED.value,
+    CompetitionRegistrationStatus.REGISTERED.value: CompetitionRegistrationStatus.FINISHED.value,
+}
+
+
+# ---- Competition lifecycle --------------------------------------------------
+def close_competitions(competition_ids):
+    """Close the competitions and end their registrations, one update per status."""
+    with transaction.atomic():
+        registrations = CompetitionRegistration.objects.filter(competition_id__in=competition_ids)
+        for status, terminal_status in TERMINAL_REGISTRATION_STATUSES.items():
+            registrations.filter(status=status).update(status=terminal_status)
+
+        # only the competitions still open, if edited meanwhile
+        closed = Competition.objects.filter(
+            pk__in=competition_ids, status=CompetitionStatus.OPEN.value
+        ).update(status=CompetitionStatus.CLOSED.value)
+
+        # the updates don't send the signals counting the registrations
+        rebuild_registration_counts(competition_ids)
+
+    return closed
+
+
+def close_due_competitions(at=None, batch_size=500):
+    """Close the open competitions past their due date, returns their number.
+
+    Nothing is updated when none is due, running it every minute costs one
+    query on the status and due date index.
+    """
+    at = at or now()
+    due = Competition.objects.filter(
+        status=CompetitionStatus.OPEN.value, due_date__lte=at
+    ).order_by("pk")
+
+    count = 0
+    while True:
+        competition_ids = list(due.values_list("pk", flat=True)[:batch_size])
+        if not competition_ids:
+            return count
+
+        count += close_competitions(competition_ids)
@@ -0,0 +1,44 @@
+"""Move the closed memberships and the processed change requests to the archive tables.
+
+    python manage.py archive_history --days 30
+
+Meant to be scheduled (e.g. a nightly cron job): every run archives what was
+closed since the previous one, in small batches, each in its own transaction.
+"""
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from core.archive import archive_history
+
+
+class Command(BaseCommand):
+    help = "Archive the closed memberships and the processed member and membership changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Archive only the rows closed or created more than this many days ago",
+        )
+        parser.add_argument("--batch-size", type=int, default=500, help="Rows moved per transaction")
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop every step after this many batches, the next run goes on",
+        )
+        parser.add_argument("--pause", type=float, default=0, help="Seconds slept between two batches")
+
+    def handle(self, *args, **options):
+        archived = archive_history(
+            now() - timedelta(days=options["days"]),
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+            pause=options["pause"],
+        )
+
+        for name, rows in archived.items():
+            self.stdout.write(f"Archived {rows} {name}")
@@ -0,0 +1,22 @@
+"""Close the competitions past their due date.
+
+    python manage.py close_competitions
+
+Meant to be run every minute from cron, or queued as the close_competitions
+job. Their draft registrations expire and the registered ones are finished.
+Running it again changes nothing.
+"""
+from django.core.management.base import BaseCommand
+
+from core.lifecycle import close_due_competitions
+
+
+class Command(BaseCommand):
+    help = "Close the competitions past their due date and end their registrations"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Competitions closed per transaction")
+
+    def handle(self, *args, **options):
+        count = close_due_competitions(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Closed {count} competitions"))
@@ -0,0 +1,16 @@
+"""Compile every template, to fail on a syntax error before serving them.
+
+    python manage.py compile_templates
+
+Run by deploy once the production settings are in place.
+"""
+from django.core.management.base import BaseCommand
+
+from core.deploy import compile_templates
+
+
+class Command(BaseCommand):
+    help = "Compile every template of the template directories"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{compile_templates()} templates compiled")
@@ -0,0 +1,129 @@
+"""Compare the connection handling modes against a MySQL server.
+
+Start the MySQL of docker-compose.yml (docker compose up db), then
+
+    python manage.py db_benchmark --requests 2000 --concurrency 1 8 32
+
+Every simulated request opens or reuses a connection as Django does around
+a request, runs one tiny query and gives the connection back.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.benchmarks import summarize_latencies
+from core.db.pool import close_pools, get_connection_metrics
+
+
+class Command(BaseCommand):
+    help = "Benchmark plain, persistent and pooled MySQL connections"
+
+    MODES = {
+        # a new connection, and its handshake, for every request
+        "plain": {"CONN_MAX_AGE": 0},
+        # one connection per thread, kept between requests and health checked
+        "persistent": {"CONN_MAX_AGE": 240, "CONN_HEALTH_CHECKS": True},
+        # connections shared by the threads, given back at the end of each request
+        "pool": {"CONN_MAX_AGE": 0},
+    }
+
+    def add_arguments(self, parser):
+        # defaults of the docker-compose.yml database
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", default="3306")
+        parser.add_argument("--name", default="gafst")
+        parser.add_argument("--user", default="admin")
+        parser.add_argument("--password", default="admin123cocco")
+        parser.add_argument(
+            "--mode", nargs="+", choices=list(self.MODES), default=list(self.MODES)
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+        parser.add_argument(
+            "--pool-size",
+            type=int,
+            default=4,
+            help="connections of the pool, smaller than the concurrency to measure the waits",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'mode':<11} {'threads':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p99 ms':>8} {'max ms':>8} {'connects':>8} {'checkouts':>9}"
+        )
+
+        for mode in options["mode"]:
+            for concurrency in options["concurrency"]:
+                alias = self.add_database(mode, concurrency, options)
+                latencies, elapsed = self.run(alias, options["requests"], concurrency)
+
+                summary = summarize_latencies(latencies, elapsed)
+                metrics = get_connection_metrics().get(alias, {})
+                self.stdout.write(
+                    f"{mode:<11} {concurrency:>7} {summary['throughput']:>8.1f} "
+                    f"{summary['p50']:>8.2f} {summary['p90']:>8.2f} {summary['p99']:>8.2f} "
+                    f"{summary['max']:>8.2f} {metrics.get('connects', 0):>8} {metrics.get('checkouts', 0):>9}"
+                )
+                if "pool" in metrics:
+                    self.stdout.write(f"{'':<11} pool: {metrics['pool']}")
+
+        close_pools()
+
+    def add_database(self, mode, concurrency, options):
+        alias = f"benchmark_{mode}_{concurrency}"
+        settings_dict = {
+            "ENGINE": "core.db.backends.mysql",
+            "NAME": options["name"],
+            "USER": options["user"],
+            "PASSWORD": options["password"],
+            "HOST": options["host"],
+            "PORT": options["port"],
+            "OPTIONS": {"init_command": "SET sql_mode='STRICT_TRANS_TABLES'"},
+            **self.MODES[mode],
+        }
+        if mode == "pool":
+            settings_dict["POOL"] = {"MAX_SIZE": options["pool_size"], "TIMEOUT": 30}
+
+        # fill in the defaults of the other settings of a database
+        connections.settings = connections.configure_settings(
+            {**connections.settings, alias: settings_dict}
+        )
+        return alias
+
+    @staticmethod
+    def run(alias, requests, concurrency):
+        latencies = []
+        lock = threading.Lock()
+        threads_connections = []
+
+        def request(_):
+            connection = connections[alias]
+            start = time.perf_counter()
+
+            # what request_started and request_finished do
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            connection.close_if_unusable_or_obsolete()
+
+            latency = time.perf_counter() - start
+            with lock:
+                latencies.append(latency)
+                if connection not in threads_connections:
+                    threads_connections.append(connection)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(request, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        # the persistent connections belong to the finished threads
+        for connection in threads_connections:
+            connection.inc_thread_sharing()
+            connection.close()
+
+        return latencies, elapsed
@@ -1,74 +1,143 @@
+import filecmp
+import json
 import os
+import shutil
+import subprocess
+import sys
 
-from django.core.management import call_command
 from django.core.management.base import BaseCommand, CommandError
-from django.db import connections
 
-from core.utils import run_command
+from core.deploy import (
+    StepTimer,
+    load_manifest,
+    save_manifest,
+    get_file_hash,
+    have_requirements_changed,
+    collect_changed_static_files,
+    run_manage_command,
+)
 
 
 class Command(BaseCommand):
-    help = "Deploy the application"
+    help = "Deploy the application, only the steps whose inputs changed since the last deploy"
 
     PROJECT_NAME = "gafst"
     SETTINGS_FILE_PATH = os.path.join(PROJECT_NAME, "settings.py")
     PRODUCTION_SETTINGS_FILE_PATH = os.path.join(PROJECT_NAME, "production_settings.py")
     REQUIREMENTS_FILE = "requirements.txt"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--no-input", action="store_true", help="Don't ask anything, the database is neither reset nor a superuser created"
+        )
+        parser.add_argument(
+            "--full", action="store_true", help="Install the requirements and copy every static file, changed or not"
+        )
+        parser.add_argument(
+            "--timings-file", default=None, help="Append the time of every step to this file, one JSON line per deploy"
+        )
+
     def handle(self, *args, **options):
+        self.interactive = not options["no_input"]
         self.stdout.write(
             self.style.WARNING(
                 "Deploying the application...\n"
                 + "- remember to run this command in the right virtual environment"
                 + "\n- remember to fetch and pull the latest changes from the git repository"
                 + "\n- remember that this will modify the settings.py file"
-                + "\n\nPRESS ENTER TO CONTINUE"
+                + ("\n\nPRESS ENTER TO CONTINUE" if self.interactive else "")
             )
         )
+        if self.interactive:
+            input()
 
-        input()
+        manifest = {} if options["full"] else load_manifest()
+        timer = StepTimer()
 
         try:
-            self.install_requirements()
-            self.collect_static_files()
-            self.setup_production_settings()
-            self.setup_db()
+            with timer.step("requirements"):
+                self.install_requirements(manifest)
+            with timer.step("static files"):
+                self.collect_static_files(manifest)
+            save_manifest(manifest)
+
+            with timer.step("settings"):
+                self.setup_production_settings()
+
+            # this process imported the previous settings, the next steps run
+            # in a new one reading the production settings just copied
+            with timer.step("templates"):
+                self.compile_templates()
+            with timer.step("database"):
+                self.setup_db()
+            with timer.step("caches"):
+                self.warm_caches()
             self.create_superuser()
 
         except Exception as e:
             raise CommandError(str(e))
 
-    def install_requirements(self):
+        self.report_timings(timer, options["timings_file"])
+
+    def install_requirements(self, manifest):
+        if not have_requirements_changed(self.REQUIREMENTS_FILE, manifest):
+            self.stdout.write(self.style.SUCCESS("Requirements unchanged"))
+            return
+
         self.stdout.write(self.style.SUCCESS("Install Requirements..."))
-        run_command(f"pip install -r {self.REQUIREMENTS_FILE}")
+        # the pip of the running interpreter, the one of the virtual environment
+        subprocess.run(
+            [sys.executable, "-m", "pip", "install", "-r", self.REQUIREMENTS_FILE], check=True
+        )
+        manifest["requirements"] = get_file_hash(self.REQUIREMENTS_FILE)
 
-    def collect_static_files(self):
+    def collect_static_files(self, manifest):
         self.stdout.write(self.style.SUCCESS("Collect Static Files..."))
-        call_command('collectstatic', interactive=False, clear=True)
+        copied, kept, removed = collect_changed_static_files(manifest)
+        self.stdout.write(f"{copied} copied, {kept} unchanged, {removed} removed")
 
     def setup_production_settings(self):
         self.stdout.write(self.style.SUCCESS("Setup Production Settings..."))
-        prod_setting = self.PRODUCTION_SETTINGS_FILE_PATH
-        local_setting = self.SETTINGS_FILE_PATH
-        print('prod: ', prod_setting)
-        print('local: ', local_setting)
-        run_command(
-            f"cp {self.PRODUCTION_SETTINGS_FILE_PATH} {self.SETTINGS_FILE_PATH}"
-        )
+        if os.path.exists(self.SETTINGS_FILE_PATH) and filecmp.cmp(
+            self.PRODUCTION_SETTINGS_FILE_PATH, self.SETTINGS_FILE_PATH, shallow=False
+        ):
+            return
+
+        shutil.copyfile(self.PRODUCTION_SETTINGS_FILE_PATH, self.SETTINGS_FILE_PATH)
+
+    def compile_templates(self):
+        self.stdout.write(self.style.SUCCESS("Compile Templates..."))
+        run_manage_command("compile_templates")
 
     def setup_db(self):
+        if not self.interactive:
+            return
+
         reset_database = input(
             self.style.WARNING("Do you want to reset the database? (y/n) ")
         )
         if reset_database.lower() == "y":
-            run_command("python manage.py reset_database")
+            run_manage_command("reset_database")
+
+    def warm_caches(self):
+        self.stdout.write(self.style.SUCCESS("Warm Caches..."))
+        run_manage_command("warm_caches")
 
     def create_superuser(self):
+        if not self.interactive:
+            return
+
         create_superuser = input(
             self.style.WARNING("Do you want to create a superuser account? (y/n) ")
         )
         if create_superuser.lower() == "y":
-            connection = connections["default"]
-            db_name = connection.settings_dict["NAME"]
+            run_manage_command("createsuperuser")
+
+    def report_timings(self, timer, timings_file):
+        for name, seconds in timer.timings:
+            self.stdout.write(f"{name:<15}{seconds:8.2f}s")
+        self.stdout.write(self.style.SUCCESS(f"Deployed in {timer.total:.2f}s"))
 
-            call_command("createsuperuser")
+        if timings_file:
+            with open(timings_file, "a") as file:
+                file.write(json.dumps(timer.as_record()) + "\n")
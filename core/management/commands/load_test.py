@@ -0,0 +1,148 @@
+"""Load test the htmx fragment endpoints of a running server.
+
+Run the same settings and database behind both deployments, e.g.
+
+    gunicorn gafst.wsgi --workers 4 --bind 127.0.0.1:8000
+    uvicorn gafst.asgi:application --workers 4 --port 8001
+
+then compare them:
+
+    python manage.py load_test --user admin \\
+        --target wsgi=http://127.0.0.1:8000 --target asgi=http://127.0.0.1:8001 \\
+        --path "/en/competition-registration/load_disciplines?competition=1" \\
+        --concurrency 1 10 50 --requests 1000
+"""
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import summarize_latencies
+
+
+class Command(BaseCommand):
+    help = "Measure throughput and tail latency of fragment endpoints on running servers"
+
+    DEFAULT_PATHS = [
+        "/en/memberships/load_license_no_field?club_select=1",
+        "/en/competition-registration/load_disciplines?competition=1",
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=base_url of a running deployment, repeatable",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            help="path of an endpoint to load, repeatable",
+        )
+        parser.add_argument(
+            "--user",
+            required=True,
+            help="username of the admin the requests are authenticated as",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 10, 50],
+            help="number of concurrent clients, one run per value",
+        )
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--warmup", type=int, default=20)
+        parser.add_argument("--timeout", type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        targets = [self.parse_target(target) for target in options["target"]]
+        paths = options["path"] or self.DEFAULT_PATHS
+        cookie = f"{settings.SESSION_COOKIE_NAME}={self.create_session(options['user'])}"
+
+        self.stdout.write(
+            f"{'target':<8} {'path':<60} {'clients':>7} {'req/s':>8} "
+            f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'errors':>6}"
+        )
+        for path in paths:
+            for concurrency in options["concurrency"]:
+                for name, base_url in targets:
+                    url = base_url.rstrip("/") + path
+                    self.run(url, cookie, options["warmup"], 1, options["timeout"])
+                    summary, errors = self.run(
+                        url, cookie, options["requests"], concurrency, options["timeout"]
+                    )
+                    self.write_summary(name, path, concurrency, summary, errors)
+
+    @staticmethod
+    def parse_target(target):
+        name, separator, base_url = target.partition("=")
+        if not separator or not base_url:
+            raise CommandError(f"Invalid target {target!r}, expected name=base_url")
+        return name, base_url
+
+    @staticmethod
+    def create_session(username):
+        """Store an authenticated session, shared with the servers through the database."""
+        user = User.objects.filter(username=username).first()
+        if user is None:
+            raise CommandError(f"User {username!r} does not exist")
+
+        session = import_module(settings.SESSION_ENGINE).SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        return session.session_key
+
+    @staticmethod
+    def run(url, cookie, requests, concurrency, timeout):
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def fetch(_):
+            request = urllib.request.Request(url, headers={"Cookie": cookie, "HX-Request": "true"})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                    # a redirect to the login page is not a successful request
+                    failed = response.status != 200 or response.url != url
+            except (urllib.error.URLError, OSError) as error:
+                failed = error
+            latency = time.perf_counter() - start
+
+            with lock:
+                if failed:
+                    errors.append(failed)
+                else:
+                    latencies.append(latency)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        return summarize_latencies(latencies, elapsed), errors
+
+    def write_summary(self, name, path, concurrency, summary, errors):
+        if not summary["requests"]:
+            self.stdout.write(
+                self.style.ERROR(f"{name:<8} {path:<60} {concurrency:>7} all requests failed: {errors[0]}")
+            )
+            return
+
+        self.stdout.write(
+            f"{name:<8} {path:<60} {concurrency:>7} {summary['throughput']:>8.1f} "
+            f"{summary['p50']:>8.1f} {summary['p90']:>8.1f} {summary['p99']:>8.1f} "
+            f"{summary['max']:>8.1f} {len(errors):>6}"
+        )
@@ -0,0 +1,96 @@
+"""Count the queries of the pages and fragments, per request.
+
+    python manage.py measure_queries --user admin
+
+Every url is requested twice as the given user, the second (warm) request
+is measured, with the database sessions and ModelBackend first and then with
+the configured session engine and authentication backends.
+"""
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import translation
+
+
+class Command(BaseCommand):
+    help = "Measure the queries saved per request by the cached sessions and users"
+
+    DEFAULT_URLS = [
+        "home",
+        "members_view",
+        "members",
+        "clubs",
+        "memberships",
+        "roles",
+        "competitions",
+        "competitions_open",
+        "teams",
+        "divisions",
+        "disciplines",
+        "load_disciplines",
+    ]
+
+    BASELINE_SETTINGS = {
+        "SESSION_ENGINE": "django.contrib.sessions.backends.db",
+        "AUTHENTICATION_BACKENDS": ["django.contrib.auth.backends.ModelBackend"],
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", required=True, help="username of the requests")
+        parser.add_argument(
+            "--url", action="append", help="url name or path to measure, repeatable"
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first()
+        if user is None:
+            raise CommandError(f"User {options['user']!r} does not exist")
+
+        with translation.override(settings.LANGUAGE_CODE):
+            paths = [self.get_path(url) for url in options["url"] or self.DEFAULT_URLS]
+
+        self.stdout.write(f"{'path':<50} {'baseline':>8} {'cached':>8} {'saved':>8}")
+        total_baseline = total_cached = 0
+        for path in paths:
+            with override_settings(**self.BASELINE_SETTINGS):
+                baseline = self.count_queries(user, path)
+            cached = self.count_queries(user, path)
+
+            total_baseline += baseline
+            total_cached += cached
+            self.stdout.write(f"{path:<50} {baseline:>8} {cached:>8} {baseline - cached:>8}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'total':<50} {total_baseline:>8} {total_cached:>8} "
+                f"{total_baseline - total_cached:>8} "
+                f"({(total_baseline - total_cached) / len(paths):.1f} per request)"
+            )
+        )
+
+    @staticmethod
+    def get_path(url):
+        return url if url.startswith("/") else reverse(url)
+
+    @staticmethod
+    def count_queries(user, path):
+        # the client settings are read when the first request is handled
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            client.force_login(user)
+            client.get(path)
+
+            with ExitStack() as stack:
+                captured = [
+                    stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in connections
+                ]
+                client.get(path)
+
+        return sum(len(queries) for queries in captured)
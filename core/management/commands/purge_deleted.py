@@ -0,0 +1,23 @@
+"""Delete for good the clubs, competitions and members deleted before the undo window.
+
+    python manage.py purge_deleted
+
+Every deletion queues a purge_deleted job already, the command catches up on
+the rows left when no worker ran. Each batch is deleted in its own transaction.
+"""
+from django.core.management.base import BaseCommand
+
+from core.trash import purge_deleted
+
+
+class Command(BaseCommand):
+    help = "Purge the clubs, competitions and members deleted before the undo window"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50, help="Rows deleted per transaction")
+
+    def handle(self, *args, **options):
+        purged = purge_deleted(batch_size=options["batch_size"])
+        for model_name, count in purged.items():
+            self.stdout.write(f"{model_name}: {count}")
+        self.stdout.write(self.style.SUCCESS(f"Purged {sum(purged.values())} rows"))
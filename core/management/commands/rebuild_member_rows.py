@@ -0,0 +1,37 @@
+"""Write the row the member lists read for every member again, or check them.
+
+    python manage.py rebuild_member_rows
+    python manage.py rebuild_member_rows --check
+
+The rows are kept up to date on every save of a member, membership, club,
+role, exam or J+S. This is needed after the first deployment and after bulk
+updates, that don't send the signals. `--check` only reports the members whose
+row is missing or differs, and fails if there is one.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.member_rows import check_member_rows, rebuild_member_rows
+
+
+class Command(BaseCommand):
+    help = "Rebuild or check the member rows read by the member lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500, help="Members written per transaction")
+        parser.add_argument("--check", action="store_true", help="Only compare the rows with their members")
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            count = rebuild_member_rows(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {count} member rows"))
+            return
+
+        problems = check_member_rows(batch_size=options["batch_size"])
+        for problem, member_ids in problems.items():
+            if member_ids:
+                self.stdout.write(f"{problem}: {', '.join(map(str, member_ids))}")
+
+        count = sum(len(member_ids) for member_ids in problems.values())
+        if count:
+            raise CommandError(f"{count} member rows are wrong, run rebuild_member_rows")
+        self.stdout.write(self.style.SUCCESS("The member rows are up to date"))
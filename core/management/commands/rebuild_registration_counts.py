@@ -0,0 +1,19 @@
+"""Count the registrations of the competition dashboard again.
+
+    python manage.py rebuild_registration_counts
+
+The counts are kept up to date on every save and delete of a registration.
+This is needed after the first deployment and after bulk updates, that don't
+send the signals.
+"""
+from django.core.management.base import BaseCommand
+
+from core.dashboard import rebuild_registration_counts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the registration counts of the competition dashboard"
+
+    def handle(self, *args, **options):
+        count = rebuild_registration_counts()
+        self.stdout.write(self.style.SUCCESS(f"Counted {count} cells"))
@@ -0,0 +1,22 @@
+"""Index every member for the member search again.
+
+    python manage.py rebuild_search_index
+
+The index is kept up to date on every save of a member, membership or club.
+This is needed after the first deployment and after bulk updates, that don't
+send the signals.
+"""
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the member search index"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Members indexed per transaction")
+
+    def handle(self, *args, **options):
+        count = rebuild_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} members"))
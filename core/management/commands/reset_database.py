@@ -1,22 +1,31 @@
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import connections
 
-from core.utils import run_command
-
 
 class Command(BaseCommand):
-    help = "Reset the database and populate with default data"
+    help = "Reset the database and populate with default data, or with the rows of a snapshot"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--snapshot", default=None, help="Restore this snapshot file instead of inserting the default data"
+        )
 
-    def handle(self, *args, **kwargs):
+    def handle(self, *args, **options):
         self.stdout.write("Resetting the database...")
         self.reset_database()
 
         self.apply_migrations()
-        self.insert_defaults()
+        if options["snapshot"]:
+            self.restore_snapshot(options["snapshot"])
+        else:
+            self.insert_defaults()
 
         self.stdout.write(
             self.style.SUCCESS(
-                "Database reset and populated with default data successfully."
+                "Database reset and populated with "
+                + ("the snapshot" if options["snapshot"] else "default data")
+                + " successfully."
             )
         )
 
@@ -28,12 +37,19 @@ class Command(BaseCommand):
         with connection.cursor() as cursor:
             cursor.execute(f"DROP DATABASE IF EXISTS {db_name}")
             cursor.execute(f"CREATE DATABASE {db_name}")
+        # the next query connects to the new database
+        connection.close()
 
+    # in this process, instead of starting Django again for every command
     def apply_migrations(self):
         self.stdout.write(self.style.SUCCESS("Applying migrations..."))
-        run_command("python manage.py makemigrations")
-        run_command("python manage.py migrate")
+        call_command("makemigrations", verbosity=0)
+        call_command("migrate", verbosity=0)
 
     def insert_defaults(self):
         self.stdout.write(self.style.SUCCESS("Inserting default data..."))
-        run_command("python manage.py insert_defaults")
+        call_command("insert_defaults")
+
+    def restore_snapshot(self, path):
+        self.stdout.write(self.style.SUCCESS("Restoring the snapshot..."))
+        call_command("restore_snapshot", path, no_input=True)
@@ -0,0 +1,51 @@
+"""Replace the tables of the database with the rows of a snapshot.
+
+    python manage.py restore_snapshot snapshot.jsonl.gz
+    python manage.py restore_snapshot snapshot.jsonl.gz --no-input
+
+The tables must exist, migrated to the version of the snapshot (see
+reset_database --snapshot). The rows are inserted in batches while the file
+is read, in one transaction. Every row of these tables is deleted first: never
+run it against the production database.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.snapshots import DEFAULT_CHUNK_SIZE, restore_snapshot
+
+
+class Command(BaseCommand):
+    help = "Replace the tables of the database with the rows of a snapshot file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The snapshot file written by snapshot_database")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="The database replaced")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows inserted per query")
+        parser.add_argument("--no-input", action="store_true", help="Don't ask for a confirmation")
+
+    def handle(self, *args, **options):
+        db_name = connections[options["database"]].settings_dict["NAME"]
+        if not options["no_input"]:
+            answer = input(
+                self.style.WARNING(f"Every row of the database {db_name} will be replaced. Continue? (y/n) ")
+            )
+            if answer.lower() != "y":
+                raise CommandError("Restore cancelled")
+
+        start = time.perf_counter()
+        try:
+            counts = restore_snapshot(options["path"], using=options["database"], batch_size=options["batch_size"])
+        except (OSError, ValueError, LookupError) as e:
+            raise CommandError(f"Cannot restore {options['path']}: {e}")
+
+        if options["verbosity"] > 1:
+            for label, count in counts.items():
+                self.stdout.write(f"{label:<40}{count:>10}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Restored {sum(counts.values())} rows of {len(counts)} tables to {db_name}"
+                f" in {time.perf_counter() - start:.2f}s"
+            )
+        )
@@ -0,0 +1,57 @@
+"""Run the jobs queued in the Job table.
+
+    python manage.py run_jobs --workers 2
+    python manage.py run_jobs --once
+
+Meant to run as a service next to the web server, or from cron with --once,
+which runs the due jobs and exits. Only the database is needed, see
+core/jobs.py.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.jobs import get_worker_name, requeue_stale_jobs, run_jobs
+
+
+class Command(BaseCommand):
+    help = "Run the queued background jobs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=1, help="Jobs run at the same time, one thread each")
+        parser.add_argument("--once", action="store_true", help="Exit once no job is due")
+        parser.add_argument("--poll", type=float, default=5, help="Seconds waited when no job is due")
+        parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs per worker")
+
+    def handle(self, *args, **options):
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f"Queued {requeued} stale jobs again")
+
+        if options["workers"] <= 1:
+            count = self.work(0, options)
+        else:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                counts = executor.map(lambda index: self.work(index, options), range(options["workers"]))
+                count = sum(counts)
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs"))
+
+    def work(self, index, options):
+        worker = get_worker_name(index)
+        max_jobs = options["max_jobs"]
+        count = 0
+        try:
+            while max_jobs is None or count < max_jobs:
+                count += run_jobs(worker, None if max_jobs is None else max_jobs - count)
+                if options["once"]:
+                    break
+                time.sleep(options["poll"])
+        finally:
+            # the connection of a pool thread isn't closed by a request
+            if options["workers"] > 1:
+                connection.close()
+
+        return count
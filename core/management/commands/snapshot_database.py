@@ -0,0 +1,40 @@
+"""Write every table of the core, auth and content type apps to a compressed snapshot.
+
+    python manage.py snapshot_database snapshot.jsonl.gz
+    python manage.py snapshot_database snapshot.jsonl.gz --database replica
+
+The tables are streamed in primary key chunks to gzipped JSON Lines, in one
+transaction: the snapshot is the database at a point in time, taken without
+stopping the application. Reading a replica keeps the load off the primary.
+Restore it with restore_snapshot, e.g. to copy the production to a staging
+or benchmark database.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from core.snapshots import DEFAULT_CHUNK_SIZE, take_snapshot
+
+
+class Command(BaseCommand):
+    help = "Stream the tables of the database to a compressed snapshot file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="The snapshot file written, e.g. snapshot.jsonl.gz")
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS, help="The database read")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows read per query")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        counts = take_snapshot(options["path"], using=options["database"], chunk_size=options["chunk_size"])
+
+        if options["verbosity"] > 1:
+            for label, count in counts.items():
+                self.stdout.write(f"{label:<40}{count:>10}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {sum(counts.values())} rows of {len(counts)} tables to {options['path']}"
+                f" in {time.perf_counter() - start:.2f}s"
+            )
+        )
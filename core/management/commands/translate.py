@@ -1,32 +1,70 @@
-from django.core.management.base import BaseCommand
-from django.core.management import call_command
-from django.conf import settings
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.cache import bump_shell_version
+from core.translations import (
+    DOMAIN_EXTENSIONS,
+    load_manifest,
+    save_manifest,
+    get_sources_hash,
+    plan_extraction,
+    extract_messages,
+    get_catalogs,
+    get_catalog_hashes,
+    plan_compilation,
+    compile_catalog,
+)
 
-from core.utils import run_command
+# the language of the messages in the sources, without a catalog
+SOURCE_LANGUAGE = "en"
 
 
 class Command(BaseCommand):
-    help = "Creates all messages in every supported language."
+    help = "Creates all messages in every supported language, only for the sources and catalogs that changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Parallel processes")
+        parser.add_argument("--force", action="store_true", help="Extract and compile everything, changed or not")
 
     def handle(self, *args, **options):
+        locale_dir = settings.LOCALE_PATHS[0]
         # The languages supported by your app, defined in your settings file.
-        languages = settings.LANGUAGES
+        languages = [lang for lang, _ in settings.LANGUAGES if lang != SOURCE_LANGUAGE]
+        manifest = {} if options["force"] else load_manifest(locale_dir)
 
-        for lang, _ in languages:
-            self.stdout.write(self.style.SUCCESS(f"Processing language: {lang}"))
-            run_command(f"python manage.py makemessages -d django -l {lang}")
-            run_command(f"python manage.py makemessages -d djangojs -l {lang}")
+        # one scan of the sources per domain, for all the languages, the domains in parallel
+        sources_hashes = {domain: get_sources_hash(settings.BASE_DIR, domain) for domain in DOMAIN_EXTENSIONS}
+        plan = plan_extraction(locale_dir, languages, sources_hashes, manifest)
+        if plan:
+            with ProcessPoolExecutor(max_workers=min(options["workers"], len(plan))) as executor:
+                for domain in executor.map(extract_messages, plan, plan.values()):
+                    self.stdout.write(self.style.SUCCESS(f"Extracted {domain}: {', '.join(plan[domain])}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("Sources unchanged"))
+        manifest["sources"] = sources_hashes
 
         # Removing english locale directory if exists
-        en_dir = os.path.join(settings.BASE_DIR, "locale", "en")
+        en_dir = os.path.join(locale_dir, SOURCE_LANGUAGE)
         if os.path.exists(en_dir):
-            # remove recursively
-            os.system(f"rm -rf {en_dir}")
+            shutil.rmtree(en_dir)
+
+        # compile messages, only the catalogs that changed
+        catalogs = get_catalogs(locale_dir, languages)
+        changed = plan_compilation(locale_dir, catalogs, manifest)
+        self.stdout.write(self.style.SUCCESS(f"Compiling {len(changed)} of {len(catalogs)} catalogs..."))
+        if changed:
+            with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+                list(executor.map(compile_catalog, changed))
+        manifest["catalogs"] = get_catalog_hashes(locale_dir, catalogs)
+        save_manifest(locale_dir, manifest)
 
-        # compile messages
-        self.stdout.write(self.style.SUCCESS("Compiling messages..."))
-        call_command("compilemessages")
+        # cached page fragments hold translated text
+        if changed:
+            bump_shell_version()
 
         self.stdout.write(
             self.style.SUCCESS("All messages created and translated successfully.")
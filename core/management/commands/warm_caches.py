@@ -0,0 +1,17 @@
+"""Load every model version in the cache shared by the workers.
+
+    python manage.py warm_caches
+
+Run by deploy once the production settings are in place, the first requests
+after a restart find the versions without a query.
+"""
+from django.core.management.base import BaseCommand
+
+from core.deploy import warm_version_caches
+
+
+class Command(BaseCommand):
+    help = "Load the model versions in the shared cache"
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{warm_version_caches()} versions cached")
@@ -0,0 +1,147 @@
+# ----- Django imports --------------------------------------------------------
+from django.db import transaction
+from django.db.models import Prefetch
+
+# ----- Core imports ----------------------------------------------------------
+from .models import Exam, JS, Member, MemberRow, Membership, Role
+
+# The member lists and the search read MemberRow, one row per member holding
+# what they show of its current membership, club, roles, exams and J+S. The
+# signals write the row again whenever one of them changes, listing the
+# members costs one query on one table.
+
+# the fields written, all but the member
+ROW_FIELDS = [
+    "name",
+    "surname",
+    "house_number",
+    "street",
+    "city",
+    "zip_code",
+    "date_of_birth",
+    "nationality",
+    "affiliation_year",
+    "photo_url",
+    "club",
+    "club_name",
+    "full_license_no",
+    "roles",
+    "exams",
+    "js",
+]
+
+
+# ---- Rows -------------------------------------------------------------------
+def get_row_members(member_ids):
+    """The members of the ids, with what their rows show, in one query per table."""
+    return Member.objects.filter(pk__in=member_ids).prefetch_related(
+        Prefetch("roles", queryset=Role.objects.order_by("pk")),
+        Prefetch("exams", queryset=Exam.objects.order_by("pk")),
+        Prefetch("js", queryset=JS.objects.order_by("pk")),
+        Prefetch(
+            "membership_set",
+            queryset=Membership.objects.filter(transfer_date__isnull=True).select_related("club").order_by("pk"),
+            to_attr="current_memberships",
+        ),
+    )
+
+
+def get_member_row(member):
+    membership = member.current_memberships[0] if member.current_memberships else None
+    return MemberRow(
+        member=member,
+        name=member.name,
+        surname=member.surname,
+        house_number=member.house_number,
+        street=member.street,
+        city=member.city,
+        zip_code=member.zip_code,
+        date_of_birth=member.date_of_birth,
+        nationality=member.nationality,
+        affiliation_year=member.affiliation_year,
+        photo_url=member.photo.url if member.photo else "",
+        club=membership.club if membership else None,
+        club_name=membership.club.name if membership else "",
+        full_license_no=membership.full_license_no if membership else "",
+        roles=", ".join(str(role) for role in member.roles.all()),
+        exams=", ".join(str(exam) for exam in member.exams.all()),
+        js=", ".join(str(js) for js in member.js.all()),
+    )
+
+
+def refresh_member_rows(member_ids):
+    """Write the rows of the members again, the ones of members deleted meanwhile are deleted."""
+    member_ids = set(member_ids)
+    if not member_ids:
+        return
+
+    members = list(get_row_members(member_ids))
+    gone = member_ids - {member.pk for member in members}
+
+    with transaction.atomic():
+        if gone:
+            MemberRow.objects.filter(pk__in=gone).delete()
+        MemberRow.objects.bulk_create(
+            [get_member_row(member) for member in members],
+            update_conflicts=True,
+            unique_fields=["member"],
+            update_fields=ROW_FIELDS,
+        )
+
+
+def refresh_member_rows_on_commit(member_ids):
+    # the member may be deleted in the same transaction, its row with it
+    member_ids = list(member_ids)
+    transaction.on_commit(lambda: refresh_member_rows(member_ids))
+
+
+def iter_member_id_batches(batch_size):
+    last_pk = 0
+    while True:
+        member_ids = list(
+            Member.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not member_ids:
+            return
+
+        yield member_ids
+        last_pk = member_ids[-1]
+
+
+def rebuild_member_rows(batch_size=500):
+    """Write the row of every member again, returns the number of members."""
+    count = 0
+    for member_ids in iter_member_id_batches(batch_size):
+        refresh_member_rows(member_ids)
+        count += len(member_ids)
+
+    # the rows of the members deleted softly
+    MemberRow.objects.filter(member__deleted_at__isnull=False).delete()
+    return count
+
+
+# ---- Consistency ------------------------------------------------------------
+def get_row_values(row):
+    return [getattr(row, "club_id" if field == "club" else field) for field in ROW_FIELDS]
+
+
+def check_member_rows(batch_size=500):
+    """Compare the rows with their members, returns the ids of the members whose row is wrong.
+
+    `missing` have no row, `stale` a row that differs, `orphaned` a row while
+    they are deleted.
+    """
+    problems = {"missing": [], "stale": [], "orphaned": []}
+
+    for member_ids in iter_member_id_batches(batch_size):
+        rows = MemberRow.objects.in_bulk(member_ids)
+        for member in get_row_members(member_ids):
+            if member.pk not in rows:
+                problems["missing"].append(member.pk)
+            elif get_row_values(rows[member.pk]) != get_row_values(get_member_row(member)):
+                problems["stale"].append(member.pk)
+
+    problems["orphaned"] = list(
+        MemberRow.objects.filter(member__deleted_at__isnull=False).order_by("pk").values_list("pk", flat=True)
+    )
+    return problems
@@ -0,0 +1,62 @@
+# ----- Django imports --------------------------------------------------------
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# ----- Core imports ----------------------------------------------------------
+from .constants import PRIMARY_STICKY_COOKIE, SAFE_METHODS
+from .routers import read_from_replica, reset_read_from_replica
+
+
+# ---- Read replica -------------------------------------------------------------
+class ReplicaRoutingMiddleware:
+    """Route the reads of the read only requests to the replica database.
+
+    After a request that may write (POST, ...), the client reads from the
+    primary for REPLICA_STICKY_SECONDS, so that it sees its own writes before
+    the replica has caught up.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = read_from_replica(self.is_read_only(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_from_replica(token)
+
+        return self.process_response(request, response)
+
+    async def __acall__(self, request):
+        token = read_from_replica(self.is_read_only(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_from_replica(token)
+
+        return self.process_response(request, response)
+
+    @staticmethod
+    def is_read_only(request):
+        return request.method in SAFE_METHODS and PRIMARY_STICKY_COOKIE not in request.COOKIES
+
+    @staticmethod
+    def process_response(request, response):
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PRIMARY_STICKY_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_STICKY_SECONDS", 10),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -1,10 +1,12 @@
 # ----- Django imports --------------------------------------------------------
+from asgiref.sync import sync_to_async
 from django.contrib.auth.mixins import AccessMixin
 from django.http import HttpResponseForbidden
 from django.utils.translation import gettext_lazy as _
 
 # ----- Core Imports ----------------------------------------------------------
 from .enums import GroupEnum
+from .utils import get_user_group_names, aget_user_group_names
 
 
 # ---- Messages ----------------------------------------------------------------
@@ -13,37 +15,72 @@ NOT_HAVE_PERMISSION_TO_VIEW_PAGE_ERROR_MESSAGE = _(
 )
 
 
+# ----- Utils ------------------------------------------------------------------
+async def aget_request_user(request):
+    """Return the request user, loading it without blocking the event loop.
+
+    The session and user lookups behind `request.user` are synchronous.
+    """
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
 # ----- mixin for views --------------------------------------------------------
 class AdminLoginRequiredMixin(AccessMixin):
     """Makes sure that the user is logged in and is a FSTB admin or a club admin."""
 
     def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.async_dispatch(request, *args, **kwargs)
+
         if not request.user.is_authenticated:
             return self.handle_no_permission()
 
-        is_fstb_admin = request.user.groups.filter(
-            name=GroupEnum.FSTB_ADMIN.value
-        ).exists()
-        is_club_admin = request.user.groups.filter(
-            name=GroupEnum.CLUB_ADMIN.value
-        ).exists()
+        group_names = get_user_group_names(request.user)
+        is_fstb_admin = GroupEnum.FSTB_ADMIN.value in group_names
+        is_club_admin = GroupEnum.CLUB_ADMIN.value in group_names
 
         if not is_fstb_admin and not is_club_admin:
             return HttpResponseForbidden(NOT_HAVE_PERMISSION_TO_VIEW_PAGE_ERROR_MESSAGE)
         return super().dispatch(request, *args, **kwargs)
 
+    async def async_dispatch(self, request, *args, **kwargs):
+        user = await aget_request_user(request)
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+
+        group_names = await aget_user_group_names(user)
+        is_fstb_admin = GroupEnum.FSTB_ADMIN.value in group_names
+        is_club_admin = GroupEnum.CLUB_ADMIN.value in group_names
+
+        if not is_fstb_admin and not is_club_admin:
+            return HttpResponseForbidden(NOT_HAVE_PERMISSION_TO_VIEW_PAGE_ERROR_MESSAGE)
+        return await super().dispatch(request, *args, **kwargs)
+
 
 class FstbAdminLoginRequiredMixin(AccessMixin):
     """Makes sure that the user is logged in and is a FSTB admin."""
 
     def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self.async_dispatch(request, *args, **kwargs)
+
         if not request.user.is_authenticated:
             return self.handle_no_permission()
 
-        is_fstb_admin = request.user.groups.filter(
-            name=GroupEnum.FSTB_ADMIN.value
-        ).exists()
+        is_fstb_admin = GroupEnum.FSTB_ADMIN.value in get_user_group_names(request.user)
 
         if not is_fstb_admin:
             return HttpResponseForbidden(NOT_HAVE_PERMISSION_TO_VIEW_PAGE_ERROR_MESSAGE)
         return super().dispatch(request, *args, **kwargs)
+
+    async def async_dispatch(self, request, *args, **kwargs):
+        user = await aget_request_user(request)
+        if not user.is_authenticated:
+            return self.handle_no_permission()
+
+        is_fstb_admin = GroupEnum.FSTB_ADMIN.value in await aget_user_group_names(user)
+
+        if not is_fstb_admin:
+            return HttpResponseForbidden(NOT_HAVE_PERMISSION_TO_VIEW_PAGE_ERROR_MESSAGE)
+        return await super().dispatch(request, *args, **kwargs)
@@ -1,23 +1,89 @@
 # ----- Django imports -------------------------------------------------------------
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, FileExtensionValidator
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.datetime_safe import date
 from django.utils.translation import gettext_lazy as _
 
 from gafst import settings
 
 # ----- Core imports ---------------------------------------------------------------
+from .changes import get_changed_field_labels
 from .enums import RoleEnum, JSEnum, ExamEnum, ChangeModelStatus, CompetitionRegistrationStatus, CompetitionStatus, \
-    RuleCondition, RuleOption
-from .utils import is_license_no_unique_within_club
+    RuleCondition, RuleOption, JobStatus
+from .utils import is_license_no_unique_within_club, is_user_club_admin, is_user_fstb_admin, calculate_age
 from .validators import BirthdateValidator, validate_image_size
+from .versions import VersionedQuerySet
 
 
 # id field is automatically added by Django, if no primary key is defined
 
 
+# ---- Club scoping ----------------------------------------------------------------
+class ClubScopedQuerySet(VersionedQuerySet):
+    """The rows of a model owned by a club, the model's `club_field` leading to it."""
+
+    def for_user(self, user):
+        """The rows the user administrates: all of them for a FSTB admin, the ones of their club for a club admin.
+
+        The club is found by a subquery on the user's membership, joined in the
+        same query, instead of being loaded first.
+        """
+        if is_user_fstb_admin(user):
+            return self
+        if not is_user_club_admin(user):
+            return self.none()
+
+        # the club of their current membership, not the ones they left
+        club = models.Subquery(
+            Club.objects.filter(membership__member__user=user, membership__transfer_date__isnull=True)
+            .order_by("pk")
+            .values("pk")[:1]
+        )
+        return self.filter(self.get_club_filter(club))
+
+    def get_club_filter(self, club):
+        return models.Q(**{self.model.club_field: club})
+
+
+class MemberQuerySet(ClubScopedQuerySet):
+    def get_club_filter(self, club):
+        # only the current membership, with the same join
+        return models.Q(membership__club=club, membership__transfer_date__isnull=True)
+
+
+# ---- Soft deletion ---------------------------------------------------------------
+class AliveManager(models.Manager):
+    """The rows not deleted, nor owned by a deleted row.
+
+    The default manager of the models deleted softly and of the models whose
+    rows go with them, the model's `alive_lookups` leading to the flags.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**{f"{lookup}__isnull": True for lookup in self.model.alive_lookups})
+
+
+class SoftDeleteModel(models.Model):
+    """A model whose rows are only flagged when deleted, and purged later, see core/trash.py
+
+    `objects` hides the flagged rows, `all_objects` has them all.
+    """
+
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False, db_index=True)
+    deleted_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name="+"
+    )
+
+    alive_lookups = ["deleted_at"]
+
+    class Meta:
+        abstract = True
+
+
 # ---- PermissionsSupport ----------------------------------------------------------
 class PermissionsSupport(models.Model):
     """This model is used to add permissions to the User model"""
@@ -66,6 +132,10 @@ class BaseMember(models.Model):
     exams = models.ManyToManyField("Exam", blank=True, verbose_name=_("exams"))
     js = models.ManyToManyField("JS", blank=True, verbose_name=_("js"))
 
+    objects = VersionedQuerySet.as_manager()
+
+    versioned_by_club = True
+
     class Meta:
         abstract = True
 
@@ -83,12 +153,13 @@ class BaseMember(models.Model):
         return f"{self.name} {self.surname}"
 
 
-class Member(BaseMember):
-    pass
+class Member(SoftDeleteModel, BaseMember):
+    objects = AliveManager.from_queryset(MemberQuerySet)()
+    all_objects = MemberQuerySet.as_manager()
 
 
 # ---- Club -------------------------------------------------------------------------
-class Club(models.Model):
+class Club(SoftDeleteModel):
     name = models.CharField(max_length=100, verbose_name=_("name"))
     affiliation_year = models.PositiveIntegerField(verbose_name=_("affiliation year"))
     license_no = models.PositiveIntegerField(
@@ -106,13 +177,19 @@ class Club(models.Model):
         Member, through="Membership", verbose_name=_("members")
     )
 
+    objects = AliveManager.from_queryset(VersionedQuerySet)()
+    all_objects = VersionedQuerySet.as_manager()
+
+    versioned_by_club = True
+
     @property
     def full_license_no(self):
         return f"{self.license_no:02d}-000"
 
     @classmethod
     def remaining_license_no(cls):
-        used_license_nos = Club.objects.values_list("license_no", flat=True)
+        # the license number of a deleted club is free once it is purged
+        used_license_nos = Club.all_objects.values_list("license_no", flat=True)
         remaining_license_numbers = set(range(1, 100)) - set(used_license_nos)
         remaining_license_numbers = [
             (num, f"{str(num).zfill(2)}-000") for num in remaining_license_numbers
@@ -140,6 +217,14 @@ class Team(models.Model):
     club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True)
     description = models.TextField(max_length=10000, verbose_name=_("description"), null=True)
 
+    objects = AliveManager.from_queryset(ClubScopedQuerySet)()
+    all_objects = ClubScopedQuerySet.as_manager()
+
+    versioned_by_club = True
+    club_field = "club"
+    # hidden while the club is deleted
+    alive_lookups = ["club__deleted_at"]
+
     def __str__(self):
         return self.name
 
@@ -163,6 +248,11 @@ class BaseMembership(models.Model):
         null=True, blank=True, verbose_name=_("transfer date")
     )
 
+    objects = ClubScopedQuerySet.as_manager()
+
+    versioned_by_club = True
+    club_field = "club"
+
     class Meta:
         abstract = True
 
@@ -172,7 +262,7 @@ class BaseMembership(models.Model):
 
     @classmethod
     def remaining_license_no(cls):
-        used_license_nos = Membership.objects.values_list("license_no", flat=True)
+        used_license_nos = Membership.all_objects.values_list("license_no", flat=True)
         remaining_license_numbers = set(range(1, 999)) - set(used_license_nos)
         remaining_license_numbers = [
             (num, f"01-{str(num).zfill(3)}") for num in remaining_license_numbers
@@ -195,13 +285,19 @@ class BaseMembership(models.Model):
 
 
 class Membership(BaseMembership):
-    pass
+    objects = AliveManager.from_queryset(ClubScopedQuerySet)()
+    all_objects = ClubScopedQuerySet.as_manager()
+
+    # hidden while the club or the member is deleted
+    alive_lookups = ["club__deleted_at", "member__deleted_at"]
 
 
 # ---- Role ----------------------------------------------------------------------
 class Role(models.Model):
     name = models.CharField(max_length=50, verbose_name=_("name"))
 
+    objects = VersionedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -216,6 +312,8 @@ class Exam(models.Model):
         verbose_name=_("name"),
     )
 
+    objects = VersionedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -229,6 +327,8 @@ class JS(models.Model):
         verbose_name=_("name"),
     )
 
+    objects = VersionedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -263,7 +363,7 @@ class ChangeModel(models.Model):
         abstract = True
 
 
-class MemberChange(BaseMember, ChangeModel):
+class MemberChange(ChangeModel):
     member = models.ForeignKey(
         Member,
         on_delete=models.CASCADE,
@@ -271,12 +371,34 @@ class MemberChange(BaseMember, ChangeModel):
         null=True,
         blank=True,
     )
+    # only the changed fields, see core.changes
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # set only when the change uploads a new photo
+    photo = models.ImageField(
+        upload_to=settings.MEMBERS_PHOTOS_DIR,
+        verbose_name=_("photo"),
+        blank=True,
+        null=True,
+    )
+
+    objects = VersionedQuerySet.as_manager()
 
     @property
     def current_membership(self):
         return MembershipChange.objects.filter(member=self).first()
 
-    pass
+    def get_value(self, name):
+        """Return the new value of the field, or the current one if it isn't changed."""
+        if name in self.changes:
+            return self.changes[name]
+        return getattr(self.member, name) if self.member else None
+
+    @property
+    def changed_field_labels(self):
+        return get_changed_field_labels(self.changes)
+
+    def __str__(self):
+        return f"{self.get_value('name')} {self.get_value('surname')}"
 
 
 class MembershipChange(BaseMembership, ChangeModel):
@@ -299,8 +421,90 @@ class MembershipChange(BaseMembership, ChangeModel):
     pass
 
 
+# ---- Archive ----------------------------------------------------------------------
+# Closed memberships and processed changes are moved here by the archive_history
+# command (see core/archive.py), to keep the live tables small
+class ArchiveModel(models.Model):
+    original_id = models.PositiveIntegerField(db_index=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = VersionedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedMembership(ArchiveModel):
+    member = models.ForeignKey(
+        Member, on_delete=models.CASCADE, related_name="archived_memberships"
+    )
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="+")
+    license_no = models.PositiveIntegerField(verbose_name=_("license number"))
+    transfer_date = models.DateField(
+        null=True, blank=True, verbose_name=_("transfer date")
+    )
+
+    versioned_by_club = True
+
+    @property
+    def full_license_no(self):
+        return f"{self.club.license_no:02d}-{self.license_no:03d}"
+
+    def __str__(self):
+        return f"{self.member} - {self.club}"
+
+
+class ArchivedChangeModel(ArchiveModel):
+    applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    responder = models.ForeignKey(
+        User, on_delete=models.CASCADE, blank=True, null=True, related_name="+"
+    )
+    status = models.CharField(max_length=10, choices=ChangeModelStatus.choices())
+    created_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedMemberChange(ArchivedChangeModel):
+    member = models.ForeignKey(
+        Member,
+        on_delete=models.CASCADE,
+        related_name="archived_member_changes",
+        null=True,
+        blank=True,
+    )
+    changes = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    photo = models.ImageField(
+        upload_to=settings.MEMBERS_PHOTOS_DIR, blank=True, null=True
+    )
+
+    @property
+    def changed_field_labels(self):
+        return get_changed_field_labels(self.changes)
+
+
+class ArchivedMembershipChange(ArchivedChangeModel):
+    # ids of the live rows, that may be archived too
+    membership_original_id = models.PositiveIntegerField(null=True, blank=True)
+    member_change_original_id = models.PositiveIntegerField(null=True, blank=True)
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, related_name="+")
+    license_no = models.PositiveIntegerField(verbose_name=_("license number"))
+    transfer_date = models.DateField(
+        null=True, blank=True, verbose_name=_("transfer date")
+    )
+
+    versioned_by_club = True
+
+
 # ---- Competition -------------------------------------------------------------------
-class Competition(models.Model):
+class CompetitionQuerySet(VersionedQuerySet):
+    def open(self):
+        """The competitions still open to registrations, even before the lifecycle command closed them."""
+        return self.filter(status=CompetitionStatus.OPEN.value, due_date__gt=timezone.now())
+
+
+class Competition(SoftDeleteModel):
     name = models.CharField(max_length=100, verbose_name=_("name"))
     due_date = models.DateTimeField(default=date.today, verbose_name=_("due_date"))
     creation_date = models.DateField(default=date.today, verbose_name=_("creation_date"))
@@ -313,6 +517,12 @@ class Competition(models.Model):
     )
     description = models.TextField(max_length=10000, verbose_name=_("description"), null=True)
 
+    objects = AliveManager.from_queryset(CompetitionQuerySet)()
+    all_objects = CompetitionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "due_date"])]
+
     def __str__(self):
         return self.name
 
@@ -325,6 +535,12 @@ class Discipline(models.Model):
     max_members_number = models.IntegerField(default=6, verbose_name=_("max_members_number"), null=True)
     competition = models.ForeignKey(Competition, on_delete=models.CASCADE, null=True)
 
+    objects = AliveManager.from_queryset(VersionedQuerySet)()
+    all_objects = VersionedQuerySet.as_manager()
+
+    # hidden while the competition is deleted
+    alive_lookups = ["competition__deleted_at"]
+
     def __str__(self):
         return self.name
 
@@ -337,6 +553,12 @@ class Division(models.Model):
     year_rules = models.ManyToManyField("YearRule", blank=True, verbose_name=_("year_rules"))
     discipline = models.ForeignKey(Discipline, on_delete=models.CASCADE, null=True)
 
+    objects = AliveManager.from_queryset(VersionedQuerySet)()
+    all_objects = VersionedQuerySet.as_manager()
+
+    # hidden while the competition is deleted
+    alive_lookups = ["discipline__competition__deleted_at"]
+
     def __str__(self):
         return self.name
 
@@ -357,8 +579,13 @@ class YearRule(models.Model):
         verbose_name=_("condition"),
     )
     value = models.FloatField(verbose_name=_("value"))
+    # the ages counted by the YEAR_BAND_COUNT option, bounds included
+    band_min = models.FloatField(null=True, blank=True, verbose_name=_("band_min"))
+    band_max = models.FloatField(null=True, blank=True, verbose_name=_("band_max"))
     description = models.TextField(max_length=10000, verbose_name=_("description"), null=True)
 
+    objects = VersionedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -380,13 +607,181 @@ class CompetitionRegistration(models.Model):
 
     club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True)
 
+    objects = AliveManager.from_queryset(ClubScopedQuerySet)()
+    all_objects = ClubScopedQuerySet.as_manager()
+
+    versioned_by_club = True
+    # the club of the team, as the registration lists always did
+    club_field = "team__club"
+    # hidden while the competition or the club is deleted
+    alive_lookups = ["competition__deleted_at", "club__deleted_at", "team__club__deleted_at"]
+
+
+# ---- Registration counts -----------------------------------------------------------
+class RegistrationCount(models.Model):
+    """The number of registrations of a dashboard cell, see core/dashboard.py"""
+
+    competition = models.ForeignKey(Competition, on_delete=models.CASCADE, null=True)
+    discipline = models.ForeignKey(Discipline, on_delete=models.CASCADE, null=True)
+    division = models.ForeignKey(Division, on_delete=models.CASCADE, null=True)
+    club = models.ForeignKey(Club, on_delete=models.CASCADE, null=True)
+    status = models.CharField(max_length=50, choices=CompetitionRegistrationStatus.choices())
+    count = models.PositiveIntegerField(default=0)
+
+    # updated on every registration change, the lists don't depend on it
+    versioned = False
+
+    class Meta:
+        unique_together = ["competition", "discipline", "division", "club", "status"]
+
+    def __str__(self):
+        return f"{self.competition} {self.discipline} {self.division} {self.club} {self.status}: {self.count}"
+
+
+# ---- Search ------------------------------------------------------------------------
+class MemberSearchTerm(models.Model):
+    """A normalized word a member is found by, or the word without one letter, see core/search.py"""
+
+    member = models.ForeignKey(
+        Member, on_delete=models.CASCADE, related_name="search_terms"
+    )
+    term = models.CharField(max_length=150)
+    is_deletion = models.BooleanField(default=False)
+
+    # rewritten on every change of the member, the lists don't depend on it
+    versioned = False
+
+    class Meta:
+        indexes = [models.Index(fields=["term", "is_deletion"])]
+
+    def __str__(self):
+        return self.term
+
+
+# ---- Member rows -------------------------------------------------------------------
+class MemberRow(models.Model):
+    """A member as listed, with its club, license number, roles, exams and J+S, see core/member_rows.py"""
+
+    member = models.OneToOneField(Member, on_delete=models.CASCADE, primary_key=True, related_name="row")
+    name = models.CharField(max_length=150)
+    surname = models.CharField(max_length=150)
+    house_number = models.CharField(max_length=50)
+    street = models.CharField(max_length=100)
+    city = models.CharField(max_length=100)
+    zip_code = models.CharField(max_length=20)
+    date_of_birth = models.DateField()
+    nationality = models.CharField(max_length=2)
+    affiliation_year = models.PositiveIntegerField()
+    photo_url = models.CharField(max_length=255, blank=True, default="")
+
+    # the current membership
+    club = models.ForeignKey(Club, on_delete=models.SET_NULL, null=True, related_name="+")
+    club_name = models.CharField(max_length=100, blank=True, default="")
+    full_license_no = models.CharField(max_length=6, blank=True, default="")
+
+    roles = models.CharField(max_length=500, blank=True, default="")
+    exams = models.CharField(max_length=500, blank=True, default="")
+    js = models.CharField(max_length=500, blank=True, default="")
+
+    objects = ClubScopedQuerySet.as_manager()
+
+    club_field = "club"
+    # rewritten on every change of its sources, whose versions the lists depend on
+    versioned = False
+
+    class Meta:
+        indexes = [models.Index(fields=["club", "surname", "name"])]
+
+    @property
+    def age(self):
+        # computed, the stored age would be wrong from the next birthday on
+        return calculate_age(self.date_of_birth)
+
+    @property
+    def has_club_membership(self):
+        return self.club_id is not None
+
+    def __str__(self):
+        return f"{self.name} {self.surname}"
+
+
+# ---- Jobs --------------------------------------------------------------------------
+class Job(models.Model):
+    """A heavy operation queued for the job runner, see core/jobs.py"""
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # a job isn't queued again while one with the same name and key is waiting or running
+    key = models.CharField(max_length=255, blank=True, default="")
+    # the name and key while waiting or running, None once finished: the unique
+    # index refuses a second queued job, on MySQL as on SQLite
+    queued_key = models.CharField(max_length=356, null=True, blank=True, unique=True, editable=False)
+    status = models.CharField(
+        max_length=50,
+        choices=JobStatus.choices(),
+        default=JobStatus.PENDING.value,
+    )
+    progress = models.PositiveSmallIntegerField(default=0)
+    message = models.CharField(max_length=255, blank=True, default="")
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+
+    # updated while running, the lists don't depend on it
+    versioned = False
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_at"]),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in (JobStatus.DONE.value, JobStatus.FAILED.value)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
+
+
+# ---- Versions ----------------------------------------------------------------------
+class ModelVersion(models.Model):
+    """The versions, mirrored in the cache for the readers, see core/versions.py"""
+
+    key = models.CharField(max_length=255, unique=True)
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.key}: {self.version}"
+
 
 # ---- Functions -------------------------------------------------------------------
 def get_remaining_memberships_by_club(club):
-    club_license_no = club.license_no
-    used_club_membership_license_nos = Membership.objects.filter(
+    # the numbers of the deleted members stay taken until they are purged
+    used_club_membership_license_nos = Membership.all_objects.filter(
         club=club, transfer_date__isnull=True
     ).values_list("license_no", flat=True)
+    return get_license_no_choices(club, used_club_membership_license_nos)
+
+
+async def aget_remaining_memberships_by_club(club):
+    used_club_membership_license_nos = [
+        license_no
+        async for license_no in Membership.all_objects.filter(
+            club=club, transfer_date__isnull=True
+        ).values_list("license_no", flat=True)
+    ]
+    return get_license_no_choices(club, used_club_membership_license_nos)
+
+
+def get_license_no_choices(club, used_club_membership_license_nos):
+    club_license_no = club.license_no
     remaining_club_membership_license_nos = set(range(1, 999)) - set(
         used_club_membership_license_nos
     )
@@ -0,0 +1,67 @@
+# ----- Django imports --------------------------------------------------------
+from django.db import transaction
+from django.utils.translation import gettext as _
+
+# ----- Core imports ----------------------------------------------------------
+from .dashboard import rebuild_registration_counts
+from .enums import CompetitionRegistrationStatus
+from .models import CompetitionRegistration
+
+
+# ---- Bulk registration ------------------------------------------------------
+def get_matrix_cells(matrix):
+    """Return the (team, discipline, division, errors) of every cell of the eligibility matrix, by key."""
+    return {
+        cell["key"]: (row["team"], column["discipline"], column["division"], cell["errors"])
+        for row in matrix["rows"]
+        for column, cell in zip(matrix["columns"], row["cells"])
+    }
+
+
+def register_teams(competition, matrix, keys, status=CompetitionRegistrationStatus.REGISTERED.value):
+    """Register the cells of the eligibility matrix, returns one result per key.
+
+    The rules were checked for every cell by the matrix, a team breaking one is
+    registered as a draft. The registrations are inserted with one query.
+    """
+    cells = get_matrix_cells(matrix)
+    registered = set(
+        CompetitionRegistration.objects.filter(
+            competition=competition, team__in=[row["team"] for row in matrix["rows"]]
+        ).values_list("team_id", "discipline_id", "division_id")
+    )
+
+    results = []
+    registrations = []
+    for key in dict.fromkeys(keys):
+        if key not in cells:
+            continue
+
+        team, discipline, division, errors = cells[key]
+        result = {"team": team, "discipline": discipline, "division": division, "errors": errors}
+        results.append(result)
+
+        if (team.pk, discipline.pk, division.pk if division else None) in registered:
+            result["status"] = None
+            result["errors"] = [_("Already registered")]
+            continue
+
+        result["status"] = CompetitionRegistrationStatus.DRAFT.value if errors else status
+        registrations.append(
+            CompetitionRegistration(
+                competition=competition,
+                discipline=discipline,
+                division=division,
+                team=team,
+                club_id=team.club_id,
+                status=result["status"],
+            )
+        )
+
+    if registrations:
+        with transaction.atomic():
+            CompetitionRegistration.objects.bulk_create(registrations)
+            # the inserts don't send the signals counting the registrations
+            rebuild_registration_counts([competition])
+
+    return results
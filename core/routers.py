@@ -0,0 +1,71 @@
+# ----- generic imports ---------------------------------------------------------
+from contextvars import ContextVar
+
+# ----- Django imports --------------------------------------------------------
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# ---- Read replica -------------------------------------------------------------
+# set by ReplicaRoutingMiddleware for the read only requests, the queries run
+# outside of a request (commands, shell, jobs) always use the primary
+_read_from_replica = ContextVar("read_from_replica", default=False)
+
+# models always read from the primary: the versions, the users and their
+# groups and permissions are cached by every process, a value read from a
+# lagging replica would stay in the cache
+PRIMARY_ONLY_MODELS = {
+    "core.modelversion",
+    "auth.user",
+    "auth.group",
+    "auth.user_groups",
+    "auth.permission",
+}
+
+
+def get_replica_alias():
+    """Return the alias of the replica, None if it's not configured."""
+    alias = getattr(settings, "REPLICA_DATABASE_ALIAS", None)
+    return alias if alias in connections.settings else None
+
+
+def read_from_replica(enabled):
+    """Route the reads of the current context to the replica, or not.
+
+    Return a token for `reset_read_from_replica`.
+    """
+    return _read_from_replica.set(enabled)
+
+
+def reset_read_from_replica(token):
+    _read_from_replica.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """Send the reads of read only requests to the replica, everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        replica = get_replica_alias()
+        if (
+            replica is None
+            or not _read_from_replica.get()
+            or model._meta.label_lower in PRIMARY_ONLY_MODELS
+        ):
+            return DEFAULT_DB_ALIAS
+
+        return replica
+
+    def db_for_write(self, model, **hints):
+        # read what has just been written for the rest of the request
+        _read_from_replica.set(False)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica gets the schema through the replication
+        if db == get_replica_alias():
+            return False
+        return None
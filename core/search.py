@@ -0,0 +1,192 @@
+# ----- generic imports ---------------------------------------------------------
+import re
+import unicodedata
+
+# ----- Django imports --------------------------------------------------------
+from django.db import transaction
+from django.db.models import Q
+
+# ----- Core imports ----------------------------------------------------------
+from .models import Member, Membership, MemberSearchTerm
+
+
+# ---- Normalization ----------------------------------------------------------
+# Names are indexed and searched lowercase and without accents, "Müller" being
+# found by "muller", and by "mueller" as written without a german keyboard.
+GERMAN_TRANSLITERATIONS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue"})
+# words, license numbers like "01-023" are kept as one word
+WORD_RE = re.compile(r"[0-9a-z]+(?:-[0-9a-z]+)*")
+
+# words long enough to be found with a typo, shorter ones only by prefix
+MIN_FUZZY_WORD_LENGTH = 4
+
+
+def strip_accents(text):
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFKD", text)
+        if not unicodedata.combining(char)
+    )
+
+
+def normalize(text):
+    return strip_accents(str(text).casefold())
+
+
+def get_words(text):
+    return WORD_RE.findall(normalize(text))
+
+
+def get_deletions(word):
+    """Return the word without one of its letters, each way.
+
+    Two words one typo apart (a letter added, removed, replaced or two letters
+    swapped) share the word itself or one of these, so the typos are found by
+    equality on the indexed terms.
+    """
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def get_prefix_range(word):
+    """Return the bounds of the words starting with the word, for a range scan.
+
+    The range is closed only when the last letter can be increased without
+    leaving the letters or the digits, the same in every collation.
+    """
+    last = word[-1]
+    if last in "abcdefghijklmnopqrstuvwxy012345678":
+        return word, word[:-1] + chr(ord(last) + 1)
+    return word, None
+
+
+# ---- Index ------------------------------------------------------------------
+def get_member_words(member, memberships=None):
+    """Return the normalized words a member is found by."""
+    text = " ".join(
+        [member.name, member.surname, member.city, member.zip_code]
+    ).casefold()
+    words = set(get_words(text))
+    words.update(get_words(text.translate(GERMAN_TRANSLITERATIONS)))
+
+    if memberships is None:
+        memberships = member.membership_set.filter(transfer_date__isnull=True).select_related("club")
+    for membership in memberships:
+        license_no = membership.full_license_no
+        words.update([license_no, license_no.replace("-", "")])
+
+    return words
+
+
+def get_member_terms(member, memberships=None):
+    terms = []
+    for word in get_member_words(member, memberships):
+        terms.append(MemberSearchTerm(member=member, term=word))
+
+        if len(word) >= MIN_FUZZY_WORD_LENGTH:
+            terms += [
+                MemberSearchTerm(member=member, term=deletion, is_deletion=True)
+                for deletion in get_deletions(word) - {word}
+            ]
+
+    return terms
+
+
+def index_member(member):
+    """Replace the search terms of the member, after it or its memberships changed."""
+    with transaction.atomic():
+        MemberSearchTerm.objects.filter(member=member).delete()
+        MemberSearchTerm.objects.bulk_create(get_member_terms(member))
+
+
+def index_member_by_id(member_id):
+    member = Member.objects.filter(pk=member_id).first()
+    if member is not None:
+        index_member(member)
+
+
+def index_members(members, batch_size=1000):
+    """Index the members, with one query for the terms of each batch."""
+    members = list(members)
+    memberships = {}
+    for membership in Membership.objects.filter(
+        member__in=members, transfer_date__isnull=True
+    ).select_related("club"):
+        memberships.setdefault(membership.member_id, []).append(membership)
+
+    with transaction.atomic():
+        MemberSearchTerm.objects.filter(member__in=members).delete()
+
+        terms = []
+        for member in members:
+            terms += get_member_terms(member, memberships.get(member.pk, []))
+        MemberSearchTerm.objects.bulk_create(terms, batch_size=batch_size)
+
+
+def rebuild_index(batch_size=1000):
+    """Index every member again, returns the number of members."""
+    count = 0
+    last_pk = 0
+    while True:
+        members = list(Member.objects.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not members:
+            return count
+
+        index_members(members, batch_size)
+        count += len(members)
+        last_pk = members[-1].pk
+
+
+# ---- Search -----------------------------------------------------------------
+def _get_prefix_q(word):
+    start, end = get_prefix_range(word)
+
+    # a range scan of the index on every backend, LIKE isn't one on SQLite
+    if end is None:
+        return Q(is_deletion=False, term__gte=start, term__startswith=word)
+    return Q(is_deletion=False, term__gte=start, term__lt=end)
+
+
+def _get_prefix_terms(word):
+    return MemberSearchTerm.objects.filter(_get_prefix_q(word))
+
+
+def _get_fuzzy_terms(word):
+    if len(word) < MIN_FUZZY_WORD_LENGTH:
+        return _get_prefix_terms(word)
+
+    # the word with a typo shares the word, or the word without a letter
+    variants = get_deletions(word) | {word}
+    return MemberSearchTerm.objects.filter(_get_prefix_q(word) | Q(term__in=variants))
+
+
+def _get_matches(members, words, get_terms, limit, exclude=()):
+    # every word of the query matches a word of the member
+    for word in words:
+        members = members.filter(pk__in=get_terms(word).values("member_id"))
+
+    return list(members.exclude(pk__in=exclude).order_by("surname", "name", "pk")[:limit])
+
+
+def search_members(query, members=None, limit=20):
+    """Return the members matching the query, the prefix matches first, then the ones with typos.
+
+    `members` is the queryset searched, every member by default.
+    """
+    if members is None:
+        members = Member.objects.all()
+
+    words = get_words(query)
+    if not words:
+        return []
+
+    matches = _get_matches(members, words, _get_prefix_terms, limit)
+    if len(matches) < limit:
+        matches += _get_matches(
+            members,
+            words,
+            _get_fuzzy_terms,
+            limit - len(matches),
+            exclude=[member.pk for member in matches],
+        )
+
+    return matches
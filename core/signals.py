@@ -0,0 +1,249 @@
+# ----- Django imports --------------------------------------------------------
+from django.apps import apps
+from django.contrib.auth.models import User, Group
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+# ----- Core imports ----------------------------------------------------------
+from .backends import invalidate_cached_users
+from .cache import bump_shell_version, invalidate_user_shell
+from .dashboard import (
+    get_registration_key,
+    get_stored_registration_key,
+    add_registration_count,
+    move_registration_count,
+)
+from .db.pool import record_connection_checkout, record_connection_created
+from .member_rows import refresh_member_rows, refresh_member_rows_on_commit
+from .models import Club, Member, Membership, ModelVersion, CompetitionRegistration, Role, Exam, JS
+from .search import index_member, index_member_by_id, index_members
+from .versions import bump_model_version
+
+
+# ---- Users cache --------------------------------------------------------------
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_on_user_change(sender, instance, **kwargs):
+    # the password and the active flag are checked on every request
+    invalidate_cached_users(instance.pk)
+    invalidate_user_shell(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_users_on_groups_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        user_ids = [instance.pk]
+    elif action == "pre_clear":
+        # the users of a cleared group are unknown once it's done
+        user_ids = list(instance.user_set.values_list("pk", flat=True))
+    else:
+        user_ids = list(pk_set or [])
+
+    if action in ("post_add", "post_remove", "post_clear", "pre_clear") and user_ids:
+        invalidate_cached_users(*user_ids)
+        invalidate_user_shell(*user_ids)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_users_on_group_change(sender, instance, **kwargs):
+    # the cached users hold their groups
+    user_ids = list(instance.user_set.values_list("pk", flat=True))
+    invalidate_cached_users(*user_ids)
+    invalidate_user_shell(*user_ids)
+
+
+# ---- Shell fragments cache --------------------------------------------------
+
+
+@receiver(post_save, sender=Member)
+def invalidate_shell_on_member_save(sender, instance, **kwargs):
+    invalidate_user_shell(instance.user_id)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_shell_on_membership_change(sender, instance, **kwargs):
+    # the club of the member's user may have changed
+    invalidate_user_shell(
+        Member.objects.filter(pk=instance.member_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Club)
+@receiver(post_delete, sender=Club)
+def invalidate_shell_on_club_change(sender, instance, **kwargs):
+    # the club name is part of the header and sidebar markup
+    bump_shell_version()
+
+
+# ---- Member search -------------------------------------------------------------
+@receiver(post_save, sender=Member)
+def index_member_on_save(sender, instance, **kwargs):
+    index_member(instance)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def index_member_on_membership_change(sender, instance, **kwargs):
+    # the member is found by the license number of its current membership. Once
+    # committed, as the membership may be deleted with the member itself
+    member_id = instance.member_id
+    transaction.on_commit(lambda: index_member_by_id(member_id))
+
+
+@receiver(post_save, sender=Club)
+def index_members_on_club_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "license_no" in update_fields:
+        index_members(
+            Member.objects.filter(
+                membership__club=instance, membership__transfer_date__isnull=True
+            )
+        )
+
+
+# ---- Member rows -------------------------------------------------------------
+@receiver(post_save, sender=Member)
+def refresh_member_row_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_member_rows([instance.pk])
+
+
+@receiver(post_save, sender=Membership)
+def refresh_member_row_on_membership_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_member_rows([instance.member_id])
+
+
+@receiver(post_delete, sender=Membership)
+def refresh_member_row_on_membership_delete(sender, instance, **kwargs):
+    refresh_member_rows_on_commit([instance.member_id])
+
+
+@receiver(post_save, sender=Club)
+def refresh_member_rows_on_club_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_member_rows(
+            Membership.objects.filter(club=instance, transfer_date__isnull=True).values_list("member_id", flat=True)
+        )
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_save, sender=Exam)
+@receiver(post_save, sender=JS)
+def refresh_member_rows_on_label_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_member_rows(instance.member_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Role)
+@receiver(pre_delete, sender=Exam)
+@receiver(pre_delete, sender=JS)
+def refresh_member_rows_on_label_delete(sender, instance, **kwargs):
+    # the members are unknown once it's deleted
+    refresh_member_rows_on_commit(instance.member_set.values_list("pk", flat=True))
+
+
+def refresh_member_rows_on_labels_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            refresh_member_rows([instance.pk])
+    elif action in ("post_add", "post_remove"):
+        refresh_member_rows(pk_set or [])
+    elif action == "pre_clear":
+        # the members of a cleared role are unknown once it's done
+        refresh_member_rows_on_commit(instance.member_set.values_list("pk", flat=True))
+
+
+for labels in (Member.roles, Member.exams, Member.js):
+    m2m_changed.connect(refresh_member_rows_on_labels_change, sender=labels.through)
+
+
+# ---- Registration counts ----------------------------------------------------
+@receiver(pre_save, sender=CompetitionRegistration)
+def remember_registration_key(sender, instance, raw=False, **kwargs):
+    # the cell the registration is counted in before the save
+    instance._stored_registration_key = (
+        None if raw or instance.pk is None else get_stored_registration_key(instance.pk)
+    )
+
+
+@receiver(post_save, sender=CompetitionRegistration)
+def count_registration_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        move_registration_count(
+            getattr(instance, "_stored_registration_key", None), get_registration_key(instance)
+        )
+
+
+@receiver(post_delete, sender=CompetitionRegistration)
+def count_registration_on_delete(sender, instance, **kwargs):
+    add_registration_count(get_registration_key(instance), -1)
+
+
+# ---- Model versions ---------------------------------------------------------
+def get_instance_club_ids(instance):
+    """Return the clubs owning the instance, None if they can't be told."""
+    if isinstance(instance, Club):
+        return [instance.pk]
+
+    if isinstance(instance, Member):
+        # a member without a membership is listed by no club, but outdates
+        # the lists of every club once one takes them
+        club_ids = list(
+            Membership.objects.filter(member_id=instance.pk)
+            .values_list("club_id", flat=True)
+            .distinct()
+        )
+        return club_ids or None
+
+    club_id = getattr(instance, "club_id", None)
+    return [club_id] if club_id is not None else None
+
+
+def bump_version_on_change(sender, instance, **kwargs):
+    bump_model_version(sender, get_instance_club_ids(instance))
+
+
+def bump_versions_on_m2m_change(sender, instance, action, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+
+    bump_model_version(type(instance), get_instance_club_ids(instance))
+    # the related rows changed too, the clubs of every one of them are unknown
+    bump_model_version(model)
+
+
+def connect_model_versions():
+    for core_model in apps.get_app_config("core").get_models():
+        if (
+            not core_model._meta.managed
+            or core_model is ModelVersion
+            or not getattr(core_model, "versioned", True)
+        ):
+            continue
+
+        post_save.connect(bump_version_on_change, sender=core_model)
+        post_delete.connect(bump_version_on_change, sender=core_model)
+
+        for field in core_model._meta.local_many_to_many:
+            m2m_changed.connect(
+                bump_versions_on_m2m_change, sender=field.remote_field.through
+            )
+
+
+connect_model_versions()
+
+
+# ---- Database connections ---------------------------------------------------
+@receiver(connection_created)
+def count_connection_created(sender, connection, **kwargs):
+    record_connection_checkout(connection.alias)
+    # the pooled backend counts the connections it opens, the signal is sent
+    # for the reused ones too
+    if not getattr(connection, "pooled", False):
+        record_connection_created(connection.alias)
@@ -0,0 +1,168 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from core.archive import archive_history
+from core.enums import ChangeModelStatus, GroupEnum
+from core.models import (
+    Member,
+    Club,
+    Membership,
+    MemberChange,
+    MembershipChange,
+    ArchivedMembership,
+    ArchivedMemberChange,
+    ArchivedMembershipChange,
+)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+
+        self.club_1 = Club.objects.create(name="Club 1", affiliation_year=2019, license_no=1)
+        self.club_2 = Club.objects.create(name="Club 2", affiliation_year=2019, license_no=2)
+
+        self.member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        self.closed_membership = Membership.objects.create(
+            member=self.member,
+            club=self.club_1,
+            license_no=1,
+            transfer_date=(now() - timedelta(days=60)).date(),
+        )
+        self.current_membership = Membership.objects.create(
+            member=self.member, club=self.club_2, license_no=1
+        )
+
+        self.before = now() + timedelta(seconds=1)
+
+    def create_member_change(self, status):
+        member_change = MemberChange.objects.create(
+            member=self.member, changes={"city": "Other City"}, applicant=self.user, status=status
+        )
+        MembershipChange.objects.create(
+            member=member_change,
+            club=self.club_2,
+            license_no=2,
+            membership=self.current_membership,
+            applicant=self.user,
+            status=status,
+        )
+        return member_change
+
+    def test_archive_processed_changes(self):
+        approved = self.create_member_change(ChangeModelStatus.APPROVED.value)
+        pending = self.create_member_change(ChangeModelStatus.PENDING.value)
+
+        archived = archive_history(self.before)
+
+        self.assertEqual(1, archived["member changes"])
+        self.assertEqual([pending], list(MemberChange.objects.all()))
+        self.assertEqual(1, MembershipChange.objects.count())
+
+        archived_change = ArchivedMemberChange.objects.get()
+        self.assertEqual(approved.pk, archived_change.original_id)
+        self.assertEqual({"city": "Other City"}, archived_change.changes)
+        self.assertEqual(
+            approved.pk, ArchivedMembershipChange.objects.get().member_change_original_id
+        )
+
+    def test_archive_closed_memberships(self):
+        archive_history(self.before)
+
+        self.assertEqual([self.current_membership], list(Membership.objects.all()))
+        self.assertEqual(self.closed_membership.pk, ArchivedMembership.objects.get().original_id)
+        self.assertEqual(self.current_membership, self.member.current_membership)
+
+    def test_membership_of_a_pending_change_is_kept(self):
+        MembershipChange.objects.create(
+            club=self.club_1, license_no=2, membership=self.closed_membership, applicant=self.user
+        )
+
+        archive_history(self.before)
+
+        self.assertTrue(Membership.objects.filter(pk=self.closed_membership.pk).exists())
+
+    def test_recent_rows_are_kept(self):
+        self.create_member_change(ChangeModelStatus.DECLINED.value)
+
+        archived = archive_history(now() - timedelta(days=90))
+
+        self.assertEqual({"member changes": 0, "membership changes": 0, "memberships": 0}, archived)
+
+    def test_batches(self):
+        for _ in range(3):
+            self.create_member_change(ChangeModelStatus.APPROVED.value)
+
+        archived = archive_history(self.before, batch_size=2, max_batches=1)
+        self.assertEqual(2, archived["member changes"])
+
+        archived = archive_history(self.before, batch_size=2, max_batches=1)
+        self.assertEqual(1, archived["member changes"])
+        self.assertFalse(MemberChange.objects.exists())
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command("archive_history", days=0, stdout=out)
+
+        self.assertIn("Archived 1 memberships", out.getvalue())
+
+    def test_history_view(self):
+        self.create_member_change(ChangeModelStatus.APPROVED.value)
+        archive_history(self.before)
+
+        self.client.login(username="fstbAdminUser", password="testpassword")
+        response = self.client.get(reverse("member_history", args=[self.member.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [self.current_membership.pk, self.closed_membership.pk],
+            [membership.pk if isinstance(membership, Membership) else membership.original_id
+             for membership in response.context["memberships"]],
+        )
+        self.assertEqual(1, len(response.context["member_changes"]))
+        self.assertContains(response, "Club 1")
+
+    def test_history_view_of_other_club(self):
+        club_admin = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        club_admin.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        admin_member = Member.objects.create(
+            name="Jane",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+            user=club_admin,
+        )
+        Membership.objects.create(member=admin_member, club=self.club_1, license_no=2)
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+        # the member left their club for club 2
+        response = self.client.get(reverse("member_history", args=[self.member.pk]))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse("member_history", args=[admin_member.pk]))
+        self.assertEqual(response.status_code, 200)
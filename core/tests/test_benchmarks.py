@@ -0,0 +1,24 @@
+from django.test import SimpleTestCase
+
+from core.benchmarks import percentile, summarize_latencies
+
+
+class BenchmarksTests(SimpleTestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(100, percentile(values, 100))
+        self.assertEqual(1, percentile(values, 0))
+
+    def test_summarize_latencies(self):
+        summary = summarize_latencies([0.01, 0.02, 0.03, 0.04], elapsed=0.05)
+
+        self.assertEqual(4, summary["requests"])
+        self.assertAlmostEqual(80.0, summary["throughput"])
+        self.assertAlmostEqual(20.0, summary["p50"])
+        self.assertAlmostEqual(40.0, summary["max"])
+
+    def test_summarize_without_latencies(self):
+        self.assertEqual(0, summarize_latencies([], elapsed=1)["requests"])
@@ -0,0 +1,202 @@
+from io import StringIO
+
+from django.contrib.auth.models import User, Group, AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template.loader import render_to_string
+from django.db import connection
+from django.test import TestCase, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.backends import CachedModelBackend
+
+from core.cache import (
+    get_user_shell,
+    get_shell_version,
+    bump_shell_version,
+    ANONYMOUS_ROLE,
+    NO_ROLE,
+)
+from core.enums import GroupEnum
+from core.models import Member, Club, Membership
+from core.utils import is_user_club_admin, is_user_fstb_admin
+
+
+class UserShellTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        # Insert default data that includes the FSTB Admin and Club Admin group
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+
+        self.member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+            user=self.user,
+        )
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        Membership.objects.create(member=self.member, club=self.club, license_no=1)
+
+    def test_anonymous_user(self):
+        shell = get_user_shell(AnonymousUser())
+
+        self.assertEqual(ANONYMOUS_ROLE, shell["role"])
+        self.assertIsNone(shell["club_id"])
+
+    def test_club_admin_shell(self):
+        shell = get_user_shell(User.objects.get(pk=self.user.pk))
+
+        self.assertEqual("club_admin", shell["role"])
+        self.assertEqual(self.club.pk, shell["club_id"])
+
+    def test_shell_is_cached(self):
+        get_user_shell(User.objects.get(pk=self.user.pk))
+
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            get_user_shell(user)
+
+    def test_shell_invalidated_on_group_change(self):
+        get_user_shell(User.objects.get(pk=self.user.pk))
+
+        self.user.groups.clear()
+
+        shell = get_user_shell(User.objects.get(pk=self.user.pk))
+        self.assertEqual(NO_ROLE, shell["role"])
+        self.assertIsNone(shell["club_id"])
+
+    def test_shell_invalidated_on_club_change(self):
+        get_user_shell(User.objects.get(pk=self.user.pk))
+
+        Membership.objects.filter(member=self.member).delete()
+        other_club = Club.objects.create(name="Other Club", affiliation_year=2019, license_no=2)
+        Membership.objects.create(member=self.member, club=other_club, license_no=1)
+
+        shell = get_user_shell(User.objects.get(pk=self.user.pk))
+        self.assertEqual(other_club.pk, shell["club_id"])
+
+    def test_bump_shell_version(self):
+        version = get_shell_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_shell_version()
+
+        self.assertEqual(version + 1, get_shell_version())
+
+    def test_club_change_bumps_shell_version(self):
+        version = get_shell_version()
+
+        self.club.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.save()
+
+        self.assertGreater(get_shell_version(), version)
+
+
+class ShellFragmentsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+
+    def get_request(self):
+        request = RequestFactory().get("/")
+        request.user = User.objects.get(pk=self.user.pk)
+        return request
+
+    def test_sidebar_rendered_once_per_shell(self):
+        first = render_to_string("structure/sidebar.html", request=self.get_request())
+
+        # a fragment cache hit doesn't check the permissions, nor loads the
+        # member and the club shown by the fragment
+        request = self.get_request()
+        with self.assertNumQueries(0):
+            second = render_to_string("structure/sidebar.html", request=request)
+
+        self.assertEqual(first, second)
+
+    def test_sidebar_invalidated_on_shell_version_bump(self):
+        render_to_string("structure/sidebar.html", request=self.get_request())
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_shell_version()
+
+        request = self.get_request()
+        with self.assertNumQueries(3):  # the permissions and the club check, the new version is cached
+            render_to_string("structure/sidebar.html", request=request)
+
+
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        self.backend = CachedModelBackend()
+
+    def test_user_loaded_once(self):
+        self.backend.get_user(self.user.pk)
+
+        with self.assertNumQueries(0):
+            user = self.backend.get_user(self.user.pk)
+            self.assertTrue(is_user_club_admin(user))
+
+    def test_invalidated_on_password_change(self):
+        self.backend.get_user(self.user.pk)
+
+        self.user.set_password("newpassword")
+        self.user.save()
+
+        self.assertTrue(self.backend.get_user(self.user.pk).check_password("newpassword"))
+
+    def test_invalidated_on_group_change(self):
+        self.backend.get_user(self.user.pk)
+
+        self.user.groups.clear()
+
+        self.assertFalse(is_user_club_admin(self.backend.get_user(self.user.pk)))
+
+    def test_invalidated_on_reverse_group_change(self):
+        self.backend.get_user(self.user.pk)
+
+        Group.objects.get(name=GroupEnum.FSTB_ADMIN.value).user_set.add(self.user)
+
+        self.assertTrue(is_user_fstb_admin(self.backend.get_user(self.user.pk)))
+
+    def test_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_request_without_session_and_user_queries(self):
+        self.client.login(username="clubAdminUser", password="testpassword")
+        self.client.get(reverse("load_disciplines"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("load_disciplines"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([], queries.captured_queries)
+
+    def test_measure_queries(self):
+        out = StringIO()
+
+        call_command("measure_queries", user="clubAdminUser", url=["load_disciplines", "members"], stdout=out)
+
+        total = out.getvalue().splitlines()[-1].split()
+        baseline, cached = int(total[1]), int(total[2])
+        self.assertGreater(baseline, cached)
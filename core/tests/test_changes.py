@@ -0,0 +1,110 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.changes import (
+    get_member_diff,
+    record_member_change,
+    apply_member_change,
+    get_member_change_rows,
+)
+from core.enums import RoleEnum
+from core.models import Member, MemberChange, Role, Exam
+
+
+class MemberChangeTests(TestCase):
+    def setUp(self):
+        # Insert default data that includes the default roles and exams
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+
+        self.athlete = Role.objects.get(name=RoleEnum.ATHLETE.value)
+        self.instructor = Role.objects.get(name=RoleEnum.INSTRUCTOR.value)
+
+        self.member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        self.member.roles.set([self.athlete])
+
+        # the cleaned data of the member form, without any change
+        self.values = {
+            "photo": None,
+            "name": "John",
+            "surname": "Doe",
+            "house_number": "123",
+            "street": "Test Street",
+            "city": "Test City",
+            "zip_code": "12345",
+            "date_of_birth": date(1990, 1, 1),
+            "nationality": "CH",
+            "affiliation_year": "2020",
+            "roles": [self.athlete],
+            "exams": [],
+            "js": [],
+        }
+
+    def test_no_changes(self):
+        self.assertEqual({}, get_member_diff(self.member, self.values))
+
+    def test_only_changed_fields(self):
+        exam = Exam.objects.first()
+        self.values.update(city="Other City", roles=[self.instructor], exams=[exam])
+
+        self.assertEqual(
+            {
+                "city": "Other City",
+                "roles": {"added": [self.instructor.pk], "removed": [self.athlete.pk]},
+                "exams": {"added": [exam.pk], "removed": []},
+            },
+            get_member_diff(self.member, self.values),
+        )
+
+    def test_new_member_changes_every_field(self):
+        changes = get_member_diff(None, self.values)
+
+        self.assertEqual("John", changes["name"])
+        self.assertEqual(2020, changes["affiliation_year"])
+        self.assertEqual({"added": [self.athlete.pk], "removed": []}, changes["roles"])
+        self.assertNotIn("exams", changes)
+
+    def test_apply_only_changed_fields(self):
+        self.values.update(city="Other City", roles=[self.athlete, self.instructor])
+        member_change = record_member_change(self.member, self.values, self.user)
+
+        # changed by someone else after the change was registered
+        Member.objects.filter(pk=self.member.pk).update(street="Other Street")
+
+        apply_member_change(Member.objects.get(pk=self.member.pk), MemberChange.objects.get(pk=member_change.pk))
+
+        member = Member.objects.get(pk=self.member.pk)
+        self.assertEqual("Other City", member.city)
+        self.assertEqual("Other Street", member.street)
+        self.assertEqual({self.athlete, self.instructor}, set(member.roles.all()))
+
+    def test_apply_new_member(self):
+        member_change = record_member_change(None, self.values, self.user)
+
+        member = apply_member_change(None, MemberChange.objects.get(pk=member_change.pk))
+
+        self.assertEqual(date(1990, 1, 1), Member.objects.get(pk=member.pk).date_of_birth)
+        self.assertEqual([self.athlete], list(member.roles.all()))
+
+    def test_rows(self):
+        self.values.update(name="Jane", roles=[self.instructor])
+        member_change = record_member_change(self.member, self.values, self.user)
+
+        rows = get_member_change_rows(member_change)
+
+        self.assertEqual(("John", "Jane"), (rows[0]["current"], rows[0]["new"]))
+        self.assertEqual(([self.instructor], [self.athlete]), (rows[1]["added"], rows[1]["removed"]))
@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, RequestFactory
+from django.urls import reverse
+
+from core.context_processors import core_context
+from core.enums import GroupEnum
+from core.models import Member, Club, Membership
+from core.utils import get_user_club, get_user_member
+
+
+class CoreContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+
+        self.member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+            user=self.user,
+        )
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        Membership.objects.create(member=self.member, club=self.club, license_no=1)
+
+        self.request = RequestFactory().get("/")
+        self.request.user = User.objects.get(pk=self.user.pk)
+
+    def test_no_queries_until_used(self):
+        with self.assertNumQueries(0):
+            core_context(self.request)
+
+    def test_values(self):
+        context = core_context(self.request)
+
+        self.assertEqual(self.member, context["logged_in_user_member"])
+        self.assertEqual(self.club, context["logged_in_user_member_club"])
+
+    def test_loaded_once_per_request(self):
+        str(core_context(self.request)["logged_in_user_member"])
+
+        with self.assertNumQueries(0):
+            str(core_context(self.request)["logged_in_user_member"])
+
+
+class FragmentContextQueriesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+    def get_with_context_processor_spies(self, url):
+        with patch("core.context_processors.get_user_member", wraps=get_user_member) as member, patch(
+            "core.context_processors.get_user_club", wraps=get_user_club
+        ) as club:
+            response = self.client.get(url, HTTP_HX_REQUEST="true")
+
+        self.assertEqual(response.status_code, 200)
+        return member.call_count, club.call_count
+
+    def test_fragments_run_no_context_processor_queries(self):
+        for url_name in ["roles", "add_role", "members", "clubs", "load_disciplines"]:
+            with self.subTest(url_name=url_name):
+                self.assertEqual((0, 0), self.get_with_context_processor_spies(reverse(url_name)))
+
+    def test_page_loads_the_context_once(self):
+        # the club is shown by both the header and the sidebar
+        self.assertEqual((1, 1), self.get_with_context_processor_spies(reverse("home")))
@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.dashboard import rebuild_registration_counts, get_competition_dashboard
+from core.enums import CompetitionRegistrationStatus, GroupEnum
+from core.models import Club, Competition, CompetitionRegistration, Discipline, Division, RegistrationCount
+
+DRAFT = CompetitionRegistrationStatus.DRAFT.value
+REGISTERED = CompetitionRegistrationStatus.REGISTERED.value
+
+
+class RegistrationCountsTests(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.competition = Competition.objects.create(name="Competition")
+        self.discipline = Discipline.objects.create(name="Discipline", competition=self.competition)
+        self.division = Division.objects.create(name="Division", discipline=self.discipline)
+
+    def register(self, status=DRAFT):
+        return CompetitionRegistration.objects.create(
+            competition=self.competition,
+            discipline=self.discipline,
+            division=self.division,
+            club=self.club,
+            status=status,
+        )
+
+    def get_counts(self):
+        return {count.status: count.count for count in RegistrationCount.objects.all()}
+
+    def test_counted_on_save(self):
+        self.register()
+        registration = self.register()
+
+        self.assertEqual({DRAFT: 2}, self.get_counts())
+
+        registration.status = REGISTERED
+        registration.save()
+
+        self.assertEqual({DRAFT: 1, REGISTERED: 1}, self.get_counts())
+
+    def test_counted_on_delete(self):
+        registration = self.register()
+
+        registration.delete()
+
+        self.assertEqual({}, self.get_counts())
+
+    def test_competition_delete(self):
+        self.register()
+
+        self.competition.delete()
+
+        self.assertFalse(RegistrationCount.objects.exists())
+
+    def test_rebuild(self):
+        self.register()
+        self.register(REGISTERED)
+        CompetitionRegistration.objects.update(status=REGISTERED)
+
+        with CaptureQueriesContext(connection) as queries:
+            rebuild_registration_counts([self.competition])
+
+        # the registrations are read by one GROUP BY query
+        selects = [query["sql"] for query in queries if query["sql"].startswith("SELECT")]
+        self.assertEqual(1, len(selects))
+        self.assertIn("GROUP BY", selects[0])
+
+        self.assertEqual({REGISTERED: 2}, self.get_counts())
+
+    def test_command(self):
+        self.register()
+        RegistrationCount.objects.all().delete()
+        out = StringIO()
+
+        call_command("rebuild_registration_counts", stdout=out)
+
+        self.assertIn("Counted 1 cells", out.getvalue())
+        self.assertEqual({DRAFT: 1}, self.get_counts())
+
+    def test_dashboard(self):
+        self.register()
+        self.register(REGISTERED)
+
+        with self.assertNumQueries(2):
+            dashboard = get_competition_dashboard()
+
+        self.assertEqual([1, 1, 0, 0], dashboard["competitions"][0]["counts"])
+        self.assertEqual("Division", dashboard["competitions"][0]["division_name"])
+        self.assertEqual(2, dashboard["clubs"][0]["total"])
+
+
+class CompetitionDashboardViewTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+        club = Club.objects.create(name="Club Alpha", affiliation_year=2019, license_no=1)
+        CompetitionRegistration.objects.create(competition=Competition.objects.create(name="Cup"), club=club)
+
+    def test_cards_view(self):
+        response = self.client.get(reverse("competition_dashboard_view"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, reverse("competition_dashboard"))
+
+    def test_dashboard_view(self):
+        response = self.client.get(reverse("competition_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Cup")
+        self.assertContains(response, "Club Alpha")
@@ -0,0 +1,172 @@
+import threading
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db.backends.signals import connection_created
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from core.db.pool import ConnectionPool, PoolTimeout, get_pool, close_pools, get_connection_metrics
+from core.enums import GroupEnum
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.usable = True
+
+    def close(self):
+        self.closed = True
+
+
+def check(connection):
+    return connection.usable
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = ConnectionPool(max_size=2, timeout=0.1, check=check)
+
+    def test_connection_reused(self):
+        connection = self.pool.acquire(FakeConnection)
+        self.pool.release(connection)
+
+        self.assertIs(connection, self.pool.acquire(FakeConnection))
+        self.assertEqual(1, self.pool.get_metrics()["created"])
+        self.assertEqual(2, self.pool.get_metrics()["acquired"])
+
+    def test_broken_connection_replaced(self):
+        connection = self.pool.acquire(FakeConnection)
+        self.pool.release(connection)
+        connection.usable = False
+
+        new_connection = self.pool.acquire(FakeConnection)
+
+        self.assertIsNot(connection, new_connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(1, self.pool.get_metrics()["reconnects"])
+        self.assertEqual(1, self.pool.get_metrics()["open"])
+
+    def test_expired_connection_replaced(self):
+        pool = ConnectionPool(max_size=1, max_lifetime=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+
+        self.assertIsNot(connection, pool.acquire(FakeConnection))
+        self.assertTrue(connection.closed)
+
+    def test_discarded_connection_closed(self):
+        connection = self.pool.acquire(FakeConnection)
+        self.pool.release(connection, discard=True)
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(0, self.pool.get_metrics()["open"])
+
+    def test_bounded(self):
+        self.pool.acquire(FakeConnection)
+        self.pool.acquire(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            self.pool.acquire(FakeConnection)
+
+        metrics = self.pool.get_metrics()
+        self.assertEqual(2, metrics["open"])
+        self.assertEqual(2, metrics["in_use"])
+        self.assertEqual(1, metrics["timeouts"])
+
+    def test_waits_for_a_released_connection(self):
+        pool = ConnectionPool(max_size=1, timeout=5)
+        connection = pool.acquire(FakeConnection)
+
+        timer = threading.Timer(0.05, pool.release, args=[connection])
+        timer.start()
+
+        self.assertIs(connection, pool.acquire(FakeConnection))
+        timer.join()
+
+        metrics = pool.get_metrics()
+        self.assertEqual(1, metrics["waits"])
+        self.assertGreater(metrics["wait_time_max"], 0)
+
+    def test_failed_connect_frees_the_slot(self):
+        def connect():
+            raise ConnectionError
+
+        with self.assertRaises(ConnectionError):
+            self.pool.acquire(connect)
+
+        self.assertEqual(0, self.pool.get_metrics()["open"])
+
+    def test_close(self):
+        connection = self.pool.acquire(FakeConnection)
+        self.pool.release(connection)
+
+        self.pool.close()
+
+        self.assertTrue(connection.closed)
+        self.assertEqual(0, self.pool.get_metrics()["open"])
+
+
+class PoolRegistryTests(SimpleTestCase):
+    def tearDown(self):
+        close_pools()
+
+    def test_no_pool_without_settings(self):
+        self.assertIsNone(get_pool("test", {"ENGINE": "core.db.backends.mysql"}))
+
+    def test_one_pool_per_alias(self):
+        settings_dict = {"POOL": {"MAX_SIZE": 3}}
+
+        pool = get_pool("test", settings_dict)
+
+        self.assertIs(pool, get_pool("test", settings_dict))
+        self.assertEqual(3, pool.max_size)
+
+    def test_plain_connections_counted(self):
+        connection = SimpleNamespace(alias="test_plain")
+
+        connection_created.send(sender=None, connection=connection)
+        connection_created.send(sender=None, connection=connection)
+
+        metrics = get_connection_metrics()["test_plain"]
+        self.assertEqual(2, metrics["connects"])
+        self.assertEqual(2, metrics["checkouts"])
+
+    def test_pooled_connections_counted(self):
+        get_pool("test_pooled", {"POOL": {"MAX_SIZE": 1}})
+        # the pooled backend records the connection it opens itself
+        connection = SimpleNamespace(alias="test_pooled", pooled=True)
+
+        connection_created.send(sender=None, connection=connection)
+        connection_created.send(sender=None, connection=connection)
+
+        metrics = get_connection_metrics()["test_pooled"]
+        self.assertEqual(0, metrics["connects"])
+        self.assertEqual(2, metrics["checkouts"])
+        self.assertIn("pool", metrics)
+
+
+class DatabaseMetricsViewTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+
+    def test_metrics(self):
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+        response = self.client.get(reverse("database_metrics"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.json(), dict)
+
+    def test_club_admin_forbidden(self):
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+        response = self.client.get(reverse("database_metrics"))
+
+        self.assertEqual(response.status_code, 403)
@@ -0,0 +1,135 @@
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.constants import SHELL_VERSION_CACHE_KEY
+from core.deploy import (
+    StepTimer,
+    collect_changed_static_files,
+    compile_templates,
+    get_file_hash,
+    have_requirements_changed,
+    load_manifest,
+    save_manifest,
+    warm_version_caches,
+)
+from core.management.commands.deploy import Command as DeployCommand
+from core.models import Club
+from core.versions import get_model_version_keys
+
+
+class StaticFilesTests(TestCase):
+    def setUp(self):
+        source = tempfile.TemporaryDirectory()
+        target = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        self.addCleanup(target.cleanup)
+        self.source = Path(source.name)
+        self.target = Path(target.name)
+
+        (self.source / "js").mkdir()
+        (self.source / "js" / "main.js").write_text("main")
+        (self.source / "style.css").write_text("style")
+
+        settings = override_settings(
+            STATICFILES_DIRS=[self.source],
+            STATIC_ROOT=self.target,
+            INSTALLED_APPS=["django.contrib.staticfiles"],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_only_changed_files_are_copied(self):
+        manifest = {}
+        self.assertEqual((2, 0, 0), collect_changed_static_files(manifest))
+        self.assertEqual("main", (self.target / "js" / "main.js").read_text())
+
+        # touched, the content unchanged
+        os.utime(self.source / "style.css")
+        (self.source / "js" / "main.js").write_text("main 2")
+
+        self.assertEqual((1, 1, 0), collect_changed_static_files(manifest))
+        self.assertEqual("main 2", (self.target / "js" / "main.js").read_text())
+
+    def test_removed_and_missing_files(self):
+        manifest = {}
+        collect_changed_static_files(manifest)
+
+        (self.source / "style.css").unlink()
+        (self.target / "js" / "main.js").unlink()
+
+        self.assertEqual((1, 0, 1), collect_changed_static_files(manifest))
+        self.assertFalse((self.target / "style.css").exists())
+        self.assertTrue((self.target / "js" / "main.js").exists())
+
+
+class DeployTests(TestCase):
+    def test_manifest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "manifest.json"
+            self.assertEqual({}, load_manifest(path))
+
+            requirements = Path(directory) / "requirements.txt"
+            requirements.write_text("Django==4.2.3\n")
+            self.assertTrue(have_requirements_changed(requirements, {}))
+
+            save_manifest({"requirements": get_file_hash(requirements)}, path)
+            self.assertFalse(have_requirements_changed(requirements, load_manifest(path)))
+
+    def test_compile_templates(self):
+        self.assertGreater(compile_templates(), 0)
+
+    def test_warm_version_caches(self):
+        # the versions are saved in the database on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        cache.clear()
+
+        self.assertGreater(warm_version_caches(), 1)
+
+        keys = get_model_version_keys(Club) + [SHELL_VERSION_CACHE_KEY]
+        self.assertEqual(set(keys), set(cache.get_many(keys)))
+
+    def test_step_timer(self):
+        timer = StepTimer()
+        with timer.step("first"):
+            pass
+
+        self.assertEqual(["first"], list(timer.as_record()["steps"]))
+
+
+class DeployCommandTests(TestCase):
+    def test_steps_after_settings_read_new_settings(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_path = Path(directory.name) / "settings.py"
+        production_settings_path = Path(directory.name) / "production_settings.py"
+        settings_path.write_text("DEBUG = True\n")
+        production_settings_path.write_text("DEBUG = False\n")
+
+        commands = []
+
+        def run(args, **kwargs):
+            # the settings the new process would import
+            commands.append((args[2:], settings_path.read_text()))
+
+        with mock.patch.object(DeployCommand, "SETTINGS_FILE_PATH", str(settings_path)), mock.patch.object(
+            DeployCommand, "PRODUCTION_SETTINGS_FILE_PATH", str(production_settings_path)
+        ), mock.patch.object(DeployCommand, "install_requirements"), mock.patch.object(
+            DeployCommand, "collect_static_files"
+        ), mock.patch(
+            "core.management.commands.deploy.save_manifest"
+        ), mock.patch(
+            "subprocess.run", side_effect=run
+        ):
+            call_command("deploy", no_input=True, stdout=StringIO())
+
+        self.assertEqual(
+            [(["compile_templates"], "DEBUG = False\n"), (["warm_caches"], "DEBUG = False\n")], commands
+        )
@@ -0,0 +1,128 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from core.eligibility import get_eligibility_matrix
+from core.enums import GroupEnum, RuleCondition, RuleOption
+from core.models import Member, Club, Membership, Competition, Discipline, Division, YearRule, Team
+
+
+def create_member(name, age):
+    today = date.today()
+    return Member.objects.create(
+        name=name,
+        surname="Doe",
+        house_number="1",
+        street="Test Street",
+        city="Test City",
+        zip_code="12345",
+        date_of_birth=today.replace(year=today.year - age) - timedelta(days=1),
+        nationality="CH",
+        affiliation_year=2020,
+    )
+
+
+class EligibilityMatrixTests(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.competition = Competition.objects.create(name="Cup", due_date=now() + timedelta(days=7))
+
+        self.solo = Discipline.objects.create(
+            name="Solo", competition=self.competition, min_members_number=1, max_members_number=1
+        )
+        self.group = Discipline.objects.create(
+            name="Group", competition=self.competition, min_members_number=2, max_members_number=6
+        )
+        self.junior = Division.objects.create(name="Junior", discipline=self.group)
+        self.junior.year_rules.add(
+            YearRule.objects.create(
+                name="Under 16",
+                option=RuleOption.YEAR.value,
+                condition=RuleCondition.LESS_THAN.value,
+                value=16,
+            )
+        )
+
+        self.anna = create_member("Anna", 12)
+        self.bea = create_member("Bea", 20)
+
+    def create_team(self, name, members):
+        team = Team.objects.create(name=name, club=self.club)
+        team.members.set(members)
+        return team
+
+    def get_errors(self, matrix, team):
+        row = next(row for row in matrix["rows"] if row["team"] == team)
+        return {
+            (str(column["discipline"]), str(column["division"])): cell["errors"]
+            for column, cell in zip(matrix["columns"], row["cells"])
+        }
+
+    def test_columns(self):
+        matrix = get_eligibility_matrix(self.competition, Team.objects.all())
+
+        self.assertEqual(
+            [(self.group, self.junior), (self.solo, None)],
+            [(column["discipline"], column["division"]) for column in matrix["columns"]],
+        )
+
+    def test_errors(self):
+        duo = self.create_team("Duo", [self.anna, self.bea])
+        solo = self.create_team("Solo", [self.anna])
+
+        matrix = get_eligibility_matrix(self.competition, Team.objects.all())
+
+        duo_errors = self.get_errors(matrix, duo)
+        self.assertEqual(["Bea age is not less than 16.0"], duo_errors[("Group", "Junior")])
+        self.assertEqual(["Too many members: 2, at most 1"], duo_errors[("Solo", "None")])
+
+        solo_errors = self.get_errors(matrix, solo)
+        self.assertEqual(["Not enough members: 1, at least 2"], solo_errors[("Group", "Junior")])
+        self.assertEqual([], solo_errors[("Solo", "None")])
+
+    def test_queries_dont_grow_with_teams(self):
+        self.create_team("Duo", [self.anna, self.bea])
+        with CaptureQueriesContext(connection) as one_team:
+            get_eligibility_matrix(self.competition, Team.objects.all())
+
+        for index in range(5):
+            self.create_team(f"Team {index}", [self.anna, self.bea])
+        with CaptureQueriesContext(connection) as many_teams:
+            get_eligibility_matrix(self.competition, Team.objects.all())
+
+        self.assertEqual(len(one_team), len(many_teams))
+
+
+class CompetitionEligibilityViewTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        other_club = Club.objects.create(name="Other Club", affiliation_year=2019, license_no=2)
+        self.competition = Competition.objects.create(name="Cup", due_date=now() + timedelta(days=7))
+        Discipline.objects.create(name="Solo", competition=self.competition, min_members_number=1)
+
+        Team.objects.create(name="Alpha", club=self.club)
+        Team.objects.create(name="Omega", club=other_club)
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        member = create_member("Admin", 30)
+        member.user = self.user
+        member.save()
+        Membership.objects.create(member=member, club=self.club, license_no=1)
+
+    def test_club_admin_sees_its_teams(self):
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+        response = self.client.get(reverse("competition_eligibility", args=[self.competition.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(["Alpha"], [row["team"].name for row in response.context["rows"]])
+        self.assertContains(response, "Not enough members: 0, at least 1")
@@ -1,9 +1,10 @@
 from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
 
 from core.enums import RoleEnum, ExamEnum, JSEnum
-from core.forms import MemberForm, ClubForm
-from core.models import Role, Exam, JS
+from core.forms import MemberForm, ClubForm, TeamForm
+from core.models import Role, Exam, JS, Member, Club
 
 
 class MemberFormTest(TestCase):
@@ -101,3 +102,51 @@ class ClubFormTest(TestCase):
         self.assertFalse(form_2.is_valid())
         self.assertIn("license_no", form_1.errors)
         self.assertIn("license_no", form_2.errors)
+
+
+class RemoteSearchWidgetTest(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.members = [
+            Member.objects.create(
+                name=f"Member{index}",
+                surname="Doe",
+                house_number="1",
+                street="Test Street",
+                city="Test City",
+                zip_code="12345",
+                date_of_birth="1990-01-01",
+                nationality="CH",
+                affiliation_year=2020,
+            )
+            for index in range(3)
+        ]
+
+    def test_renders_only_the_selected_members(self):
+        form = TeamForm(initial={"members": [self.members[0].pk]})
+
+        with self.assertNumQueries(1):
+            html = str(form["members"])
+
+        self.assertIn(f'value="{self.members[0].pk}"', html)
+        self.assertNotIn("Member1", html)
+        self.assertIn(f'data-search-url="{reverse("member_search_json")}"', html)
+
+    def test_validates_the_members_with_one_query(self):
+        form = TeamForm(
+            {"name": "Team", "club": self.club.pk, "members": [member.pk for member in self.members]}
+        )
+        form.is_valid()
+
+        with self.assertNumQueries(1):
+            members = form.fields["members"].clean([member.pk for member in self.members])
+
+        self.assertEqual(set(self.members), set(members))
+        self.assertTrue(form.is_valid())
+
+    def test_unknown_member_is_invalid(self):
+        form = TeamForm({"name": "Team", "club": self.club.pk, "members": [self.members[0].pk, 999]})
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("members", form.errors)
+
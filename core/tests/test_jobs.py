@@ -0,0 +1,147 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from core.enums import GroupEnum, JobStatus
+from core.jobs import JOBS, register_job, enqueue, claim_job, run_jobs, requeue_stale_jobs, set_progress
+from core.models import Job
+
+
+@register_job("test_add")
+def add_job(job, a, b):
+    set_progress(job, 1, 2, "Halfway")
+    return a + b
+
+
+@register_job("test_fail")
+def fail_job(job):
+    raise RuntimeError("Broken")
+
+
+class JobsTests(TestCase):
+    def test_run(self):
+        job = enqueue("test_add", a=1, b=2)
+
+        self.assertEqual(1, run_jobs("worker"))
+
+        job.refresh_from_db()
+        self.assertEqual(JobStatus.DONE.value, job.status)
+        self.assertEqual(3, job.result)
+        self.assertEqual(100, job.progress)
+        self.assertEqual("Halfway", job.message)
+
+    def test_unknown_job(self):
+        with self.assertRaises(ValueError):
+            enqueue("unknown")
+
+    def test_deduplication(self):
+        job = enqueue("test_add", key="club-1", a=1, b=2)
+
+        self.assertEqual(job, enqueue("test_add", key="club-1", a=1, b=2))
+        self.assertNotEqual(job, enqueue("test_add", key="club-2", a=1, b=2))
+
+        run_jobs("worker")
+        self.assertNotEqual(job, enqueue("test_add", key="club-1", a=1, b=2))
+
+    def test_one_queued_job_per_key(self):
+        enqueue("test_add", key="club-1", a=1, b=2)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Job.objects.create(name="test_add", key="club-1", queued_key="test_add:club-1")
+
+    def test_deduplication_of_concurrent_enqueue(self):
+        # the other request inserts its job between the lookup and the insert
+        other = Job.objects.create(name="test_add", key="club-1", queued_key="test_add:club-1")
+
+        with mock.patch("core.jobs.get_queued_job", side_effect=[None, other]):
+            self.assertEqual(other, enqueue("test_add", key="club-1", a=1, b=2))
+        self.assertEqual(1, Job.objects.count())
+
+    def test_queued_again_after_failure(self):
+        job = enqueue("test_fail", key="club-1", max_attempts=1)
+        run_jobs("worker")
+
+        self.assertNotEqual(job, enqueue("test_fail", key="club-1"))
+
+    def test_claimed_once(self):
+        enqueue("test_add", a=1, b=2)
+
+        self.assertIsNotNone(claim_job("worker-1"))
+        self.assertIsNone(claim_job("worker-2"))
+
+    def test_retry_with_backoff(self):
+        job = enqueue("test_fail", max_attempts=2)
+
+        run_jobs("worker")
+        job.refresh_from_db()
+        self.assertEqual(JobStatus.PENDING.value, job.status)
+        self.assertGreater(job.run_at, now())
+        self.assertIn("Broken", job.error)
+
+        # not due before its delay
+        self.assertEqual(0, run_jobs("worker"))
+
+        Job.objects.filter(pk=job.pk).update(run_at=now())
+        run_jobs("worker")
+        job.refresh_from_db()
+        self.assertEqual(JobStatus.FAILED.value, job.status)
+        self.assertEqual(2, job.attempts)
+
+    def test_requeue_stale_jobs(self):
+        job = enqueue("test_add", a=1, b=2)
+        Job.objects.filter(pk=job.pk).update(
+            status=JobStatus.RUNNING.value, started_at=now() - timedelta(days=1)
+        )
+
+        self.assertEqual(1, requeue_stale_jobs())
+        self.assertEqual(1, run_jobs("worker"))
+
+    def test_command(self):
+        enqueue("test_add", a=1, b=2)
+        out = StringIO()
+
+        call_command("run_jobs", once=True, stdout=out)
+
+        self.assertIn("Ran 1 jobs", out.getvalue())
+
+    def test_registered_jobs(self):
+        self.assertIn("archive_history", JOBS)
+        self.assertIn("rebuild_registration_counts", JOBS)
+
+
+class JobViewsTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+    def test_enqueue(self):
+        response = self.client.post(reverse("enqueue_job", args=["rebuild_registration_counts"]))
+
+        self.assertEqual(response.status_code, 200)
+        job = Job.objects.get()
+        self.assertEqual(self.user, job.created_by)
+        self.assertContains(response, reverse("job_status", args=[job.pk]))
+
+    def test_enqueue_unknown_job(self):
+        response = self.client.post(reverse("enqueue_job", args=["test_add"]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_status_stops_polling_when_finished(self):
+        job = enqueue("test_add", a=1, b=2)
+        run_jobs("worker")
+
+        response = self.client.get(reverse("job_status", args=[job.pk]))
+
+        self.assertContains(response, "Done")
+        self.assertNotContains(response, "hx-trigger")
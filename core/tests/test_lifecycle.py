@@ -0,0 +1,76 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now
+
+from core.enums import CompetitionStatus, CompetitionRegistrationStatus
+from core.lifecycle import close_due_competitions
+from core.models import Competition, CompetitionRegistration, RegistrationCount
+
+OPEN = CompetitionStatus.OPEN.value
+CLOSED = CompetitionStatus.CLOSED.value
+
+
+class CloseCompetitionsTests(TestCase):
+    def setUp(self):
+        self.due = Competition.objects.create(name="Due", due_date=now() - timedelta(hours=1))
+        self.future = Competition.objects.create(name="Future", due_date=now() + timedelta(days=7))
+
+        self.draft = CompetitionRegistration.objects.create(
+            competition=self.due, status=CompetitionRegistrationStatus.DRAFT.value
+        )
+        self.registered = CompetitionRegistration.objects.create(
+            competition=self.due, status=CompetitionRegistrationStatus.REGISTERED.value
+        )
+        self.future_draft = CompetitionRegistration.objects.create(
+            competition=self.future, status=CompetitionRegistrationStatus.DRAFT.value
+        )
+
+    def get_status(self, obj):
+        return type(obj).objects.values_list("status", flat=True).get(pk=obj.pk)
+
+    def test_close_due_competitions(self):
+        self.assertEqual(1, close_due_competitions())
+
+        self.assertEqual(CLOSED, self.get_status(self.due))
+        self.assertEqual(OPEN, self.get_status(self.future))
+        self.assertEqual(CompetitionRegistrationStatus.EXPIRED.value, self.get_status(self.draft))
+        self.assertEqual(CompetitionRegistrationStatus.FINISHED.value, self.get_status(self.registered))
+        self.assertEqual(CompetitionRegistrationStatus.DRAFT.value, self.get_status(self.future_draft))
+
+    def test_idempotent(self):
+        close_due_competitions()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(0, close_due_competitions())
+
+    def test_batches(self):
+        Competition.objects.create(name="Due 2", due_date=now() - timedelta(days=1))
+
+        self.assertEqual(2, close_due_competitions(batch_size=1))
+        self.assertFalse(Competition.objects.filter(status=OPEN, due_date__lte=now()).exists())
+
+    def test_registration_counts(self):
+        close_due_competitions()
+
+        self.assertEqual(
+            {
+                CompetitionRegistrationStatus.EXPIRED.value: 1,
+                CompetitionRegistrationStatus.FINISHED.value: 1,
+            },
+            dict(
+                RegistrationCount.objects.filter(competition=self.due).values_list("status", "count")
+            ),
+        )
+
+    def test_open_competitions(self):
+        self.assertEqual([self.future], list(Competition.objects.open()))
+
+    def test_command(self):
+        out = StringIO()
+
+        call_command("close_competitions", stdout=out)
+
+        self.assertIn("Closed 1 competitions", out.getvalue())
@@ -0,0 +1,110 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from core.member_rows import check_member_rows, rebuild_member_rows
+from core.models import Club, Exam, Member, MemberRow, Membership, Role
+from core.trash import restore, soft_delete
+
+
+def create_member(name):
+    return Member.objects.create(
+        name=name,
+        surname="Doe",
+        house_number="1",
+        street="Test Street",
+        city="Test City",
+        zip_code="12345",
+        date_of_birth=date(2000, 1, 1),
+        nationality="CH",
+        affiliation_year=2020,
+    )
+
+
+class MemberRowsTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults", stdout=StringIO())
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.member = create_member("Anna")
+        self.role = Role.objects.order_by("pk").first()
+        self.member.roles.set([self.role])
+        Membership.objects.create(member=self.member, club=self.club, license_no=23)
+
+    def get_row(self):
+        return MemberRow.objects.get(pk=self.member.pk)
+
+    def test_row(self):
+        row = self.get_row()
+
+        self.assertEqual("Anna", row.name)
+        self.assertEqual(self.club.pk, row.club_id)
+        self.assertEqual("Club", row.club_name)
+        self.assertEqual("01-023", row.full_license_no)
+        self.assertEqual(str(self.role), row.roles)
+        self.assertEqual("", row.exams)
+
+    def test_member_and_labels_changes(self):
+        self.member.city = "Bern"
+        self.member.save()
+        exam = Exam.objects.order_by("pk").first()
+        self.member.exams.add(exam)
+
+        self.assertEqual("Bern", self.get_row().city)
+        self.assertEqual(str(exam), self.get_row().exams)
+
+        self.role.name = "Renamed"
+        self.role.save()
+
+        self.assertEqual("Renamed", self.get_row().roles)
+
+    def test_club_and_membership_changes(self):
+        self.club.name = "Renamed Club"
+        self.club.save()
+
+        self.assertEqual("Renamed Club", self.get_row().club_name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.filter(member=self.member).get().delete()
+
+        self.assertIsNone(self.get_row().club_id)
+        self.assertEqual("", self.get_row().full_license_no)
+
+    def test_soft_delete(self):
+        soft_delete(self.member)
+
+        self.assertFalse(MemberRow.objects.filter(pk=self.member.pk).exists())
+
+        restore(self.member)
+
+        self.assertTrue(MemberRow.objects.filter(pk=self.member.pk).exists())
+
+    def test_check_and_rebuild(self):
+        other = create_member("Bea")
+        # bulk updates don't send the signals
+        Member.objects.filter(pk=self.member.pk).update(city="Bern")
+        MemberRow.objects.filter(pk=other.pk).delete()
+
+        self.assertEqual(
+            {"missing": [other.pk], "stale": [self.member.pk], "orphaned": []}, check_member_rows()
+        )
+
+        self.assertEqual(2, rebuild_member_rows(batch_size=1))
+
+        self.assertEqual({"missing": [], "stale": [], "orphaned": []}, check_member_rows())
+
+    def test_command(self):
+        MemberRow.objects.all().delete()
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_member_rows", "--check", stdout=StringIO())
+
+        out = StringIO()
+        call_command("rebuild_member_rows", stdout=out)
+        self.assertIn("Wrote 1 member rows", out.getvalue())
+
+        call_command("rebuild_member_rows", "--check", stdout=out)
+        self.assertIn("up to date", out.getvalue())
@@ -3,10 +3,11 @@ from datetime import datetime
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-from django.contrib.auth.models import User
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
 from django.utils.datetime_safe import date
 
-from core.enums import RoleEnum
+from core.enums import RoleEnum, GroupEnum
 from core.models import (
     Member,
     Membership,
@@ -14,7 +15,7 @@ from core.models import (
     Club,
     Exam,
     JS,
-    get_remaining_memberships_by_club, Team, Competition,
+    get_remaining_memberships_by_club, Team, Competition, CompetitionRegistration,
 )
 
 
@@ -428,3 +429,84 @@ class CompetitionModelTest(TestCase):
 
     def test_str(self):
         self.assertEquals(str(self.competition), "new competition")
+
+
+# ---- Test the club scoped querysets --------------------------------------------------
+class ForUserTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("insert_defaults")
+
+        cls.club = Club.objects.create(name="club", affiliation_year=2023, license_no=1)
+        cls.other_club = Club.objects.create(name="other club", affiliation_year=2023, license_no=2)
+
+        cls.member = cls.create_member("Anna", cls.club, 1)
+        cls.transferred = cls.create_member("Bea", cls.club, 2, transfer_date=date(2023, 1, 1))
+        cls.other_member = cls.create_member("Carla", cls.other_club, 1)
+
+        cls.team = Team.objects.create(name="team", club=cls.club)
+        cls.other_team = Team.objects.create(name="other team", club=cls.other_club)
+        cls.registration = CompetitionRegistration.objects.create(team=cls.team, club=cls.club)
+        CompetitionRegistration.objects.create(team=cls.other_team, club=cls.other_club)
+
+        cls.club_admin = cls.create_user("clubAdmin", GroupEnum.CLUB_ADMIN)
+        cls.member.user = cls.club_admin
+        cls.member.save()
+        cls.fstb_admin = cls.create_user("fstbAdmin", GroupEnum.FSTB_ADMIN)
+
+    @staticmethod
+    def create_member(name, club, license_no, transfer_date=None):
+        member = Member.objects.create(
+            name=name,
+            surname="Doe",
+            house_number="1",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth=date(2000, 1, 1),
+            nationality="CH",
+            affiliation_year=2023,
+        )
+        Membership.objects.create(member=member, club=club, license_no=license_no, transfer_date=transfer_date)
+        return member
+
+    @staticmethod
+    def create_user(username, group):
+        user = User.objects.create_user(username=username, password="testpassword")
+        user.groups.add(Group.objects.get(name=group.value))
+        return user
+
+    def test_club_admin(self):
+        # as loaded by the authentication backend, with the groups
+        user = User.objects.prefetch_related("groups").get(pk=self.club_admin.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual([self.member], list(Member.objects.for_user(user)))
+        self.assertEqual([self.team], list(Team.objects.for_user(self.club_admin)))
+        self.assertEqual([self.registration], list(CompetitionRegistration.objects.for_user(self.club_admin)))
+
+    def test_transferred_club_admin(self):
+        user = self.create_user("transferredAdmin", GroupEnum.CLUB_ADMIN)
+        self.transferred.user = user
+        self.transferred.save()
+        Membership.objects.create(member=self.transferred, club=self.other_club, license_no=2)
+
+        # the club they left comes first, they administer the one they joined
+        self.assertEqual(
+            {self.transferred, self.other_member}, set(Member.objects.for_user(user))
+        )
+        self.assertEqual([self.other_team], list(Team.objects.for_user(user)))
+
+    def test_fstb_admin(self):
+        self.assertEqual(3, Member.objects.for_user(self.fstb_admin).count())
+        self.assertEqual(2, Team.objects.for_user(self.fstb_admin).count())
+
+    def test_other_user(self):
+        user = User.objects.create_user(username="user", password="testpassword")
+
+        self.assertFalse(Team.objects.for_user(user).exists())
+
+    def test_club_admin_without_club(self):
+        user = self.create_user("lonelyAdmin", GroupEnum.CLUB_ADMIN)
+
+        self.assertFalse(Team.objects.for_user(user).exists())
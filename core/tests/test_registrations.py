@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.timezone import now
+
+from core.eligibility import get_eligibility_matrix, get_cell_key
+from core.enums import CompetitionRegistrationStatus, GroupEnum
+from core.models import (
+    Member, Club, Membership, Competition, Discipline, Division, Team, CompetitionRegistration, RegistrationCount,
+)
+from core.registrations import register_teams
+
+DRAFT = CompetitionRegistrationStatus.DRAFT.value
+REGISTERED = CompetitionRegistrationStatus.REGISTERED.value
+
+
+def create_member(name):
+    return Member.objects.create(
+        name=name,
+        surname="Doe",
+        house_number="1",
+        street="Test Street",
+        city="Test City",
+        zip_code="12345",
+        date_of_birth=date(2000, 1, 1),
+        nationality="CH",
+        affiliation_year=2020,
+    )
+
+
+class RegisterTeamsTests(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.competition = Competition.objects.create(name="Cup", due_date=now() + timedelta(days=7))
+        self.solo = Discipline.objects.create(
+            name="Solo", competition=self.competition, min_members_number=1, max_members_number=1
+        )
+        self.senior = Division.objects.create(name="Senior", discipline=self.solo)
+
+        self.alpha = Team.objects.create(name="Alpha", club=self.club)
+        self.alpha.members.set([create_member("Anna")])
+        self.beta = Team.objects.create(name="Beta", club=self.club)
+        self.beta.members.set([create_member("Bea"), create_member("Carla")])
+
+    def register(self, *teams):
+        matrix = get_eligibility_matrix(self.competition, Team.objects.all())
+        keys = [get_cell_key(team, self.solo, self.senior) for team in teams]
+        return register_teams(self.competition, matrix, keys)
+
+    def test_register(self):
+        matrix = get_eligibility_matrix(self.competition, Team.objects.all())
+        keys = [get_cell_key(team, self.solo, self.senior) for team in (self.alpha, self.beta)]
+
+        with CaptureQueriesContext(connection) as queries:
+            results = register_teams(self.competition, matrix, keys)
+
+        inserts = [query for query in queries if query["sql"].startswith('INSERT INTO "core_competitionregistration"')]
+        self.assertEqual(1, len(inserts))
+        self.assertEqual([REGISTERED, DRAFT], [result["status"] for result in results])
+        self.assertEqual(["Too many members: 2, at most 1"], results[1]["errors"])
+        self.assertEqual(
+            {(self.alpha.pk, REGISTERED), (self.beta.pk, DRAFT)},
+            set(CompetitionRegistration.objects.values_list("team_id", "status")),
+        )
+        self.assertEqual(2, RegistrationCount.objects.count())
+
+    def test_already_registered(self):
+        self.register(self.alpha)
+
+        results = self.register(self.alpha)
+
+        self.assertIsNone(results[0]["status"])
+        self.assertEqual(1, CompetitionRegistration.objects.count())
+
+    def test_unknown_keys_are_ignored(self):
+        matrix = get_eligibility_matrix(self.competition, Team.objects.filter(pk=self.alpha.pk))
+
+        results = register_teams(self.competition, matrix, [get_cell_key(self.beta, self.solo, self.senior)])
+
+        self.assertEqual([], results)
+        self.assertFalse(CompetitionRegistration.objects.exists())
+
+
+class BulkRegistrationViewTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        other_club = Club.objects.create(name="Other Club", affiliation_year=2019, license_no=2)
+        self.competition = Competition.objects.create(name="Cup", due_date=now() + timedelta(days=7))
+        self.solo = Discipline.objects.create(name="Solo", competition=self.competition, min_members_number=1)
+
+        self.alpha = Team.objects.create(name="Alpha", club=self.club)
+        self.alpha.members.set([create_member("Anna")])
+        self.omega = Team.objects.create(name="Omega", club=other_club)
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        member = create_member("Admin")
+        member.user = self.user
+        member.save()
+        Membership.objects.create(member=member, club=self.club, license_no=1)
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+        self.url = reverse("bulk_add_competitionregistration", args=[self.competition.pk])
+
+    def test_form_shows_the_club_teams(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, get_cell_key(self.alpha, self.solo, None))
+        self.assertNotContains(response, "Omega")
+
+    def test_post(self):
+        response = self.client.post(
+            self.url, {"registrations": [get_cell_key(self.alpha, self.solo, None)], "status": REGISTERED}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("competitionregistrationListChanged", response["HX-Trigger"])
+        self.assertEqual(REGISTERED, CompetitionRegistration.objects.get(team=self.alpha).status)
+
+    def test_other_club_team_is_refused(self):
+        response = self.client.post(
+            self.url, {"registrations": [get_cell_key(self.omega, self.solo, None)], "status": REGISTERED}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(CompetitionRegistration.objects.exists())
+        self.assertIn("registrations", response.context["form"].errors)
+
+    def test_closed_competition(self):
+        Competition.objects.filter(pk=self.competition.pk).update(due_date=now() - timedelta(days=1))
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
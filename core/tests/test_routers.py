@@ -0,0 +1,139 @@
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.constants import PRIMARY_STICKY_COOKIE
+from core.enums import GroupEnum
+from core.cache import build_user_shell
+from core.models import Club, Member, Membership, Role, ModelVersion
+from core.routers import PrimaryReplicaRouter, read_from_replica, reset_read_from_replica
+
+
+class PrimaryReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.token = read_from_replica(True)
+
+    def tearDown(self):
+        reset_read_from_replica(self.token)
+
+    def test_primary_without_replica(self):
+        self.assertEqual(DEFAULT_DB_ALIAS, self.router.db_for_read(Member))
+
+    def test_writes_on_primary(self):
+        self.assertEqual(DEFAULT_DB_ALIAS, self.router.db_for_write(Member))
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """Two SQLite aliases on the same test database, the replica added at runtime."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # added after the test database setup, that only knows the aliases of the settings
+        cls.previous_settings = connections.settings
+        connections.settings = connections.configure_settings(
+            {**connections.settings, "replica": dict(connections["default"].settings_dict)}
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        connections.settings = cls.previous_settings
+
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        call_command("insert_defaults")
+
+        user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+    def get_roles(self):
+        # create the missing versions, a write that moves the request reads to the primary
+        self.client.get(reverse("roles"))
+
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            with CaptureQueriesContext(connections["default"]) as primary_queries:
+                response = self.client.get(reverse("roles"))
+
+        self.assertEqual(response.status_code, 200)
+        return replica_queries, primary_queries
+
+    def test_read_only_request_reads_from_replica(self):
+        replica_queries, primary_queries = self.get_roles()
+
+        self.assertTrue(any("core_role" in query["sql"] for query in replica_queries))
+        self.assertFalse(any("core_role" in query["sql"] for query in primary_queries))
+
+    def test_versions_read_from_primary(self):
+        replica_queries, _ = self.get_roles()
+
+        table = ModelVersion._meta.db_table
+        self.assertFalse(any(table in query["sql"] for query in replica_queries))
+
+    def test_reads_stick_to_primary_after_post(self):
+        response = self.client.post(reverse("add_role"), data={"name": "New Role"})
+        self.assertIn(PRIMARY_STICKY_COOKIE, response.cookies)
+
+        replica_queries, primary_queries = self.get_roles()
+
+        self.assertEqual(0, len(replica_queries))
+        self.assertTrue(any("core_role" in query["sql"] for query in primary_queries))
+
+    def test_cached_user_read_from_primary(self):
+        self.client.get(reverse("roles"))
+        cache.clear()
+
+        with CaptureQueriesContext(connections["replica"]) as replica_queries:
+            self.client.get(reverse("roles"))
+
+        for table in ("auth_user", "auth_group", "auth_permission"):
+            self.assertFalse(any(table in query["sql"] for query in replica_queries), table)
+
+    def test_cached_shell_read_from_primary(self):
+        user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="1",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="2000-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+            user=user,
+        )
+        Membership.objects.create(member=member, club=club, license_no=1)
+        user = User.objects.get(pk=user.pk)
+
+        token = read_from_replica(True)
+        try:
+            with CaptureQueriesContext(connections["replica"]) as replica_queries:
+                shell = build_user_shell(user)
+        finally:
+            reset_read_from_replica(token)
+
+        self.assertEqual(club.pk, shell["club_id"])
+        self.assertEqual(0, len(replica_queries))
+
+    def test_reads_back_to_replica_after_the_window(self):
+        self.client.post(reverse("add_role"), data={"name": "New Role"})
+        self.assertTrue(Role.objects.filter(name="New Role").exists())
+
+        # the cookie expired
+        del self.client.cookies[PRIMARY_STICKY_COOKIE]
+
+        replica_queries, _ = self.get_roles()
+        self.assertTrue(any("core_role" in query["sql"] for query in replica_queries))
@@ -0,0 +1,155 @@
+from io import StringIO
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.enums import GroupEnum
+from core.models import Member, Club, Membership, MemberSearchTerm
+from core.search import normalize, get_words, search_members
+
+
+def create_member(name, surname, city="Lausanne", zip_code="1000"):
+    return Member.objects.create(
+        name=name,
+        surname=surname,
+        house_number="1",
+        street="Rue du Test",
+        city=city,
+        zip_code=zip_code,
+        date_of_birth="1990-01-01",
+        nationality="CH",
+        affiliation_year=2020,
+    )
+
+
+class NormalizationTests(TestCase):
+    def test_normalize(self):
+        self.assertEqual("zoe francois", normalize("Zoé François"))
+
+    def test_license_no_is_one_word(self):
+        self.assertEqual(["01-023", "bern"], get_words("01-023 Bern"))
+
+
+class SearchMembersTests(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+
+        self.mueller = create_member("Jürg", "Müller", city="Zürich", zip_code="8000")
+        self.favre = create_member("Zoé", "Favre", city="Genève", zip_code="1200")
+        self.rossi = create_member("Giulia", "Rossi", city="Lugano", zip_code="6900")
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.create(member=self.rossi, club=self.club, license_no=23)
+
+    def test_prefix(self):
+        self.assertEqual([self.favre], search_members("fav"))
+
+    def test_accents(self):
+        self.assertEqual([self.mueller], search_members("muller"))
+        self.assertEqual([self.favre], search_members("zoe geneve"))
+
+    def test_german_transliteration(self):
+        self.assertEqual([self.mueller], search_members("Mueller"))
+
+    def test_typo(self):
+        self.assertEqual([self.rossi], search_members("Rosi"))
+        self.assertEqual([self.mueller], search_members("zurcih"))
+
+    def test_every_word_must_match(self):
+        self.assertEqual([], search_members("favre lugano"))
+
+    def test_zip_code_and_license_no(self):
+        self.assertEqual([self.rossi], search_members("6900"))
+        self.assertEqual([self.rossi], search_members("01-023"))
+        self.assertEqual([self.rossi], search_members("01-02"))
+
+    def test_scope(self):
+        members = Member.objects.filter(membership__club=self.club)
+
+        self.assertEqual([], search_members("favre", members))
+
+    def test_updated_on_save(self):
+        self.favre.surname = "Bonvin"
+        self.favre.save()
+
+        self.assertEqual([], search_members("favre"))
+        self.assertEqual([self.favre], search_members("bonvin"))
+
+    def test_updated_on_membership_change(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.create(member=self.favre, club=self.club, license_no=7)
+
+        self.assertEqual([self.favre], search_members("01-007"))
+
+    def test_rebuild_command(self):
+        MemberSearchTerm.objects.all().delete()
+        out = StringIO()
+
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("Indexed 3 members", out.getvalue())
+        self.assertEqual([self.rossi], search_members("01-023"))
+
+
+class MemberSearchViewsTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.member = create_member("Zoé", "Favre")
+        Membership.objects.create(member=self.member, club=self.club, license_no=5)
+
+    def test_json(self):
+        response = self.client.get(reverse("member_search_json"), {"q": "favr"})
+
+        self.assertEqual(response.status_code, 200)
+        result = response.json()["results"][0]
+        self.assertEqual(self.member.pk, result["id"])
+        self.assertEqual("01-005", result["license_no"])
+
+    def test_fragment(self):
+        response = self.client.get(reverse("member_search"), {"q": "favre"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Zoé Favre")
+
+    def test_club_admin_searches_its_club(self):
+        other = create_member("Anna", "Favre")
+        club_admin = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        club_admin.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        other.user = club_admin
+        other.save()
+        other_club = Club.objects.create(name="Other Club", affiliation_year=2019, license_no=2)
+        Membership.objects.create(member=other, club=other_club, license_no=1)
+
+        self.client.login(username="clubAdminUser", password="testpassword")
+        response = self.client.get(reverse("member_search_json"), {"q": "favre"})
+
+        self.assertEqual([other.pk], [result["id"] for result in response.json()["results"]])
+
+    def test_json_pages(self):
+        for index in range(3):
+            create_member(f"Anna{index}", "Favre")
+
+        response = self.client.get(reverse("member_search_json"), {"q": "favre", "limit": 3})
+        self.assertTrue(response.json()["more"])
+        self.assertEqual(3, len(response.json()["results"]))
+
+        response = self.client.get(reverse("member_search_json"), {"q": "favre", "limit": 3, "page": 2})
+        self.assertFalse(response.json()["more"])
+        self.assertEqual(1, len(response.json()["results"]))
+
+    def test_user_json(self):
+        User.objects.create_user(username="anna", email="anna@example.com")
+        self.member.user = User.objects.create_user(username="annabis")
+        self.member.save()
+
+        response = self.client.get(reverse("user_search_json"), {"q": "ann"})
+
+        self.assertEqual(["anna"], [result["text"] for result in response.json()["results"]])
+
@@ -0,0 +1,195 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timezone
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import Group, User
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, TransactionTestCase
+
+from core.enums import GroupEnum
+from core.models import ArchivedMembership, Club, Job, Member, MemberChange, MemberRow, Membership, Role
+from core.snapshots import get_snapshot_models, iter_rows, restore_snapshot, take_snapshot
+from core.trash import soft_delete
+
+
+class SnapshotModelsTests(TestCase):
+    def test_referenced_models_first(self):
+        models = get_snapshot_models()
+        labels = [model._meta.label_lower for model in models]
+
+        for model in models:
+            for field in model._meta.concrete_fields:
+                if field.remote_field and field.remote_field.model in models:
+                    self.assertLessEqual(
+                        models.index(field.remote_field.model), models.index(model), f"{model} {field}"
+                    )
+        self.assertIn("core.member_roles", labels)
+        self.assertIn("auth.user_groups", labels)
+        self.assertNotIn("sessions.session", labels)
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+        self.user = User.objects.create_user(username="clubadmin", password="password")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2020, license_no=1)
+        self.member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="1",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth=date(2000, 1, 1),
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        self.member.roles.add(Role.objects.first())
+        Membership.objects.create(member=self.member, club=self.club, license_no=1)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "snapshot.jsonl.gz")
+
+    def test_file(self):
+        counts = take_snapshot(self.path, chunk_size=2)
+
+        with gzip.open(self.path, "rt") as file:
+            lines = [json.loads(line) for line in file]
+        header = lines[0]
+        self.assertEqual(1, header["format"])
+        self.assertEqual(list(counts), header["models"])
+        self.assertEqual(User.objects.count(), counts["auth.user"])
+        # a line per table and per row
+        self.assertEqual(1 + len(counts) + sum(counts.values()), len(lines))
+
+    def test_round_trip(self):
+        soft_delete(Club.objects.create(name="Deleted", affiliation_year=2020, license_no=2))
+        roles = Role.objects.count()
+        # the timestamps set on creation are restored as they were
+        created_at = datetime(2026, 9, 19, 12, tzinfo=timezone.utc)
+        job = Job.objects.create(name="purge_deleted")
+        member_change = MemberChange.objects.create(member=self.member, applicant=self.user, changes={})
+        archived = ArchivedMembership.objects.create(original_id=1, member=self.member, club=self.club, license_no=2)
+        Job.objects.filter(pk=job.pk).update(created_at=created_at)
+        MemberChange.objects.filter(pk=member_change.pk).update(created_at=created_at)
+        ArchivedMembership.objects.filter(pk=archived.pk).update(archived_at=created_at)
+        snapshot_counts = take_snapshot(self.path, chunk_size=2)
+
+        # changed after the snapshot
+        Member.objects.create(
+            name="Jane",
+            surname="Doe",
+            house_number="2",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth=date(2001, 1, 1),
+            nationality="CH",
+            affiliation_year=2021,
+        )
+        Club.objects.filter(pk=self.club.pk).update(name="Renamed")
+        self.user.delete()
+
+        counts = restore_snapshot(self.path, batch_size=2)
+
+        self.assertEqual(snapshot_counts, counts)
+        self.assertEqual(["John"], list(Member.objects.values_list("name", flat=True)))
+        self.assertEqual("Club", Club.objects.get(pk=self.club.pk).name)
+        self.assertEqual(date(2000, 1, 1), Member.objects.get().date_of_birth)
+        self.assertEqual(roles, Role.objects.count())
+        self.assertEqual(1, Member.objects.get().roles.count())
+        self.assertTrue(MemberRow.objects.filter(member=self.member).exists())
+        self.assertTrue(Club.all_objects.filter(name="Deleted", deleted_at__isnull=False).exists())
+        self.assertEqual(created_at, Job.objects.get(pk=job.pk).created_at)
+        self.assertEqual(created_at, MemberChange.objects.get(pk=member_change.pk).created_at)
+        self.assertEqual(created_at, ArchivedMembership.objects.get(pk=archived.pk).archived_at)
+        self.assertTrue(Job._meta.get_field("created_at").auto_now_add)
+        user = User.objects.get(username="clubadmin")
+        self.assertTrue(user.check_password("password"))
+        self.assertTrue(user.groups.filter(name=GroupEnum.CLUB_ADMIN.value).exists())
+
+    def test_not_a_snapshot(self):
+        with gzip.open(self.path, "wt") as file:
+            file.write("{}\n")
+
+        with self.assertRaises(ValueError):
+            restore_snapshot(self.path)
+        self.assertTrue(Member.objects.exists())
+
+    def test_commands(self):
+        out = StringIO()
+        call_command("snapshot_database", self.path, stdout=out)
+        self.assertIn("Wrote", out.getvalue())
+
+        Member.all_objects.all().delete()
+        call_command("restore_snapshot", self.path, no_input=True, stdout=out)
+        self.assertIn("Restored", out.getvalue())
+        self.assertTrue(Member.objects.filter(pk=self.member.pk).exists())
+
+
+class SnapshotIsolationTests(TransactionTestCase):
+    """A file database added at runtime, the connections of the in-memory test database share their rows."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.previous_settings = connections.settings
+        connections.settings = connections.configure_settings(
+            {
+                **connections.settings,
+                "snapshot": {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": os.path.join(cls.directory.name, "database.sqlite3"),
+                },
+            }
+        )
+        call_command("migrate", database="snapshot", run_syncdb=True, verbosity=0)
+        with connections["snapshot"].cursor() as cursor:
+            # the readers keep their snapshot while a writer commits
+            cursor.execute("PRAGMA journal_mode=WAL")
+
+    @classmethod
+    def tearDownClass(cls):
+        connections["snapshot"].close()
+        del connections["snapshot"]
+        connections.settings = cls.previous_settings
+        cls.directory.cleanup()
+
+        super().tearDownClass()
+
+    def test_row_committed_during_the_snapshot_left_out(self):
+        Role.objects.using("snapshot").create(name="Before")
+        path = os.path.join(self.directory.name, "snapshot.jsonl.gz")
+
+        def create_role():
+            # committed by another connection, once the snapshot has read its first row
+            Role.objects.using("snapshot").create(name="During")
+            connections.close_all()
+
+        written = []
+
+        def iter_rows_and_write(*args):
+            for row in iter_rows(*args):
+                yield row
+                if not written:
+                    thread = threading.Thread(target=create_role)
+                    thread.start()
+                    thread.join()
+                    written.append(row)
+
+        with patch("core.snapshots.iter_rows", iter_rows_and_write):
+            counts = take_snapshot(path, using="snapshot", chunk_size=1)
+
+        self.assertEqual(2, Role.objects.using("snapshot").count())
+        self.assertEqual(1, counts["core.role"])
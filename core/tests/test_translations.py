@@ -0,0 +1,71 @@
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from core.translations import (
+    get_catalog_hashes,
+    get_catalog_path,
+    get_source_files,
+    get_sources_hash,
+    plan_compilation,
+    plan_extraction,
+)
+
+
+class TranslationsTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = Path(directory.name)
+        self.locale_dir = self.root / "locale"
+
+        for path in ["core/views.py", "templates/home.html", "static/main.js", "bin/tool.py", "media/notes.txt"]:
+            (self.root / path).parent.mkdir(parents=True, exist_ok=True)
+            (self.root / path).write_text(path)
+
+    def create_catalog(self, language, domain, compiled=True):
+        catalog = get_catalog_path(self.locale_dir, language, domain)
+        catalog.parent.mkdir(parents=True, exist_ok=True)
+        catalog.write_text(f"{language} {domain}")
+        if compiled:
+            catalog.with_suffix(".mo").write_text("")
+        return catalog
+
+    def test_source_files(self):
+        self.assertEqual(["core/views.py", "templates/home.html"], get_source_files(self.root, "django"))
+        self.assertEqual(["static/main.js"], get_source_files(self.root, "djangojs"))
+
+    def test_sources_hash(self):
+        sources_hash = get_sources_hash(self.root, "django")
+        (self.root / "static" / "main.js").write_text("changed")
+        self.assertEqual(sources_hash, get_sources_hash(self.root, "django"))
+
+        (self.root / "core" / "views.py").write_text("changed")
+        self.assertNotEqual(sources_hash, get_sources_hash(self.root, "django"))
+
+    def test_plan_extraction(self):
+        hashes = {"django": "a", "djangojs": "b"}
+        self.create_catalog("fr", "django")
+        self.create_catalog("fr", "djangojs")
+
+        self.assertEqual(
+            {"django": ["fr", "de"], "djangojs": ["fr", "de"]},
+            plan_extraction(self.locale_dir, ["fr", "de"], hashes, {}),
+        )
+        # unchanged sources, only the missing catalogs
+        self.assertEqual(
+            {"django": ["de"], "djangojs": ["de"]},
+            plan_extraction(self.locale_dir, ["fr", "de"], hashes, {"sources": hashes}),
+        )
+        self.assertEqual({}, plan_extraction(self.locale_dir, ["fr"], hashes, {"sources": hashes}))
+
+    def test_plan_compilation(self):
+        french = self.create_catalog("fr", "django")
+        german = self.create_catalog("de", "django")
+        italian = self.create_catalog("it", "django", compiled=False)
+        manifest = {"catalogs": get_catalog_hashes(self.locale_dir, [french, german, italian])}
+
+        german.write_text("changed")
+
+        self.assertEqual([german, italian], plan_compilation(self.locale_dir, [french, german, italian], manifest))
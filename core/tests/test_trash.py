@@ -0,0 +1,215 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from core.enums import GroupEnum, JobStatus
+from core.dashboard import get_competition_dashboard, rebuild_registration_counts
+from core.models import (
+    Club,
+    Competition,
+    CompetitionRegistration,
+    Discipline,
+    Job,
+    Member,
+    MemberRow,
+    Membership,
+    Team,
+)
+from core.jobs import run_jobs
+from core.versions import get_model_versions
+from core.trash import UNDO_WINDOW, purge_deleted, restore, soft_delete
+
+
+def create_member(name, club, license_no):
+    member = Member.objects.create(
+        name=name,
+        surname="Doe",
+        house_number="1",
+        street="Test Street",
+        city="Test City",
+        zip_code="12345",
+        date_of_birth=date(2000, 1, 1),
+        nationality="CH",
+        affiliation_year=2020,
+    )
+    Membership.objects.create(member=member, club=club, license_no=license_no)
+    return member
+
+
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.competition = Competition.objects.create(name="Cup", due_date=now() + timedelta(days=7))
+        discipline = Discipline.objects.create(name="Solo", competition=self.competition)
+        CompetitionRegistration.objects.create(competition=self.competition, discipline=discipline)
+
+    def test_soft_delete(self):
+        soft_delete(self.competition)
+
+        self.assertFalse(Competition.objects.filter(pk=self.competition.pk).exists())
+        self.assertTrue(Competition.all_objects.filter(pk=self.competition.pk).exists())
+        # nothing cascaded yet, only hidden
+        self.assertEqual(1, CompetitionRegistration.all_objects.count())
+
+        job = Job.objects.get(name="purge_deleted")
+        self.assertEqual(JobStatus.PENDING.value, job.status)
+        self.assertEqual(self.competition.deleted_at + UNDO_WINDOW, job.run_at)
+
+    def test_restore(self):
+        soft_delete(self.competition)
+
+        self.assertTrue(restore(self.competition))
+        self.assertTrue(Competition.objects.filter(pk=self.competition.pk).exists())
+        self.assertFalse(restore(self.competition))
+
+    def test_deleted_again_within_the_undo_window(self):
+        deleted_at = now()
+        with patch("core.trash.now", return_value=deleted_at):
+            soft_delete(self.competition)
+        restore(self.competition)
+        with patch("core.trash.now", return_value=deleted_at + timedelta(minutes=10)):
+            soft_delete(self.competition)
+
+        self.assertEqual(2, Job.objects.filter(name="purge_deleted", status=JobStatus.PENDING.value).count())
+
+        # the job of the first deletion runs before the row is due
+        with patch("core.jobs.now", return_value=deleted_at + UNDO_WINDOW), patch(
+            "core.trash.now", return_value=deleted_at + UNDO_WINDOW
+        ):
+            self.assertEqual(1, run_jobs("worker"))
+        self.assertTrue(Competition.all_objects.exists())
+
+        later = deleted_at + timedelta(minutes=10) + UNDO_WINDOW
+        with patch("core.jobs.now", return_value=later), patch("core.trash.now", return_value=later):
+            self.assertEqual(1, run_jobs("worker"))
+        self.assertFalse(Competition.all_objects.exists())
+
+    def test_purge(self):
+        soft_delete(self.competition)
+
+        self.assertEqual(0, purge_deleted()["competition"])
+
+        purged = purge_deleted(before=now())
+
+        self.assertEqual(1, purged["competition"])
+        self.assertFalse(Competition.all_objects.exists())
+        self.assertFalse(CompetitionRegistration.objects.exists())
+
+    def test_purge_batches(self):
+        for index in range(3):
+            soft_delete(Competition.objects.create(name=f"Cup {index}"))
+
+        self.assertEqual(3, purge_deleted(before=now(), batch_size=2)["competition"])
+        self.assertEqual(1, Competition.all_objects.count())
+
+    def test_owned_rows_hidden_with_competition(self):
+        soft_delete(self.competition)
+
+        self.assertFalse(Discipline.objects.exists())
+        self.assertFalse(CompetitionRegistration.objects.exists())
+        self.assertTrue(CompetitionRegistration.all_objects.exists())
+
+        restore(self.competition)
+
+        self.assertTrue(Discipline.objects.exists())
+        self.assertTrue(CompetitionRegistration.objects.exists())
+
+    def test_purge_command(self):
+        out = StringIO()
+        call_command("purge_deleted", stdout=out)
+
+        self.assertIn("Purged 0 rows", out.getvalue())
+
+
+class DeletedClubTests(TestCase):
+    def setUp(self):
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.member = create_member("Anna", self.club, 1)
+        self.team = Team.objects.create(name="Team", club=self.club)
+        competition = Competition.objects.create(name="Cup", due_date=now() + timedelta(days=7))
+        CompetitionRegistration.objects.create(competition=competition, team=self.team, club=self.club)
+        rebuild_registration_counts()
+
+    def test_owned_rows_hidden(self):
+        versions = get_model_versions([Team, Membership, CompetitionRegistration])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            soft_delete(self.club)
+
+        self.assertFalse(Team.objects.exists())
+        self.assertFalse(Membership.objects.exists())
+        self.assertFalse(CompetitionRegistration.objects.exists())
+        self.assertTrue(Membership.all_objects.exists())
+        self.assertNotEqual(versions, get_model_versions([Team, Membership, CompetitionRegistration]))
+        # the member is kept, without a club
+        self.assertIsNone(MemberRow.objects.get(member=self.member).club_id)
+        self.assertEqual([], get_competition_dashboard()["clubs"])
+
+    def test_owned_rows_restored(self):
+        soft_delete(self.club)
+        restore(self.club)
+
+        self.assertTrue(Team.objects.exists())
+        self.assertEqual(self.club.pk, MemberRow.objects.get(member=self.member).club_id)
+        self.assertEqual(1, len(get_competition_dashboard()["clubs"]))
+
+
+class TrashViewsTests(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        self.member = create_member("Anna", self.club, 1)
+
+        self.user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+    def test_delete_and_restore(self):
+        response = self.client.post(reverse("remove_club", args=[self.club.pk]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertIn("trashListChanged", response["HX-Trigger"])
+        self.assertEqual(self.user, Club.all_objects.get(pk=self.club.pk).deleted_by)
+
+        response = self.client.get(reverse("trash"))
+        self.assertContains(response, reverse("restore_deleted", args=["club", self.club.pk]))
+
+        response = self.client.post(reverse("restore_deleted", args=["club", self.club.pk]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertIn("clubListChanged", response["HX-Trigger"])
+        self.assertTrue(Club.objects.filter(pk=self.club.pk).exists())
+
+    def test_restore_unknown_model(self):
+        response = self.client.post(reverse("restore_deleted", args=["user", self.user.pk]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_club_admin_sees_only_their_members(self):
+        other_club = Club.objects.create(name="Other Club", affiliation_year=2019, license_no=2)
+        other_member = create_member("Bea", other_club, 1)
+        soft_delete(other_member)
+        soft_delete(other_club)
+
+        club_admin = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        club_admin.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        admin_member = create_member("Carla", self.club, 2)
+        admin_member.user = club_admin
+        admin_member.save()
+        soft_delete(self.member)
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+        response = self.client.get(reverse("trash"))
+
+        self.assertContains(response, reverse("restore_deleted", args=["member", self.member.pk]))
+        self.assertNotContains(response, reverse("restore_deleted", args=["member", other_member.pk]))
+        self.assertNotContains(response, reverse("restore_deleted", args=["club", other_club.pk]))
+        self.assertEqual(
+            self.client.post(reverse("restore_deleted", args=["member", other_member.pk])).status_code, 404
+        )
@@ -6,8 +6,8 @@ from django.core.management import call_command
 from django.test import TestCase
 from django.utils.datetime_safe import datetime
 
-from core.enums import GroupEnum
-from core.models import Member, Club, Membership, MemberChange, MembershipChange
+from core.enums import GroupEnum, RuleCondition, RuleOption
+from core.models import Member, Club, Membership, MemberChange, MembershipChange, YearRule
 from core.utils import (
     run_command,
     get_years_map,
@@ -18,6 +18,7 @@ from core.utils import (
     is_user_club_admin,
     get_user_member,
     get_user_club,
+    check_age_rules,
 )
 
 
@@ -151,15 +152,17 @@ class ValidatorTests(TestCase):
 
         # Mock Member
         member_change = MemberChange.objects.create(
-            name="John",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "John",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             # MemberChange fields
             applicant=self.club_admin_user,
             member=original_member,
@@ -267,15 +270,17 @@ class SaveMembershipClubAdminTests(TestCase):
         self.request.user = self.club_admin_user
 
         self.member_change = MemberChange.objects.create(
-            name="Member Change",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "Member Change",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.club_admin_user,
         )
 
@@ -319,15 +324,17 @@ class SaveMembershipClubAdminTests(TestCase):
 
         # Mock Member
         member_change = MemberChange.objects.create(
-            name="John",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "John",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             # MemberChange fields
             applicant=self.club_admin_user,
             member=original_member,
@@ -362,15 +369,17 @@ class SaveMembershipClubAdminTests(TestCase):
 
         # Mock Member
         member_change = MemberChange.objects.create(
-            name="John",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "John",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             # MemberChange fields
             applicant=self.club_admin_user,
             member=original_member,
@@ -537,3 +546,68 @@ class TestClubAdminGetters(TestCase):
 
         club = get_user_club(None)
         self.assertEqual(None, club)
+
+
+class CheckAgeRulesTests(TestCase):
+    def setUp(self):
+        self.member_ages = [("Anna", 10), ("Bea", 12), ("Carla", 15)]
+
+    def rule(self, option, condition, value, band_min=None, band_max=None):
+        return YearRule(
+            name="Rule", option=option, condition=condition, value=value, band_min=band_min, band_max=band_max
+        )
+
+    def test_member_rule(self):
+        rule = self.rule(RuleOption.YEAR.value, RuleCondition.GREATER.value, 11)
+
+        self.assertEqual([("Anna", " age is not greater than ", 11)], check_age_rules([rule], self.member_ages))
+
+    def test_average_equal_to(self):
+        # the average of 10, 12 and 15 is 12.33
+        passing = self.rule(RuleOption.YEAR.value, RuleCondition.AVERAGE_EQUAL_TO.value, 12)
+        failing = self.rule(RuleOption.YEAR.value, RuleCondition.AVERAGE_EQUAL_TO.value, 13)
+
+        self.assertEqual([], check_age_rules([passing], self.member_ages))
+        self.assertEqual(
+            [("Average age", " is not equal to ", 13)], check_age_rules([failing], self.member_ages)
+        )
+
+    def test_average_equal_to_rounds_halves_up(self):
+        # averages of 10.5 and 11.5, both rounded up
+        for ages, value in (([10, 11], 11), ([11, 12], 12)):
+            rule = self.rule(RuleOption.YEAR.value, RuleCondition.AVERAGE_EQUAL_TO.value, value)
+            member_ages = [(f"Member {age}", age) for age in ages]
+
+            self.assertEqual([], check_age_rules([rule], member_ages))
+
+    def test_aggregates(self):
+        rules = [
+            self.rule(RuleOption.AVERAGE_YEAR.value, RuleCondition.LESS_THAN.value, 12),
+            self.rule(RuleOption.MIN_YEAR.value, RuleCondition.GREATER_OR_EQUAL.value, 10),
+            self.rule(RuleOption.MAX_YEAR.value, RuleCondition.LESS_THAN_OR_EQUAL.value, 14),
+            self.rule(RuleOption.SUM_YEAR.value, RuleCondition.LESS_THAN.value, 40),
+        ]
+
+        self.assertEqual(
+            [
+                ("Average age", " is not less than ", 12),
+                ("Maximum age", " is not less than or equal to ", 14),
+            ],
+            check_age_rules(rules, self.member_ages),
+        )
+
+    def test_band_count(self):
+        rule = self.rule(
+            RuleOption.YEAR_BAND_COUNT.value, RuleCondition.GREATER_OR_EQUAL.value, 3, band_min=11, band_max=15
+        )
+
+        self.assertEqual(
+            [("Members aged 11-15", " is not greater or equal to ", 3)],
+            check_age_rules([rule], self.member_ages),
+        )
+
+    def test_empty_team(self):
+        rule = self.rule(RuleOption.AVERAGE_YEAR.value, RuleCondition.EQUAL.value, 12)
+
+        self.assertEqual([], check_age_rules([rule], []))
+
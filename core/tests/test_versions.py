@@ -0,0 +1,190 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Member, Club, Membership, Role, Competition, ModelVersion
+from core.versions import get_model_versions, bump_model_version, get_versions, bump_versions
+
+
+class VersionsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_versions(self):
+        version = get_versions(["test:key"])[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(["test:key"])
+
+        self.assertEqual([version + 1], get_versions(["test:key"]))
+
+    def test_versions_read_from_cache(self):
+        get_versions(["test:key1", "test:key2"])
+
+        with self.assertNumQueries(0):
+            get_versions(["test:key1", "test:key2"])
+
+    def test_versions_database_fallback(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(["test:key"])
+        version = get_versions(["test:key"])[0]
+
+        cache.clear()
+
+        self.assertEqual([version], get_versions(["test:key"]))
+        self.assertTrue(ModelVersion.objects.filter(key="test:key", version=version).exists())
+
+    def test_bumped_on_commit(self):
+        version = get_versions(["test:key"])[0]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with CaptureQueriesContext(connection) as queries:
+                bump_versions(["test:key"])
+            self.assertEqual(0, len(queries))
+            self.assertEqual([version], get_versions(["test:key"]))
+
+        self.assertEqual([version + 1], get_versions(["test:key"]))
+        self.assertEqual(version + 1, ModelVersion.objects.get(key="test:key").version)
+
+    def test_incremented_in_the_database(self):
+        version = get_versions(["test:key"])[0]
+        # bumped by another process, the cache of this one is behind
+        ModelVersion.objects.filter(key="test:key").update(version=version + 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(["test:key"])
+
+        self.assertEqual(version + 11, ModelVersion.objects.get(key="test:key").version)
+        self.assertEqual([version + 11], get_versions(["test:key"]))
+
+    def test_missing_version_created(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_versions(["test:key"])
+
+        self.assertEqual([ModelVersion.objects.get(key="test:key").version], get_versions(["test:key"]))
+
+
+class ModelVersionsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        self.club_1 = Club.objects.create(name="Club1", affiliation_year=2019, license_no=1)
+        self.club_2 = Club.objects.create(name="Club2", affiliation_year=2019, license_no=2)
+
+        self.member = Member.objects.create(
+            name="John",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        self.membership = Membership.objects.create(member=self.member, club=self.club_1, license_no=1)
+
+    def test_bumped_on_save(self):
+        versions = get_model_versions([Competition])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Competition.objects.create(name="Competition")
+
+        self.assertNotEqual(versions, get_model_versions([Competition]))
+
+    def test_bumped_on_delete(self):
+        versions = get_model_versions([Member])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.delete()
+
+        self.assertNotEqual(versions, get_model_versions([Member]))
+
+    def test_bumped_on_m2m_change(self):
+        versions = get_model_versions([Member, Role])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.roles.add(Role.objects.create(name="Role"))
+
+        new_versions = get_model_versions([Member, Role])
+        self.assertNotEqual(versions[0], new_versions[0])
+        self.assertNotEqual(versions[1], new_versions[1])
+
+    def test_club_versions(self):
+        club_1_versions = get_model_versions([Member, Membership], club_id=self.club_1.pk)
+        club_2_versions = get_model_versions([Member, Membership], club_id=self.club_2.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.city = "Other City"
+            self.member.save()
+            self.membership.license_no = 2
+            self.membership.save()
+
+        self.assertNotEqual(club_1_versions, get_model_versions([Member, Membership], club_id=self.club_1.pk))
+        self.assertEqual(club_2_versions, get_model_versions([Member, Membership], club_id=self.club_2.pk))
+
+    def test_global_models_ignore_club(self):
+        self.assertEqual(
+            get_model_versions([Competition]),
+            get_model_versions([Competition], club_id=self.club_1.pk),
+        )
+
+    def test_bumped_on_queryset_update(self):
+        club_2_versions = get_model_versions([Member], club_id=self.club_2.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.objects.filter(pk=self.member.pk).update(city="Other City")
+
+        # the clubs of the updated rows are unknown, every club is outdated
+        self.assertNotEqual(club_2_versions, get_model_versions([Member], club_id=self.club_2.pk))
+
+    def test_bumped_on_bulk_update(self):
+        versions = get_model_versions([Member])
+
+        self.member.city = "Other City"
+        with self.captureOnCommitCallbacks(execute=True):
+            Member.objects.bulk_update([self.member], ["city"])
+
+        self.assertNotEqual(versions, get_model_versions([Member]))
+
+    def test_bumped_on_bulk_create(self):
+        club_1_versions = get_model_versions([Membership], club_id=self.club_1.pk)
+        club_2_versions = get_model_versions([Membership], club_id=self.club_2.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.bulk_create(
+                [Membership(member=self.member, club=self.club_2, license_no=3)]
+            )
+
+        self.assertEqual(club_1_versions, get_model_versions([Membership], club_id=self.club_1.pk))
+        self.assertNotEqual(club_2_versions, get_model_versions([Membership], club_id=self.club_2.pk))
+
+    def test_explicit_bump(self):
+        versions = get_model_versions([Club], club_id=self.club_1.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_model_version(Club, club_ids=[self.club_1.pk])
+
+        self.assertNotEqual(versions, get_model_versions([Club], club_id=self.club_1.pk))
+
+    def test_member_without_membership_bumps_every_club(self):
+        member = Member.objects.create(
+            name="Jane",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        club_2_versions = get_model_versions([Member], club_id=self.club_2.pk)
+
+        member.city = "Other City"
+        with self.captureOnCommitCallbacks(execute=True):
+            member.save()
+
+        # the club taking them next lists them
+        self.assertNotEqual(club_2_versions, get_model_versions([Member], club_id=self.club_2.pk))
@@ -1,10 +1,13 @@
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
 
 from django.contrib.auth.models import User, AnonymousUser, Group
+from django.core.cache import cache
 from django.core.management import call_command
 from django.http import HttpResponse
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, AsyncClient
 from unittest.mock import Mock, patch, MagicMock
 from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse
@@ -19,7 +22,10 @@ from core.forms import (
     ON_CREATING_MEMBER_WITH_CLUB_ADMIN_USER__USER_NOT_SELECTED_ERROR,
     ON_CREATING_MEMBER_WITH_CLUB_ADMIN_USER__CLUB_NOT_SELECTED_ERROR, CompetitionForm,
 )
-from core.models import Club, Member, Membership, Role, MemberChange, MembershipChange, Team, Competition
+from core.models import (
+    Club, Member, Membership, Role, MemberChange, MembershipChange, Team, Competition, Discipline, Division,
+    YearRule,
+)
 from core.views import (
     CardTemplateView,
     get_success_response,
@@ -31,6 +37,11 @@ from core.views import (
     DatatableUpdateView,
     HomeView,
     MemberListView,
+    MemberUpdateView,
+    LicenseNoFieldView,
+    LoadDisciplinesView,
+    LoadDivisionsView,
+    GetNotPassedRulesView,
 )
 
 
@@ -430,7 +441,8 @@ class TestMemberListView(TestCase):
         )
 
         response = self.client.get(self.url)
-        members_in_context = response.context["object_list"]
+        # the list reads the member rows, see core/member_rows.py
+        members_in_context = [row.member for row in response.context["object_list"]]
 
         # make sure that 2 members are returned
         self.assertEqual(len(members_in_context), 2)
@@ -457,7 +469,7 @@ class TestMemberListView(TestCase):
         )
 
         response = self.client.get(self.url)
-        members_in_context = response.context["object_list"]
+        members_in_context = [row.member for row in response.context["object_list"]]
 
         # make sure that 1 member is returned
         self.assertEqual(len(members_in_context), 1)
@@ -466,6 +478,116 @@ class TestMemberListView(TestCase):
         self.assertIn(self.member_1, members_in_context)
 
 
+class TestMemberListViewConditionalGet(TestCase):
+    def setUp(self):
+        cache.clear()
+
+        # Insert default data that includes the FSTB Admin and Club Admin group
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(
+            username="fstbAdminUser", password="testpassword"
+        )
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+        self.member = Member.objects.create(
+            name="Member1",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="US",
+            affiliation_year=2019,
+        )
+
+        self.url = reverse("members")
+
+    def test_response_has_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_not_modified_when_nothing_changed(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_not_modified_does_not_query_rows(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with patch.object(MemberListView, "get_queryset") as mock_get_queryset:
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        mock_get_queryset.assert_not_called()
+
+    def test_modified_after_member_change(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.member.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(etag, response["ETag"])
+        self.assertContains(response, "Renamed")
+
+    def test_modified_after_related_m2m_change(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.roles.set(Role.objects.all())
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_modified_after_change_in_other_club_for_fstb_and_club_admin(self):
+        # a FSTB admin who is a club admin too lists the members of every club
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        other_club = Club.objects.create(name="Other Club", affiliation_year=2019, license_no=2)
+        self.member.user = self.user
+        self.member.save()
+        Membership.objects.create(member=self.member, club=club, license_no=1)
+        other_member = Member.objects.create(
+            name="Member2",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="US",
+            affiliation_year=2019,
+        )
+        Membership.objects.create(member=other_member, club=other_club, license_no=1)
+        etag = self.client.get(self.url)["ETag"]
+
+        other_member.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            other_member.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Renamed")
+
+    def test_etag_depends_on_language(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get("/fr" + self.url[3:], HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+
+
 class MemberCreateViewTest(TestCase):
     def setUp(self):
         # Url for requests
@@ -716,7 +838,7 @@ class MemberCreateViewClubAdminTest(TestCase):
         self.assertEqual(response.status_code, 204)
 
         # verify that the member is created
-        self.assertTrue(MemberChange.objects.filter(name="New Member").exists())
+        self.assertTrue(MemberChange.objects.filter(changes__name="New Member").exists())
 
         # verify that the change membership is created
         self.assertEqual(MembershipChange.objects.all().count(), 1)
@@ -724,7 +846,7 @@ class MemberCreateViewClubAdminTest(TestCase):
         # verify that the new membership is created
         self.assertTrue(
             MembershipChange.objects.filter(
-                member__name="New Member", club__name="Club of the user"
+                member__changes__name="New Member", club__name="Club of the user"
             ).exists()
         )
 
@@ -1121,7 +1243,32 @@ class MemberUpdateViewClubAdminTest(TestCase):
 
         self.assertEqual(response.status_code, 204)
         updated_member = MemberChange.objects.get(member=self.member_1)
-        self.assertEqual(updated_member.name, "New Name")
+        self.assertEqual(updated_member.changes["name"], "New Name")
+
+    def test_update_member_htmx_swaps_no_row(self):
+        url = reverse(self.post_uri, args=[self.member_1.id])
+        data = {
+            "name": "New Name",
+            "surname": "Doe",
+            "house_number": "123",
+            "street": "Test Street",
+            "city": "Test City",
+            "zip_code": "12345",
+            "date_of_birth": "2000-01-01",
+            "nationality": "US",
+            "affiliation_year": 2020,
+            "roles": [Role.objects.filter(name=RoleEnum.ATHLETE.value).first().id],
+            "exams": [],
+            "js": [],
+            "license_no": 1,
+        }
+        response = self.client.post(url, data, HTTP_HX_REQUEST="true")
+
+        # the change waits for its approval, no row of the list is swapped
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual("none", response.headers["HX-Reswap"])
+        self.assertNotIn("HX-Trigger-After-Swap", response.headers)
+        self.assertIn("Old Name", response.headers["HX-Trigger"])
 
 
 class MemberChangesListViewTest(TestCase):
@@ -1177,15 +1324,17 @@ class MemberChangesListViewTest(TestCase):
 
         # Create ChangeMember
         self.member_change = MemberChange.objects.create(
-            name="New Name",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=self.member,
         )
@@ -1201,15 +1350,17 @@ class MemberChangesListViewTest(TestCase):
 
         # Create 2 ChangeMember
         self.member_change_2 = MemberChange.objects.create(
-            name="New Name 2",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name 2",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=self.member,
         )
@@ -1253,6 +1404,14 @@ class MemberChangesListViewTest(TestCase):
         self.assertNotIn(self.member_change, members_in_context)
         self.assertIn(self.member_change_2, members_in_context)
 
+    def test_detail_shows_the_changes(self):
+        url = reverse("member_change_detail", args=[self.member_change_2.id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Old Name")
+        self.assertContains(response, "New Name 2")
+
     def test_view_updated_new_member_change(self):
         Member.objects.all().delete()
         Membership.objects.all().delete()
@@ -1260,15 +1419,17 @@ class MemberChangesListViewTest(TestCase):
         MembershipChange.objects.all().delete()
 
         new_member_change = MemberChange.objects.create(
-            name="New Name 3",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name 3",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
         )
 
@@ -1280,15 +1441,17 @@ class MemberChangesListViewTest(TestCase):
         )
 
         member_change = MemberChange.objects.create(
-            name="New Name 3",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name 3",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
         )
 
@@ -1334,15 +1497,17 @@ class MemberChangeApproveViewTest(TestCase):
     def test_approve_add_member(self):
         # Create ChangeMember
         self.member_change = MemberChange.objects.create(
-            name="John",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "John",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
         )
 
@@ -1384,15 +1549,17 @@ class MemberChangeApproveViewTest(TestCase):
 
         # Create ChangeMember
         member_change = MemberChange.objects.create(
-            name="New Name",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=member,
         )
@@ -1440,15 +1607,17 @@ class MemberChangeApproveViewTest(TestCase):
 
         # Create ChangeMember
         member_change = MemberChange.objects.create(
-            name="New Name",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=member,
         )
@@ -1464,15 +1633,17 @@ class MemberChangeApproveViewTest(TestCase):
 
         # Create 2 ChangeMember
         member_change_2 = MemberChange.objects.create(
-            name="New Name 2",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name 2",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=member,
         )
@@ -1537,15 +1708,17 @@ class MemberChangeDeclinedViewTest(TestCase):
     def test_decline_add_member(self):
         # Create ChangeMember
         self.member_change = MemberChange.objects.create(
-            name="John",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "John",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
         )
 
@@ -1587,15 +1760,17 @@ class MemberChangeDeclinedViewTest(TestCase):
 
         # Create ChangeMember
         member_change = MemberChange.objects.create(
-            name="New Name",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=member,
         )
@@ -1643,15 +1818,17 @@ class MemberChangeDeclinedViewTest(TestCase):
 
         # Create ChangeMember
         member_change = MemberChange.objects.create(
-            name="New Name",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=member,
         )
@@ -1667,15 +1844,17 @@ class MemberChangeDeclinedViewTest(TestCase):
 
         # Create 2 ChangeMember
         member_change_2 = MemberChange.objects.create(
-            name="New Name 2",
-            surname="Doe",
-            house_number="123",
-            street="Test Street",
-            city="Test City",
-            zip_code="12345",
-            date_of_birth="1990-01-01",
-            nationality="US",
-            affiliation_year=2020,
+            changes={
+                "name": "New Name 2",
+                "surname": "Doe",
+                "house_number": "123",
+                "street": "Test Street",
+                "city": "Test City",
+                "zip_code": "12345",
+                "date_of_birth": "1990-01-01",
+                "nationality": "US",
+                "affiliation_year": 2020,
+            },
             applicant=self.user,
             member=member,
         )
@@ -2342,6 +2521,114 @@ class LicenseNoFieldViewTest(TestCase):
         self.assertIn(b'name="license_no"', response.content)
 
 
+class AsyncFragmentViewsTest(TestCase):
+    def setUp(self):
+        # Insert default data that includes the FSTB Admin and Club Admin group
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+        User.objects.create_user(username="simpleUser", password="testpassword")
+
+        # still open to registrations
+        self.competition = Competition.objects.create(name="Competition", due_date=now() + timedelta(days=7))
+        self.discipline = Discipline.objects.create(
+            name="Discipline", competition=self.competition, min_members_number=2
+        )
+        Discipline.objects.create(name="Other Discipline", competition=self.competition)
+        self.division = Division.objects.create(name="Division", discipline=self.discipline)
+        self.team = Team.objects.create(name="Team")
+
+        self.async_client = AsyncClient()
+
+    async def test_views_are_async(self):
+        for view in (LicenseNoFieldView, LoadDisciplinesView, LoadDivisionsView, GetNotPassedRulesView):
+            self.assertTrue(view.view_is_async)
+
+    async def test_anonymous_user_is_redirected(self):
+        response = await self.async_client.get(
+            reverse("load_disciplines"), {"competition": self.competition.pk}
+        )
+
+        self.assertEqual(response.status_code, 302)
+
+    async def test_not_admin_user_is_forbidden(self):
+        await sync_to_async(self.async_client.login)(username="simpleUser", password="testpassword")
+
+        response = await self.async_client.get(
+            reverse("load_disciplines"), {"competition": self.competition.pk}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_load_disciplines(self):
+        await sync_to_async(self.async_client.login)(username="clubAdminUser", password="testpassword")
+
+        response = await self.async_client.get(
+            reverse("load_disciplines"), {"competition": self.competition.pk}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"Discipline", response.content)
+        self.assertIn(b"Other Discipline", response.content)
+
+    async def test_load_divisions(self):
+        await sync_to_async(self.async_client.login)(username="clubAdminUser", password="testpassword")
+
+        response = await self.async_client.get(
+            reverse("load_divisions"), {"discipline": self.discipline.pk}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'name="division"', response.content)
+        self.assertIn(b"Division", response.content)
+
+    async def test_not_passed_rules(self):
+        await sync_to_async(self.async_client.login)(username="clubAdminUser", password="testpassword")
+
+        response = await self.async_client.get(
+            reverse("check_rules"),
+            {"discipline": self.discipline.pk, "division": self.division.pk, "team": self.team.pk},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"min_error_message", response.content)
+
+    async def test_not_passed_team_rules(self):
+        member = await Member.objects.acreate(
+            name="John",
+            surname="Doe",
+            house_number="1",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="2000-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        await self.team.members.aadd(member)
+        rule = await YearRule.objects.acreate(
+            name="Average", option="Year", condition="AverageEqualTo", value=5
+        )
+        await self.division.year_rules.aadd(rule)
+        await sync_to_async(self.async_client.login)(username="clubAdminUser", password="testpassword")
+
+        response = await self.async_client.get(
+            reverse("check_rules"),
+            {"discipline": self.discipline.pk, "division": self.division.pk, "team": self.team.pk},
+        )
+
+        self.assertIn(b"Average age is not equal to 5.0", response.content)
+
+    def test_sync_client(self):
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+        response = self.client.get(reverse("load_divisions"), {"discipline": self.discipline.pk})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'name="division"', response.content)
+
+
 # ----- Test Roles Views ---------------------------------------------------
 class RolesCardsViewTest(TestCase):
     def setUp(self):
@@ -2586,6 +2873,139 @@ class RoleUpdateViewTest(TestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class RoleRowSwapTest(TestCase):
+    def setUp(self):
+        # Insert default data that includes the FSTB Admin and Club Admin group
+        call_command("insert_defaults")
+
+        # Create a user that is in the FSTB Admin group
+        self.user = User.objects.create_user(
+            username="fstbAdminUser", password="testpassword"
+        )
+        self.user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.user.save()
+
+        self.role = Role.objects.create(name="Old Role")
+        Role.objects.create(name="Other Role")
+
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+    def get_row_event(self, response):
+        return json.loads(response["HX-Trigger-After-Swap"])["rowChanged"]
+
+    def test_update_renders_only_the_row(self):
+        response = self.client.post(
+            reverse("edit_role", args=[self.role.pk]),
+            data={"name": "Updated Role"},
+            HTTP_HX_REQUEST="true",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual("none", response["HX-Reswap"])
+        content = response.content.decode()
+        self.assertIn(
+            f'hx-swap-oob="innerHTML:#role_list #object_{self.role.pk}"', content
+        )
+        self.assertIn("Updated Role", content)
+        self.assertNotIn("Other Role", content)
+        self.assertNotIn("<table", content)
+
+        # the list is not reloaded
+        self.assertNotIn("roleListChanged", json.loads(response["HX-Trigger"]))
+        self.assertEqual(
+            {
+                "action": "updated",
+                "table_id": "role_list",
+                "row_id": f"object_{self.role.pk}",
+                "list_changed_event": "roleListChanged",
+            },
+            self.get_row_event(response),
+        )
+
+    def test_create_appends_the_row(self):
+        response = self.client.post(
+            reverse("add_role"), data={"name": "New Role"}, HTTP_HX_REQUEST="true"
+        )
+
+        role = Role.objects.get(name="New Role")
+        content = response.content.decode()
+        self.assertIn('hx-swap-oob="beforeend:#role_list > tbody"', content)
+        self.assertIn(f'id="object_{role.pk}"', content)
+        self.assertEqual("added", self.get_row_event(response)["action"])
+
+    def test_delete_sends_a_removal(self):
+        response = self.client.post(
+            reverse("remove_role", args=[self.role.pk]), HTTP_HX_REQUEST="true"
+        )
+
+        self.assertEqual(b"", response.content)
+        self.assertEqual(
+            {
+                "action": "deleted",
+                "table_id": "role_list",
+                "row_id": f"object_{self.role.pk}",
+                "list_changed_event": "roleListChanged",
+            },
+            self.get_row_event(response),
+        )
+
+    def test_not_htmx_request_reloads_the_list(self):
+        response = self.client.post(
+            reverse("edit_role", args=[self.role.pk]), data={"name": "Updated Role"}
+        )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertIn("roleListChanged", json.loads(response["HX-Trigger"]))
+
+
+class MemberRowSwapClubAdminTest(TestCase):
+    def setUp(self):
+        call_command("insert_defaults")
+
+        self.user = User.objects.create_user(username="clubAdminUser", password="testpassword")
+        self.user.groups.add(Group.objects.get(name=GroupEnum.CLUB_ADMIN.value))
+
+        self.club = Club.objects.create(name="Club", affiliation_year=2019, license_no=1)
+        admin = Member.objects.create(
+            name="Admin",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+            user=self.user,
+        )
+        Membership.objects.create(member=admin, club=self.club, license_no=1)
+
+        self.client.login(username="clubAdminUser", password="testpassword")
+
+    def test_row_out_of_the_club_scope_is_removed(self):
+        other_member = Member.objects.create(
+            name="Other",
+            surname="Doe",
+            house_number="123",
+            street="Test Street",
+            city="Test City",
+            zip_code="12345",
+            date_of_birth="1990-01-01",
+            nationality="CH",
+            affiliation_year=2020,
+        )
+        view = MemberUpdateView()
+        view.setup(RequestFactory().post("/", HTTP_HX_REQUEST="true"))
+        view.request.user = self.user
+
+        response = get_success_response(view, other_member, UPDATED_MESSAGE)
+
+        self.assertEqual(b"", response.content)
+        event = json.loads(response["HX-Trigger-After-Swap"])["rowChanged"]
+        self.assertEqual("deleted", event["action"])
+        self.assertEqual(f"object_{other_member.pk}", event["row_id"])
+
+
 # ----- Test Roles Views ---------------------------------------------------
 class TeamsCardsViewTest(TestCase):
     def setUp(self):
@@ -2874,6 +3294,40 @@ class TestCompetitionListView(TestCase):
         self.assertIn(self.competition_2, competitions_in_context)
 
 
+class TestOpenCompetitionsListView(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("insert_defaults")
+
+        user = User.objects.create_user(username="fstbAdminUser", password="testpassword")
+        user.groups.add(Group.objects.get(name=GroupEnum.FSTB_ADMIN.value))
+        self.client.login(username="fstbAdminUser", password="testpassword")
+
+        self.competition = Competition.objects.create(
+            name="Open competition", description="test", due_date=now() + timedelta(hours=1)
+        )
+        self.url = reverse("competitions_open")
+
+    def test_modified_once_due(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "Open competition")
+        etag = response["ETag"]
+
+        # no write, the competition is only past its due date
+        with patch("django.utils.timezone.now", return_value=now() + timedelta(hours=2)):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "Open competition")
+
+    def test_not_modified_before_due(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+
 class CompetitionCreateViewTest(TestCase):
     def setUp(self):
         # Url for requests
@@ -0,0 +1,160 @@
+# ----- generic imports ---------------------------------------------------------
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# ----- Django imports --------------------------------------------------------
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.management.utils import is_ignored_path, popen_wrapper
+
+# The translate command extracts the messages of the languages whose sources
+# changed since its last run, and compiles the catalogs that changed, told by
+# the hashes kept in the translate manifest of the locale directory.
+MANIFEST_FILE_NAME = ".translate_manifest.json"
+
+# the files scanned by makemessages for each domain
+DOMAIN_EXTENSIONS = {
+    "django": (".html", ".txt", ".py"),
+    "djangojs": (".js",),
+}
+# the virtual environment, the collected static files and the uploads hold no
+# message of the project, the collected ones would be scanned twice
+IGNORE_PATTERNS = ["CVS", ".*", "*~", "*.pyc", "bin/*", "lib/*", "media/*", "production_staticfiles/*"]
+
+
+# ---- Manifest ---------------------------------------------------------------
+def load_manifest(locale_dir):
+    try:
+        with open(Path(locale_dir) / MANIFEST_FILE_NAME) as manifest:
+            return json.load(manifest)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(locale_dir, manifest):
+    os.makedirs(locale_dir, exist_ok=True)
+    with open(Path(locale_dir) / MANIFEST_FILE_NAME, "w") as file:
+        json.dump(manifest, file, indent=1, sort_keys=True)
+
+
+def get_file_hash(path):
+    with open(path, "rb") as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+# ---- Extraction -------------------------------------------------------------
+def get_source_files(root, domain, ignore_patterns=IGNORE_PATTERNS):
+    """Return the files makemessages scans for the domain, relative to the root, sorted."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        relative_dir = os.path.relpath(dirpath, root)
+        dirnames[:] = [
+            dirname
+            for dirname in dirnames
+            if not is_ignored_path(os.path.normpath(os.path.join(relative_dir, dirname)), ignore_patterns)
+        ]
+        files += [
+            os.path.normpath(os.path.join(relative_dir, filename))
+            for filename in filenames
+            if filename.endswith(DOMAIN_EXTENSIONS[domain])
+            and not is_ignored_path(os.path.normpath(os.path.join(relative_dir, filename)), ignore_patterns)
+        ]
+    return sorted(files)
+
+
+def get_sources_hash(root, domain):
+    """Return one hash of the path and content of every source file of the domain."""
+    digest = hashlib.sha256()
+    for path in get_source_files(root, domain):
+        digest.update(path.encode())
+        digest.update(get_file_hash(os.path.join(root, path)).encode())
+    return digest.hexdigest()
+
+
+def get_catalog_path(locale_dir, language, domain):
+    return Path(locale_dir) / language / "LC_MESSAGES" / f"{domain}.po"
+
+
+def plan_extraction(locale_dir, languages, sources_hashes, manifest):
+    """Return the languages to extract the messages of, by domain.
+
+    Every language when the sources of the domain changed, else only the ones
+    without a catalog yet.
+    """
+    plan = {}
+    for domain, sources_hash in sources_hashes.items():
+        if manifest.get("sources", {}).get(domain) != sources_hash:
+            pending = list(languages)
+        else:
+            pending = [
+                language
+                for language in languages
+                if not get_catalog_path(locale_dir, language, domain).exists()
+            ]
+        if pending:
+            plan[domain] = pending
+    return plan
+
+
+def extract_messages(domain, languages):
+    """Extract the messages of the domain, scanning the sources once for every language.
+
+    Run in a worker process. The languages of one domain share its .pot file
+    and the temporary files of the templates, only the domains run in parallel.
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    call_command(
+        "makemessages",
+        domain=domain,
+        locale=languages,
+        ignore_patterns=IGNORE_PATTERNS,
+        verbosity=0,
+    )
+    return domain
+
+
+# ---- Compilation ------------------------------------------------------------
+def get_catalogs(locale_dir, languages):
+    return [
+        get_catalog_path(locale_dir, language, domain)
+        for language in languages
+        for domain in DOMAIN_EXTENSIONS
+        if get_catalog_path(locale_dir, language, domain).exists()
+    ]
+
+
+def get_catalog_key(locale_dir, catalog):
+    return Path(catalog).relative_to(locale_dir).as_posix()
+
+
+def get_catalog_hashes(locale_dir, catalogs):
+    return {get_catalog_key(locale_dir, catalog): get_file_hash(catalog) for catalog in catalogs}
+
+
+def plan_compilation(locale_dir, catalogs, manifest):
+    """Return the catalogs changed since they were compiled, or never compiled."""
+    compiled = manifest.get("catalogs", {})
+    hashes = get_catalog_hashes(locale_dir, catalogs)
+    return [
+        catalog
+        for catalog in catalogs
+        if compiled.get(get_catalog_key(locale_dir, catalog)) != hashes[get_catalog_key(locale_dir, catalog)]
+        or not catalog.with_suffix(".mo").exists()
+    ]
+
+
+def compile_catalog(catalog):
+    """Compile the .po catalog to its .mo file, as compilemessages does."""
+    output, errors, status = popen_wrapper(
+        ["msgfmt", "--check-format", "-o", str(catalog.with_suffix(".mo")), str(catalog)]
+    )
+    if status:
+        raise CommandError(f"Execution of msgfmt failed on {catalog}: {errors}")
+    return catalog
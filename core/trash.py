@@ -0,0 +1,143 @@
+# ----- generic imports ---------------------------------------------------------
+from datetime import timedelta
+
+# ----- Django imports --------------------------------------------------------
+from django.db import transaction
+from django.utils.timezone import now
+
+# ----- Core imports ----------------------------------------------------------
+from .cache import bump_shell_version, invalidate_user_shell
+from .member_rows import refresh_member_rows
+from .models import (
+    Club,
+    Competition,
+    CompetitionRegistration,
+    Discipline,
+    Division,
+    Member,
+    Membership,
+    Team,
+)
+from .utils import is_user_fstb_admin
+from .versions import bump_model_version
+
+# Deleting a club, a competition or a member cascades through many tables. The
+# delete views only flag the row, hidden from then on by the default manager,
+# and the purge_deleted job deletes it for good once the undo window is over.
+
+# time left to restore a deleted row, before it is purged
+UNDO_WINDOW = timedelta(minutes=15)
+
+# the models deleted softly, in the order of the trash
+TRASH_MODELS = [Club, Competition, Member]
+
+# the models whose rows are hidden with a deleted row, see `alive_lookups`
+OWNED_MODELS = {
+    Club: [Team, Membership, CompetitionRegistration],
+    Competition: [Discipline, Division, CompetitionRegistration],
+    Member: [Membership],
+}
+
+
+# ---- Delete and restore -----------------------------------------------------
+def get_trash_model(model_name):
+    """Return the soft deleted model of the name, None if there is none."""
+    return next((model for model in TRASH_MODELS if model._meta.model_name == model_name), None)
+
+
+def soft_delete(instance, user=None):
+    """Flag the row as deleted and queue its purge after the undo window."""
+    from .jobs import enqueue
+
+    instance.deleted_at = now()
+    instance.deleted_by = user if user and user.is_authenticated else None
+    type(instance).all_objects.filter(pk=instance.pk).update(
+        deleted_at=instance.deleted_at, deleted_by=instance.deleted_by
+    )
+    refresh_deleted_rows(instance)
+
+    # one job per deletion: the job of an earlier deletion of the row, restored
+    # since, may still be queued, and runs before this one is due
+    enqueue(
+        "purge_deleted",
+        key=f"{instance._meta.label_lower}:{instance.pk}:{instance.deleted_at.isoformat()}",
+        run_at=instance.deleted_at + UNDO_WINDOW,
+    )
+
+
+def restore(instance):
+    """Clear the deleted flag, returns False if the row was not deleted anymore."""
+    restored = type(instance).all_objects.filter(pk=instance.pk, deleted_at__isnull=False).update(
+        deleted_at=None, deleted_by=None
+    )
+    instance.deleted_at = None
+    instance.deleted_by = None
+    refresh_deleted_rows(instance)
+    return bool(restored)
+
+
+def refresh_deleted_rows(instance):
+    # the update sends no signal: the rows hidden or shown again with the
+    # instance are outdated in the caches
+    for model in OWNED_MODELS[type(instance)]:
+        bump_model_version(model)
+
+    # the member is listed from its row, the one of a member of a club shows it
+    if isinstance(instance, Member):
+        refresh_member_rows([instance.pk])
+    elif isinstance(instance, Club):
+        memberships = Membership.all_objects.filter(club=instance)
+        refresh_member_rows(memberships.values_list("member_id", flat=True))
+
+        # the club pickers of the fragments, and the club of its admins
+        invalidate_user_shell(*memberships.values_list("member__user_id", flat=True))
+        bump_shell_version()
+
+
+def get_deleted(model, user):
+    """The deleted rows of the model the user may restore, the last deleted first."""
+    deleted = model.all_objects.filter(deleted_at__isnull=False).order_by("-deleted_at", "-pk")
+    if model is Member:
+        return deleted.for_user(user)
+    return deleted if is_user_fstb_admin(user) else deleted.none()
+
+
+def get_trash(user):
+    """Return the deleted rows the user may restore, grouped by model."""
+    trash = []
+    for model in TRASH_MODELS:
+        deleted = list(get_deleted(model, user))
+        if deleted:
+            trash.append(
+                {
+                    "model_name": model._meta.model_name,
+                    "verbose_name": model._meta.verbose_name_plural,
+                    "objects": [{"object": obj, "purged_at": obj.deleted_at + UNDO_WINDOW} for obj in deleted],
+                }
+            )
+    return trash
+
+
+# ---- Purge ------------------------------------------------------------------
+def purge_deleted(before=None, batch_size=50):
+    """Delete for good the rows deleted before the datetime, returns their number by model.
+
+    Every batch is deleted, with its cascades, in its own transaction.
+    """
+    before = before or now() - UNDO_WINDOW
+    purged = {}
+
+    for model in TRASH_MODELS:
+        due = model.all_objects.filter(deleted_at__lte=before).order_by("pk")
+        purged[model._meta.model_name] = 0
+
+        while True:
+            pks = list(due.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+
+            with transaction.atomic():
+                model.all_objects.filter(pk__in=pks).delete()
+            purged[model._meta.model_name] += len(pks)
+
+    return purged
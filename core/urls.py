@@ -16,8 +16,22 @@ from .views import (
     MemberCreateView,
     MemberDeleteView,
     MemberUpdateView,
+    MemberHistoryView,
+    MemberSearchView,
+    CompetitionDashboardCardsView,
+    CompetitionDashboardView,
+    CompetitionEligibilityView,
+    CompetitionRegistrationBulkCreateView,
+    JobStatusView,
+    JobEnqueueView,
+    TrashCardsView,
+    TrashView,
+    TrashRestoreView,
+    MemberSearchJsonView,
+    UserSearchJsonView,
     # ----- Member Changes --------------------------
     MemberChangesListView,
+    MemberChangeDetailView,
     MemberChangeApproveView,
     MemberChangeDeclineView,
     # ----- Clubs -----------------------------------
@@ -56,6 +70,8 @@ from .views import (
     DisciplinesCreateView, DisciplinesDeleteView, DisciplinesUpdateView, YearRuleCardsView, YearRulesListView,
     YearRuleCreateView, YearRuleDeleteView, YearRuleUpdateView, LoadDisciplinesView, LoadDivisionsView,
     GetNotPassedRulesView,
+    # ----- Monitoring Views ------------------------
+    DatabaseMetricsView,
 )
 
 urlpatterns = [
@@ -69,6 +85,10 @@ urlpatterns = [
     path("members/create/", MemberCreateView.as_view(), name="add_member"),
     path("members/<int:pk>/remove/", MemberDeleteView.as_view(), name="remove_member"),
     path("members/<int:pk>/edit", MemberUpdateView.as_view(), name="edit_member"),
+    path("members/<int:pk>/history", MemberHistoryView.as_view(), name="member_history"),
+    path("members/search/", MemberSearchView.as_view(), name="member_search"),
+    path("members/search.json", MemberSearchJsonView.as_view(), name="member_search_json"),
+    path("users/search.json", UserSearchJsonView.as_view(), name="user_search_json"),
     # ----- Clubs ---------------------------------------------------------------
     path("clubs/view", ClubsCardsView.as_view(), name="clubs_view"),
     path("clubs/", ClubListView.as_view(), name="clubs"),
@@ -81,6 +101,11 @@ urlpatterns = [
     path(
         "memberschips/changes/", MemberChangesListView.as_view(), name="members_changes"
     ),
+    path(
+        "memberschips/changes/<int:pk>/detail",
+        MemberChangeDetailView.as_view(),
+        name="member_change_detail",
+    ),
     path(
         "memberschips/changes/<int:pk>/approve",
         MemberChangeApproveView.as_view(),
@@ -120,8 +145,15 @@ urlpatterns = [
     # ----- Competitions --------------------------------------------------------
     path("competitions/view", CompetitionsCardsView.as_view(), name="competitions_view"),
     path("competitions/", CompetitionsListView.as_view(), name="competitions"),
+    path("competitions/dashboard/view", CompetitionDashboardCardsView.as_view(), name="competition_dashboard_view"),
+    path("competitions/dashboard", CompetitionDashboardView.as_view(), name="competition_dashboard"),
     path("competitions/open/view", OpenCompetitionsCardsView.as_view(), name="competitions_open_view"),
     path("competitions/open", OpenCompetitionsListView.as_view(), name="competitions_open"),
+    path(
+        "competitions/<int:pk>/eligibility",
+        CompetitionEligibilityView.as_view(),
+        name="competition_eligibility",
+    ),
     path("competitions/create/", CompetitionsCreateView.as_view(), name="add_competition"),
     path("competitions/<int:pk>/remove/", CompetitionsDeleteView.as_view(), name="remove_competition"),
     path("competitions/<int:pk>/edit", CompetitionsUpdateView.as_view(), name="edit_competition"),
@@ -155,6 +187,11 @@ urlpatterns = [
         "competition-registration/create/", CompetitionRegistrationCreateView.as_view(),
         name="add_competitionregistration"
     ),
+    path(
+        "competition-registration/bulk/<int:pk>",
+        CompetitionRegistrationBulkCreateView.as_view(),
+        name="bulk_add_competitionregistration",
+    ),
     path(
         "competition-registration/<int:pk>/remove/",
         CompetitionRegistrationDeleteView.as_view(),
@@ -240,4 +277,15 @@ urlpatterns = [
         DisciplinesUpdateView.as_view(),
         name="edit_discipline",
     ),
+    # ----- Monitoring --------------------------------------------------------
+    path(
+        "monitoring/database", DatabaseMetricsView.as_view(), name="database_metrics"
+    ),
+    # ----- Jobs ----------------------------------------------------------------
+    path("jobs/<int:pk>/status", JobStatusView.as_view(), name="job_status"),
+    path("jobs/<str:name>/run", JobEnqueueView.as_view(), name="enqueue_job"),
+    # ----- Trash ---------------------------------------------------------------
+    path("trash/view", TrashCardsView.as_view(), name="trash_view"),
+    path("trash", TrashView.as_view(), name="trash"),
+    path("trash/<str:model_name>/<int:pk>/restore", TrashRestoreView.as_view(), name="restore_deleted"),
 ]
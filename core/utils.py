@@ -1,5 +1,7 @@
 # ----- generic imports ---------------------------------------------------------
+import operator
 from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
 from unittest.mock import Mock
 
 import pycountry
@@ -9,7 +11,8 @@ from subprocess import Popen, PIPE
 from django.utils.timezone import now
 
 # ----- Core Imports ----------------------------------------------------------
-from .enums import GroupEnum, ChangeModelStatus, RuleCondition
+from .changes import apply_member_change
+from .enums import GroupEnum, ChangeModelStatus, RuleCondition, RuleOption
 
 
 # ---- Commands ---------------------------------------------------------------
@@ -43,14 +46,15 @@ def get_nationality_acronym_map():
 
 # ---- Validators -------------------------------------------------------------
 def is_license_no_unique_within_club(membership, club, license_no, excluded_ids=None):
-    from core.models import MEMBERSHIP_MODEL_NAME
+    from core.models import MEMBERSHIP_MODEL_NAME, Membership
 
     if excluded_ids is None:
         excluded_ids = []
 
     if membership == MEMBERSHIP_MODEL_NAME:
+        # the numbers of the deleted members stay taken until they are purged
         return not (
-            club.membership_set.filter(
+            Membership.all_objects.filter(
                 club=club, transfer_date__isnull=True, license_no=license_no
             )
             .exclude(id__in=excluded_ids)
@@ -61,18 +65,27 @@ def is_license_no_unique_within_club(membership, club, license_no, excluded_ids=
 
 
 # ---- Getters -------------------------------------------------------------
+def get_user_group_names(user):
+    # served without query by the groups prefetched by CachedModelBackend
+    return {group.name for group in user.groups.all()}
+
+
+async def aget_user_group_names(user):
+    return {group.name async for group in user.groups.all()}
+
+
 def is_user_fstb_admin(user):
     if not user or not user.is_authenticated:
         return False
 
-    return user.groups.filter(name=GroupEnum.FSTB_ADMIN.value).exists()
+    return GroupEnum.FSTB_ADMIN.value in get_user_group_names(user)
 
 
 def is_user_club_admin(user):
     if not user or not user.is_authenticated:
         return False
 
-    return user.groups.filter(name=GroupEnum.CLUB_ADMIN.value).exists()
+    return GroupEnum.CLUB_ADMIN.value in get_user_group_names(user)
 
 
 def get_user_member(user):
@@ -84,13 +97,17 @@ def get_user_member(user):
     return Member.objects.filter(user=user).first()
 
 
-def get_user_club(user):
+def get_user_club(user, using=None):
     if not user or not user.is_authenticated or not is_user_club_admin(user):
         return None
 
     from core.models import Club
 
-    return Club.objects.filter(membership__member__user=user).first()
+    return (
+        Club.objects.using(using)
+        .filter(membership__member__user=user, membership__transfer_date__isnull=True)
+        .first()
+    )
 
 
 def get_team_club(user):
@@ -106,30 +123,17 @@ def get_team_club(user):
 
 
 # ---- Create/Update Models ---------------------------------------------------
-def create_member_change(member, applicant):
+def create_member_change(member_change, applicant):
     from core.models import MemberChange
 
-    member_change = MemberChange.objects.create(
-        photo=member.photo,
-        name=member.name,
-        surname=member.surname,
-        house_number=member.house_number,
-        street=member.street,
-        city=member.city,
-        zip_code=member.zip_code,
-        date_of_birth=member.date_of_birth,
-        nationality=member.nationality,
-        affiliation_year=member.affiliation_year,
-        member=member.member,
+    # a copy of the change, to be linked to another membership change
+    return MemberChange.objects.create(
+        member=member_change.member,
+        changes=member_change.changes,
+        photo=member_change.photo,
         applicant=applicant,
     )
 
-    member_change.roles.set(member.roles.all())
-    member_change.exams.set(member.exams.all())
-    member_change.js.set(member.js.all())
-
-    return member_change
-
 
 def save_membership(self, member, new_club, new_license_no):
     from core.models import Membership, MembershipChange, Member
@@ -194,47 +198,6 @@ def save_membership(self, member, new_club, new_license_no):
             )
 
 
-def create_member(member_change):
-    from core.models import Member
-
-    member = Member.objects.create(
-        photo=member_change.photo,
-        name=member_change.name,
-        surname=member_change.surname,
-        house_number=member_change.house_number,
-        street=member_change.street,
-        city=member_change.city,
-        zip_code=member_change.zip_code,
-        date_of_birth=member_change.date_of_birth,
-        nationality=member_change.nationality,
-        affiliation_year=member_change.affiliation_year,
-    )
-
-    member.roles.set(member_change.roles.all())
-    member.exams.set(member_change.exams.all())
-    member.js.set(member_change.js.all())
-
-    return member
-
-
-def update_member(member, member_change):
-    member.photo = member_change.photo
-    member.name = member_change.name
-    member.surname = member_change.surname
-    member.house_number = member_change.house_number
-    member.street = member_change.street
-    member.city = member_change.city
-    member.zip_code = member_change.zip_code
-    member.date_of_birth = member_change.date_of_birth
-    member.nationality = member_change.nationality
-    member.affiliation_year = member_change.affiliation_year
-    member.save()
-
-    member.roles.set(member_change.roles.all())
-    member.exams.set(member_change.exams.all())
-    member.js.set(member_change.js.all())
-
-
 def create_membership(membership_change, related_member):
     from core.models import Membership
 
@@ -275,19 +238,10 @@ def get_all_member_changes_pending_created_before_member_change(member_change):
 
 
 def approve_member_changes(member_change):
-    current_membership_change = None
-    related_member = None
-
     # -- Manage member_changes ---------------------------------------------
-    if member_change.member:
-        update_member(member_change.member, member_change)
-        current_membership_change = member_change.membership_change
-        related_member = member_change.member
-
-    else:
-        new_member = create_member(member_change)
-        current_membership_change = member_change.membership_change
-        related_member = new_member
+    # only the changed fields are written, on a new member if the change creates one
+    related_member = apply_member_change(member_change.member, member_change)
+    current_membership_change = member_change.membership_change
 
     # -- Manage membership_changes -----------------------------------------
     if current_membership_change:
@@ -328,39 +282,117 @@ def check_max_member(max_members, members):
 
 
 def check_ages(year_rules, members):
+    return check_age_rules(
+        year_rules, [(member.name, calculate_age(member.date_of_birth)) for member in members]
+    )
+
+
+def is_team_age_rule(rule):
+    return rule.option != RuleOption.YEAR.value or rule.condition == RuleCondition.AVERAGE_EQUAL_TO.value
+
+
+def check_age_rules(year_rules, member_ages):
+    """Check the rules against the (name, age) of the members, computed once per team."""
     errors = []
-    ages = []
+    member_rules = [rule for rule in year_rules if not is_team_age_rule(rule)]
+    team_rules = [rule for rule in year_rules if is_team_age_rule(rule)]
 
-    for member in members:
-        current_age = calculate_age(member.date_of_birth)
-        ages.append(current_age)
-        for rule in year_rules:
+    for name, current_age in member_ages:
+        for rule in member_rules:
 
             if rule.condition == RuleCondition.EQUAL.value:
                 if current_age != rule.value:
-                    errors.append((member.name, " age is not equal to ", rule.value))
+                    errors.append((name, " age is not equal to ", rule.value))
 
             if rule.condition == RuleCondition.GREATER.value:
                 if current_age <= rule.value:
-                    errors.append((member.name, " age is not greater than ", rule.value))
+                    errors.append((name, " age is not greater than ", rule.value))
 
             if rule.condition == RuleCondition.LESS_THAN.value:
                 if current_age >= rule.value:
-                    errors.append((member.name, " age is not less than ", rule.value))
+                    errors.append((name, " age is not less than ", rule.value))
 
             if rule.condition == RuleCondition.GREATER_OR_EQUAL.value:
                 if current_age < rule.value:
-                    errors.append((member.name, " age is not greate or equal to ", rule.value))
+                    errors.append((name, " age is not greate or equal to ", rule.value))
 
             if rule.condition == RuleCondition.LESS_THAN_OR_EQUAL.value:
                 if current_age > rule.value:
-                    errors.append((member.name, " age is not less than or equal to ", rule.value))
+                    errors.append((name, " age is not less than or equal to ", rule.value))
 
             if rule.condition == RuleCondition.NOT_EQUAL.value:
                 if current_age == rule.value:
-                    errors.append((member.name, " age is not different to ", rule.value))
+                    errors.append((name, " age is not different to ", rule.value))
+
+    if team_rules and member_ages:
+        errors += check_team_age_rules(team_rules, [age for _name, age in member_ages])
+
+    return errors
+
+
+# the team rules compare one value of the whole team
+TEAM_RULE_CONDITIONS = {
+    RuleCondition.EQUAL.value: (operator.eq, " is not equal to "),
+    RuleCondition.NOT_EQUAL.value: (operator.ne, " is not different to "),
+    RuleCondition.GREATER.value: (operator.gt, " is not greater than "),
+    RuleCondition.GREATER_OR_EQUAL.value: (operator.ge, " is not greater or equal to "),
+    RuleCondition.LESS_THAN.value: (operator.lt, " is not less than "),
+    RuleCondition.LESS_THAN_OR_EQUAL.value: (operator.le, " is not less than or equal to "),
+}
+
+
+def get_team_age_values(ages):
+    """Return the aggregates of the ages of a team, computed in one pass."""
+    total = 0
+    youngest = oldest = ages[0]
+    for age in ages:
+        total += age
+        youngest = min(youngest, age)
+        oldest = max(oldest, age)
+
+    return {
+        RuleOption.AVERAGE_YEAR.value: ("Average age", total / len(ages)),
+        RuleOption.MIN_YEAR.value: ("Minimum age", youngest),
+        RuleOption.MAX_YEAR.value: ("Maximum age", oldest),
+        RuleOption.SUM_YEAR.value: ("Sum of ages", total),
+    }
+
+
+def check_team_age_rules(year_rules, ages):
+    errors = []
+    values = get_team_age_values(ages)
+
+    for rule in year_rules:
+        if rule.condition == RuleCondition.AVERAGE_EQUAL_TO.value:
+            # the average of whole ages, rounded half up to a whole age: round()
+            # rounds the halves to the even age
+            label = values[RuleOption.AVERAGE_YEAR.value][0]
+            average = (Decimal(sum(ages)) / len(ages)).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+            if average != rule.value:
+                errors.append((label, " is not equal to ", rule.value))
+            continue
+
+        if rule.option == RuleOption.YEAR_BAND_COUNT.value:
+            band_min = float("-inf") if rule.band_min is None else rule.band_min
+            band_max = float("inf") if rule.band_max is None else rule.band_max
+            label = f"Members aged {format_band_bound(rule.band_min)}-{format_band_bound(rule.band_max)}"
+            value = sum(1 for age in ages if band_min <= age <= band_max)
+        elif rule.option in values:
+            label, value = values[rule.option]
+        else:
+            continue
+
+        compare, message = TEAM_RULE_CONDITIONS.get(rule.condition, (None, None))
+        if compare is not None and not compare(value, rule.value):
+            errors.append((label, message, rule.value))
+
     return errors
 
+
+def format_band_bound(bound):
+    return "" if bound is None else f"{bound:g}"
+
+
 def calculate_age(date_of_birth):
     today_date = datetime.now()
 
@@ -371,5 +403,4 @@ def calculate_age(date_of_birth):
             today_date.month == date_of_birth.month and today_date.day < date_of_birth.day):
         actual_age -= 1  # Sottrai un anno se il compleanno non è ancora passato
 
-    print("Hai", actual_age, "anni")
     return actual_age
@@ -0,0 +1,198 @@
+# ----- generic imports ---------------------------------------------------------
+import time
+
+# ----- Django imports --------------------------------------------------------
+from django.apps import apps
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import F
+
+# ----- Core imports ----------------------------------------------------------
+from .constants import (
+    MODEL_VERSION_CACHE_KEY,
+    MODEL_CLUB_VERSION_CACHE_KEY,
+    MODEL_ALL_CLUBS_VERSION_CACHE_KEY,
+    VERSION_CACHE_TIMEOUT,
+)
+
+
+# ---- Versions ---------------------------------------------------------------
+# A version is a monotonically increasing counter telling the consumers of a
+# cache (lists, choices, structure trees, ...) that what they hold is outdated.
+# Versions are incremented in the ModelVersion table, the cache backend
+# mirrors them for the readers. The increments of the database are atomic,
+# unlike the `incr` of some cache backends, e.g. the file based one.
+def _get_version_model():
+    return apps.get_model("core", "ModelVersion")
+
+
+def _initial_version():
+    # start from the current time, so that a version lost by both the cache and
+    # the database never goes back to a value already handed out to a client
+    return int(time.time())
+
+
+def get_versions(keys):
+    """Return the version of every key, with one `get_many` on a cache hit."""
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+
+    if missing:
+        versions.update(_load_versions(missing))
+
+    return [versions[key] for key in keys]
+
+
+def _load_versions(keys):
+    version_model = _get_version_model()
+
+    versions = dict(
+        version_model.objects.filter(key__in=keys).values_list("key", "version")
+    )
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        versions.update(_create_versions(missing))
+
+    for key, version in versions.items():
+        # never over a version set meanwhile by a writer, it may be newer
+        cache.add(key, version, VERSION_CACHE_TIMEOUT)
+    return versions
+
+
+def _create_versions(keys):
+    version_model = _get_version_model()
+
+    version_model.objects.bulk_create(
+        [version_model(key=key, version=_initial_version()) for key in keys],
+        ignore_conflicts=True,
+    )
+    return dict(
+        version_model.objects.filter(key__in=keys).values_list("key", "version")
+    )
+
+
+def bump_versions(keys):
+    """Increase the version of every key in the database, then in the cache.
+
+    Inside a transaction the versions are increased once it commits, in a
+    short transaction of their own: their rows aren't locked until the writer
+    commits, the writers of every club share the all-clubs key.
+    """
+    keys = list(dict.fromkeys(keys))
+    transaction.on_commit(lambda: _increment_versions(keys))
+
+
+def _increment_versions(keys):
+    version_model = _get_version_model()
+
+    for key in keys:
+        try:
+            with transaction.atomic():
+                if not version_model.objects.filter(key=key).update(version=F("version") + 1):
+                    _create_versions([key])
+                    version_model.objects.filter(key=key).update(version=F("version") + 1)
+                version = version_model.objects.values_list("version", flat=True).get(key=key)
+                # set while the row is locked, the cache receives the versions
+                # of concurrent writers in the order of the database
+                cache.set(key, version, VERSION_CACHE_TIMEOUT)
+        except Exception:
+            # the cache may hold a version the database never committed
+            cache.delete(key)
+            raise
+
+
+# ---- Model versions ---------------------------------------------------------
+def is_club_scoped(model):
+    return getattr(model, "versioned_by_club", False)
+
+
+def get_model_version_keys(model, club_id=None):
+    label = model._meta.label_lower
+
+    if club_id is None or not is_club_scoped(model):
+        return [MODEL_VERSION_CACHE_KEY.format(label)]
+
+    # a club version is outdated by changes in the club, or in every club
+    return [
+        MODEL_CLUB_VERSION_CACHE_KEY.format(label, club_id),
+        MODEL_ALL_CLUBS_VERSION_CACHE_KEY.format(label),
+    ]
+
+
+def get_model_versions(models, club_id=None):
+    """Return the current version of each model, reading them with one `get_many`.
+
+    With a club, club scoped models are versioned only by the changes of that
+    club's rows, other models by any change.
+    """
+    keys_by_model = [get_model_version_keys(model, club_id) for model in models]
+    versions = iter(get_versions([key for keys in keys_by_model for key in keys]))
+
+    return [tuple(next(versions) for _ in keys) for keys in keys_by_model]
+
+
+def bump_model_version(model, club_ids=None):
+    """Mark every cached representation of the model's rows as outdated.
+
+    `club_ids` are the clubs owning the changed rows, None if they are unknown,
+    in which case the version of every club is bumped. Nothing is bumped for
+    the models that opted out with `versioned = False`.
+    """
+    if not getattr(model, "versioned", True):
+        return
+
+    label = model._meta.label_lower
+    keys = [MODEL_VERSION_CACHE_KEY.format(label)]
+
+    if is_club_scoped(model):
+        if club_ids is None:
+            keys.append(MODEL_ALL_CLUBS_VERSION_CACHE_KEY.format(label))
+        else:
+            keys += [
+                MODEL_CLUB_VERSION_CACHE_KEY.format(label, club_id)
+                for club_id in club_ids
+                if club_id is not None
+            ]
+
+    bump_versions(keys)
+
+
+def get_objects_club_ids(objs):
+    club_ids = {getattr(obj, "club_id", None) for obj in objs}
+    return None if None in club_ids else club_ids
+
+
+# ---- QuerySet -----------------------------------------------------------------
+class VersionedQuerySet(models.QuerySet):
+    """Bump the model version on the bulk paths, that don't send any signal.
+
+    `bulk_update` runs through `update`, `delete` sends the usual signals.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            bump_model_version(self.model)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            bump_model_version(self.model, get_objects_club_ids(objs))
+        return objs
+
+    bulk_create.alters_data = True
+
+    def delete_in_bulk(self):
+        """Delete the rows with one query, without the per-row signals and cascades.
+
+        Only for rows that nothing references anymore, e.g. the ones just archived.
+        """
+        rows = self._raw_delete(self.db)
+        if rows:
+            bump_model_version(self.model)
+        return rows
+
+    delete_in_bulk.alters_data = True
@@ -1,4 +1,5 @@
 # ----- generic imports ---------------------------------------------------------
+import hashlib
 import json
 
 from django import forms
@@ -24,15 +25,21 @@ import django.utils.translation as translation
 
 # generic
 from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
 from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse_lazy
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
 from django.views import View
+from django.db.models import Min, Q
+from django.middleware.csrf import get_token
 
 # ----- core imports ------------------------------------------------------------
 from .constants import (
     CHANGED_EVENT,
     SHOW_MESSAGE,
+    RESTORED_MESSAGE,
     TABLE_ID,
     TABLE_ITEM_REMOVE_URL,
     TABLE_ITEM_EDIT_URL,
@@ -42,6 +49,11 @@ from .constants import (
     ADD_EDIT_TEMPLATE,
     UPDATED_MESSAGE,
     APPROVED_MESSAGE, TABLE_ITEM_DETAIL_URL,
+    ROW_ID,
+    ROW_CHANGED_EVENT,
+    ROW_ADDED,
+    ROW_UPDATED,
+    ROW_DELETED,
 )
 
 from .enums import ChangeModelStatus
@@ -51,9 +63,11 @@ from .models import (
     Club,
     Membership,
     get_remaining_memberships_by_club,
+    aget_remaining_memberships_by_club,
     Role,
     MemberChange,
-    Competition, Team, CompetitionRegistration, Division, Discipline, YearRule,
+    Competition, Team, CompetitionRegistration, Division, Discipline, YearRule, Exam, JS,
+    Job, SoftDeleteModel, MemberRow,
 )
 
 from .forms import (
@@ -63,8 +77,22 @@ from .forms import (
     MemberMembershipForm,
     CompetitionForm,
     InscribedMemberForm, TeamForm, CompetitionRegistrationForm, DivisionForm, DisciplinesForm, YearRuleForm,
+    BulkCompetitionRegistrationForm,
 )
 
+from .cache import get_user_shell
+
+from .changes import get_member_change_rows, record_member_change
+
+from .db.pool import get_connection_metrics
+
+from .search import search_members
+from .dashboard import get_competition_dashboard
+from .eligibility import get_eligibility_matrix
+from .registrations import register_teams
+from .jobs import enqueue
+from .trash import soft_delete, restore, get_trash, get_trash_model, get_deleted
+
 from .mixins import AdminLoginRequiredMixin, FstbAdminLoginRequiredMixin
 
 from .utils import (
@@ -76,12 +104,18 @@ from .utils import (
     decline_member_changes, check_min_member, check_max_member, calculate_age, check_ages,
 )
 
+from .versions import get_model_versions
+
 
 # ----- Utils -----------------------------------------------------------------
 def get_success_response(self, instance, message_format, extra_event=""):
     changed_event = CHANGED_EVENT.format(self.model.__name__.lower())
     message = message_format.format(model=instance)
 
+    # patch only the affected row instead of reloading the whole table
+    if is_htmx_request(self.request) and getattr(self, "list_view_class", None):
+        return get_row_response(self, instance, message, extra_event)
+
     return HttpResponse(
         status=204,
         headers={
@@ -96,6 +130,94 @@ def get_success_response(self, instance, message_format, extra_event=""):
     )
 
 
+def get_pending_change_response(instance, message_format):
+    # the row is unchanged until the change is approved, nothing to swap
+    return HttpResponse(
+        status=204,
+        headers={
+            "HX-Reswap": "none",
+            "HX-Trigger": json.dumps(
+                {
+                    CHANGED_EVENT.format(MemberChange.__name__.lower()): None,
+                    SHOW_MESSAGE: message_format.format(model=instance),
+                }
+            ),
+        },
+    )
+
+
+def is_htmx_request(request):
+    return request.headers.get("HX-Request") == "true"
+
+
+def get_row_response(self, instance, message, extra_event=""):
+    """Answer with the changed row of the list, as an htmx out of band swap.
+
+    The row is rendered with the queryset and template of `list_view_class`, a
+    row that is no longer part of the list is removed from the table.
+    """
+    list_view = self.list_view_class()
+    list_view.setup(self.request)
+
+    # a deleted instance has lost its pk
+    pk = instance.pk if instance.pk is not None else self.kwargs.get("pk")
+    action = getattr(self, "row_action", ROW_UPDATED)
+
+    object_list = []
+    if action != ROW_DELETED:
+        object_list = list(list_view.get_queryset().filter(pk=pk))
+        if not object_list:
+            action = ROW_DELETED
+
+    list_view.object_list = object_list
+    context = list_view.get_context_data()
+    context["row_swap"] = action
+
+    content = ""
+    if object_list:
+        content = render_to_string(
+            list_view.get_template_names(), context, request=self.request
+        )
+
+    model_name = list_view.model.__name__.lower()
+    return HttpResponse(
+        content,
+        headers={
+            # the rows are swapped out of band, the response target is untouched
+            "HX-Reswap": "none",
+            "HX-Trigger": json.dumps(
+                {
+                    SHOW_MESSAGE: message,
+                    extra_event: None,
+                }
+            ),
+            "HX-Trigger-After-Swap": json.dumps(
+                {
+                    ROW_CHANGED_EVENT: {
+                        "action": action,
+                        "table_id": context["table_id"],
+                        "row_id": ROW_ID.format(pk),
+                        # full reload, for rows not rendered in the current page
+                        "list_changed_event": CHANGED_EVENT.format(model_name),
+                    }
+                }
+            ),
+        },
+    )
+
+
+def render_fragment(template_name, context):
+    # the htmx fragments don't need the context processors, that run queries
+    # and can't be called from async views
+    return HttpResponse(render_to_string(template_name, context))
+
+
+def get_csrf_secret(request):
+    # make sure the secret exists, so that the same one is sent back by the client
+    get_token(request)
+    return request.META.get("CSRF_COOKIE")
+
+
 # ----- Home ------------------------------------------------------------------
 class HomeView(LoginRequiredMixin, TemplateView):
     template_name = "home.html"
@@ -141,6 +263,68 @@ class CardTemplateView(TemplateView):
 
 
 class DatatableListView(ListView):
+    # models whose rows are rendered in the table, default to the listed model
+    etag_models = None
+    # the queryset is scoped with `for_user`, to the club of a club admin
+    club_scoped = False
+
+    def get(self, request, *args, **kwargs):
+        # answer with 304 Not Modified, without querying or rendering the rows,
+        # if the table the client holds is still up to date
+        etag = self.get_etag()
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_etag_models(self):
+        if self.etag_models is not None:
+            return self.etag_models
+
+        if self.model is None:
+            raise ImproperlyConfigured(
+                _("DataTableListView requires a model attribute to be set.")
+            )
+
+        return [self.model]
+
+    def get_etag(self):
+        request = self.request
+        shell = get_user_shell(getattr(request, "user", None))
+
+        validator = [
+            type(self).__name__,
+            # club scope of the rows and permissions of the action buttons
+            shell["role"],
+            shell["club_id"],
+            translation.get_language(),
+            # the rendered csrf tokens are bound to the client csrf secret
+            get_csrf_secret(request),
+            *get_model_versions(self.get_etag_models(), club_id=self.get_scope_club_id(shell)),
+            self.get_etag_expiry(),
+        ]
+
+        return quote_etag(
+            hashlib.md5(json.dumps(validator, default=str).encode()).hexdigest()
+        )
+
+    def get_etag_expiry(self):
+        """The time the rows change at without any write, None if only a write changes them."""
+        return None
+
+    def get_scope_club_id(self, shell):
+        """The club the rows are scoped to, None if the list shows the rows of every club.
+
+        As `for_user`, a FSTB admin gets every club even if they are a club admin too.
+        """
+        if not self.club_scoped or is_user_fstb_admin(self.request.user):
+            return None
+        return shell["club_id"]
+
     def get_context_data(self, **kwargs):
         if self.model is None:
             raise ImproperlyConfigured(
@@ -160,6 +344,9 @@ class DatatableListView(ListView):
 
 class DatatableCreateView(CreateView):
     modal_title = None
+    # list view rendering the created row, the whole list is reloaded if None
+    list_view_class = None
+    row_action = ROW_ADDED
 
     def form_valid(self, form):
         instance = form.save()
@@ -173,9 +360,19 @@ class DatatableCreateView(CreateView):
 
 class DatatableDeleteView(View):
     model = None
+    list_view_class = None
+    row_action = ROW_DELETED
 
     def post(self, request, pk):
         instance = get_object_or_404(self.get_queryset(), pk=pk)
+        return self.delete_instance(instance)
+
+    def delete_instance(self, instance):
+        # the heavy cascades are left to the purge job, see core/trash.py
+        if isinstance(instance, SoftDeleteModel):
+            soft_delete(instance, self.request.user)
+            return get_success_response(self, instance, DELETED_MESSAGE, CHANGED_EVENT.format("trash"))
+
         instance.delete()
         return get_success_response(self, instance, DELETED_MESSAGE)
 
@@ -192,6 +389,8 @@ class DatatableUpdateView(UpdateView):
     model = Member
     form_class = None
     modal_title = None
+    list_view_class = None
+    row_action = ROW_UPDATED
 
     def form_valid(self, form):
         instance = form.save()
@@ -212,27 +411,23 @@ class DatatableUpdateView(UpdateView):
 class LicenseNoFieldView(AdminLoginRequiredMixin, TemplateView):
     template_name = "datatable/structure/select_field.html"
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         club_id = request.GET.get("club_select")
 
         # if club_id is empty, return no template
         if not club_id:
             return HttpResponse()
 
-        club = Club.objects.filter(pk=club_id).first()
+        club = await Club.objects.filter(pk=club_id).afirst()
 
         form = MembershipForm()
-        form.fields["license_no"].choices = get_remaining_memberships_by_club(club)
+        form.fields["license_no"].choices = await aget_remaining_memberships_by_club(club)
 
         context = super().get_context_data(**kwargs)
         context["form"] = form
         context["container_ccs_classes"] = "col-12"
 
-        return render(
-            request,
-            self.template_name,
-            context,
-        )
+        return render_fragment(self.template_name, context)
 
 
 # ----- Member views ----------------------------------------------------------
@@ -255,19 +450,13 @@ class MembersCardsView(AdminLoginRequiredMixin, CardTemplateView):
 
 class MemberListView(AdminLoginRequiredMixin, DatatableListView):
     model = Member
+    etag_models = [Member, Membership, Club, Role, Exam, JS]
+    club_scoped = True
     template_name = "datatable/member.html"
 
     def get_queryset(self):
-        logged_user = self.request.user
-        if is_user_fstb_admin(logged_user):
-            return Member.objects.prefetch_related("membership_set__club")
-        else:
-            club_to_admin = get_user_club(logged_user)
-
-            return Member.objects.filter(
-                membership__club=club_to_admin,
-                membership__transfer_date__isnull=True,
-            ).prefetch_related("membership_set__club")
+        # one row per member, with its club, roles, exams and J+S, see core/member_rows.py
+        return MemberRow.objects.for_user(self.request.user)
 
 
 class MemberCreateView(AdminLoginRequiredMixin, FormView):
@@ -319,27 +508,8 @@ class MemberCreateView(AdminLoginRequiredMixin, FormView):
         return member
 
     def create_member_change(self, form):
-        # Save the data related to Member
-        member = MemberChange.objects.create(
-            photo=form.cleaned_data["photo"],
-            name=form.cleaned_data["name"],
-            surname=form.cleaned_data["surname"],
-            house_number=form.cleaned_data["house_number"],
-            street=form.cleaned_data["street"],
-            city=form.cleaned_data["city"],
-            zip_code=form.cleaned_data["zip_code"],
-            date_of_birth=form.cleaned_data["date_of_birth"],
-            nationality=form.cleaned_data["nationality"],
-            affiliation_year=form.cleaned_data["affiliation_year"],
-            applicant=self.request.user,  # set the applicant of the change to the logged user
-        )
-
-        # Now, set the many-to-many relationships
-        member.roles.set(form.cleaned_data["roles"])
-        member.exams.set(form.cleaned_data["exams"])
-        member.js.set(form.cleaned_data["js"])
-
-        return member
+        # Save the data of the new member, to be approved by a FSTB Admin
+        return record_member_change(None, form.cleaned_data, self.request.user)
 
     def create_member_membership(self, form, member):
         # Save the data related to Membership
@@ -396,21 +566,22 @@ class MemberCreateView(AdminLoginRequiredMixin, FormView):
 
 class MemberDeleteView(AdminLoginRequiredMixin, DatatableDeleteView):
     model = Member
+    list_view_class = MemberListView
 
-    def post(self, request, pk):
-        instance = get_object_or_404(self.get_queryset(), pk=pk)
-        instance.delete()
+    def delete_instance(self, instance):
+        response = super().delete_instance(instance)
 
-        # remove the user from any authorization
+        # remove the user from any authorization, even before the member is purged
         if instance.user:
             instance.user.groups.clear()
             instance.user.save()
 
-        return get_success_response(self, instance, DELETED_MESSAGE)
+        return response
 
 
 class MemberUpdateView(AdminLoginRequiredMixin, FormView):
     model = Member
+    list_view_class = MemberListView
     form_class = MemberMembershipForm
     modal_title = _("Update Member")
     club_select_label = _("Select Club")
@@ -421,17 +592,16 @@ class MemberUpdateView(AdminLoginRequiredMixin, FormView):
         member = self.get_object()
 
         # update the Member fields
-        member = (
-            self.update_member_fields(form, member)
-            if is_user_fstb_admin(self.request.user)
-            else self.register_member_change(form, member)
-        )
+        if not is_user_fstb_admin(self.request.user):
+            member_change = self.register_member_change(form, member)
+            self.update_membership_fields(form, member_change)
+            return get_pending_change_response(member, UPDATED_MESSAGE)
 
+        self.update_member_fields(form, member)
         self.update_membership_fields(form, member)
 
         # if the logged user is a FSTB Admin, can update user fields
-        if is_user_fstb_admin(self.request.user):
-            self.update_user_fields(form, member)
+        self.update_user_fields(form, member)
 
         return get_success_response(self, member, UPDATED_MESSAGE)
 
@@ -458,26 +628,8 @@ class MemberUpdateView(AdminLoginRequiredMixin, FormView):
         return member
 
     def register_member_change(self, form, member):
-        member_change = MemberChange.objects.create(
-            photo=form.cleaned_data["photo"],
-            name=form.cleaned_data["name"],
-            surname=form.cleaned_data["surname"],
-            house_number=form.cleaned_data["house_number"],
-            street=form.cleaned_data["street"],
-            city=form.cleaned_data["city"],
-            zip_code=form.cleaned_data["zip_code"],
-            date_of_birth=form.cleaned_data["date_of_birth"],
-            nationality=form.cleaned_data["nationality"],
-            affiliation_year=form.cleaned_data["affiliation_year"],
-            applicant=self.request.user,
-            member=member,
-        )
-
-        member_change.roles.set(form.cleaned_data["roles"])
-        member_change.exams.set(form.cleaned_data["exams"])
-        member_change.js.set(form.cleaned_data["js"])
-
-        return member_change
+        # Save only the changed fields, to be approved by a FSTB Admin
+        return record_member_change(member, form.cleaned_data, self.request.user)
 
     def update_membership_fields(self, form, member):
         club = (
@@ -605,6 +757,129 @@ class MemberUpdateView(AdminLoginRequiredMixin, FormView):
         return context
 
 
+class MemberHistoryView(AdminLoginRequiredMixin, TemplateView):
+    template_name = "datatable/member_history.html"
+    modal_title = _("Member history")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        member = get_object_or_404(Member.objects.for_user(self.request.user), pk=self.kwargs["pk"])
+
+        # the live rows and the archived ones, read only when the history is opened
+        memberships = list(member.membership_set.select_related("club")) + list(
+            member.archived_memberships.select_related("club")
+        )
+        member_changes = list(member.member_changes.select_related("applicant")) + list(
+            member.archived_member_changes.select_related("applicant")
+        )
+
+        context["modal_title"] = self.modal_title
+        context["member"] = member
+        context["memberships"] = sorted(
+            memberships,
+            key=lambda membership: (membership.transfer_date is None, membership.transfer_date),
+            reverse=True,
+        )
+        context["member_changes"] = sorted(
+            member_changes, key=lambda member_change: member_change.created_at, reverse=True
+        )
+        return context
+
+
+# ----- Member Search -----------------------------------------------------------
+MEMBER_SEARCH_LIMIT = 20
+MEMBER_SEARCH_MAX_LIMIT = 50
+# the pages of a search are cut from its first matches, they stay few
+MEMBER_SEARCH_MAX_PAGE = 10
+
+
+def get_search_page(request, default_limit=MEMBER_SEARCH_LIMIT):
+    """Return the page number and the page size asked by the request."""
+    try:
+        limit = min(int(request.GET.get("limit", default_limit)), MEMBER_SEARCH_MAX_LIMIT)
+    except ValueError:
+        limit = default_limit
+    try:
+        page = min(max(int(request.GET.get("page", 1)), 1), MEMBER_SEARCH_MAX_PAGE)
+    except ValueError:
+        page = 1
+
+    return page, max(limit, 1)
+
+
+class MemberSearchView(AdminLoginRequiredMixin, View):
+    """The members matching the `q` parameter, as an htmx fragment."""
+
+    template_name = "datatable/member_search_results.html"
+
+    def get(self, request):
+        members, _more = self.get_members()
+        return render_fragment(
+            self.template_name,
+            {"members": members, "query": request.GET.get("q", "")},
+        )
+
+    def get_members(self):
+        """Return the members of the page asked, and whether there are more."""
+        page, limit = get_search_page(self.request)
+        start = (page - 1) * limit
+
+        # one more match than the page, telling if there is a next one
+        members = search_members(self.request.GET.get("q", ""), self.get_queryset(), start + limit + 1)
+        return members[start:start + limit], len(members) > start + limit
+
+    def get_queryset(self):
+        return MemberRow.objects.for_user(self.request.user)
+
+
+class MemberSearchJsonView(MemberSearchView):
+    """The members matching the `q` parameter, as JSON for the remote search pickers."""
+
+    def get(self, request):
+        members, more = self.get_members()
+        return JsonResponse(
+            {"results": [get_member_search_result(member) for member in members], "more": more}
+        )
+
+
+class UserSearchJsonView(FstbAdminLoginRequiredMixin, View):
+    """The users without a member matching the `q` parameter, as JSON."""
+
+    def get(self, request):
+        page, limit = get_search_page(request)
+        start = (page - 1) * limit
+
+        users = User.objects.filter(member__isnull=True).order_by("username")
+        for word in request.GET.get("q", "").split():
+            users = users.filter(
+                Q(username__icontains=word)
+                | Q(first_name__icontains=word)
+                | Q(last_name__icontains=word)
+                | Q(email__icontains=word)
+            )
+        users = list(users[start:start + limit + 1])
+
+        return JsonResponse(
+            {
+                "results": [{"id": user.pk, "text": user.username} for user in users[:limit]],
+                "more": len(users) > limit,
+            }
+        )
+
+
+def get_member_search_result(row):
+    return {
+        "id": row.pk,
+        "text": str(row),
+        "name": row.name,
+        "surname": row.surname,
+        "city": row.city,
+        "zip_code": row.zip_code,
+        "license_no": row.full_license_no or None,
+        "club": row.club_name or None,
+    }
+
+
 # ----- Member Change Views ---------------------------------------------------
 class MemberChangesListView(AdminLoginRequiredMixin, ListView):
     model = MemberChange
@@ -651,6 +926,23 @@ class MemberChangesListView(AdminLoginRequiredMixin, ListView):
         context["table_id"] = TABLE_ID.format(model_name)
         context["member_change_decline_url"] = "member_change_decline"
         context["member_change_approve_url"] = "member_change_approve"
+        context["member_change_detail_url"] = "member_change_detail"
+        return context
+
+
+class MemberChangeDetailView(FstbAdminLoginRequiredMixin, TemplateView):
+    template_name = "datatable/member_change_detail.html"
+    modal_title = _("Member change")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+
+        member_change = get_object_or_404(
+            MemberChange.objects.select_related("member", "applicant"), pk=self.kwargs["pk"]
+        )
+        context["modal_title"] = self.modal_title
+        context["member_change"] = member_change
+        context["rows"] = get_member_change_rows(member_change)
         return context
 
 
@@ -706,15 +998,18 @@ class ClubCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/club_create_form.html"
     form_class = ClubForm
     model = Club
+    list_view_class = ClubListView
     modal_title = _("Add Club")
 
 
 class ClubDeleteView(FstbAdminLoginRequiredMixin, DatatableDeleteView):
     model = Club
+    list_view_class = ClubListView
 
 
 class ClubUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
     model = Club
+    list_view_class = ClubListView
     form_class = ClubForm
     modal_title = _("Update Club")
     template_name = ADD_EDIT_TEMPLATE.format("club")
@@ -743,19 +1038,13 @@ class MembershipsCardsView(AdminLoginRequiredMixin, CardTemplateView):
 
 class MembershipListView(AdminLoginRequiredMixin, DatatableListView):
     model = Membership
+    etag_models = [Member, Membership, Club]
+    club_scoped = True
     template_name = "datatable/membership.html"
 
     def get_queryset(self):
-        logged_user = self.request.user
-        if is_user_fstb_admin(logged_user):
-            return Member.objects.prefetch_related("membership_set__club")
-        else:
-            club_to_admin = get_user_club(logged_user)
-
-            return Member.objects.filter(
-                membership__club=club_to_admin,
-                membership__transfer_date__isnull=True,
-            ).prefetch_related("membership_set__club")
+        # one row per member, with its club, roles, exams and J+S, see core/member_rows.py
+        return MemberRow.objects.for_user(self.request.user)
 
 
 class MembershipDeleteView(AdminLoginRequiredMixin, DatatableDeleteView):
@@ -848,15 +1137,18 @@ class RoleCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/role_create_form.html"
     form_class = RoleForm
     model = Role
+    list_view_class = RoleListView
     modal_title = _("Add Role")
 
 
 class RoleDeleteView(FstbAdminLoginRequiredMixin, DatatableDeleteView):
     model = Role
+    list_view_class = RoleListView
 
 
 class RoleUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
     model = Role
+    list_view_class = RoleListView
     form_class = RoleForm
     modal_title = _("Update Role")
     template_name = ADD_EDIT_TEMPLATE.format("role")
@@ -893,13 +1185,36 @@ class OpenCompetitionsListView(AdminLoginRequiredMixin, DatatableListView):
     template_name = "datatable/open_competitions.html"
 
     def get_queryset(self):
-        return Competition.objects.filter(status="Open")
+        return Competition.objects.open()
+
+    def get_etag_expiry(self):
+        # the competition due first leaves the list at its due date
+        return self.get_queryset().aggregate(next_due_date=Min("due_date"))["next_due_date"]
+
+
+class CompetitionEligibilityView(AdminLoginRequiredMixin, TemplateView):
+    """Which disciplines and divisions of the competition every team fits, and why not."""
+
+    template_name = "datatable/competition_eligibility.html"
+    modal_title = _("Teams eligibility")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        competition = get_object_or_404(Competition, pk=self.kwargs["pk"])
+
+        teams = Team.objects.for_user(self.request.user).order_by("name", "pk")
+
+        context["modal_title"] = self.modal_title
+        context["competition"] = competition
+        context.update(get_eligibility_matrix(competition, teams))
+        return context
 
 
 class CompetitionsCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/competition_create_form.html"
     form_class = CompetitionForm
     model = Competition
+    list_view_class = CompetitionsListView
     modal_title = _("Add Competition")
 
     def form_valid(self, form):
@@ -931,10 +1246,12 @@ class CompetitionsCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
 
 class CompetitionsDeleteView(FstbAdminLoginRequiredMixin, DatatableDeleteView):
     model = Competition
+    list_view_class = CompetitionsListView
 
 
 class CompetitionsUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
     model = Competition
+    list_view_class = CompetitionsListView
     form_class = CompetitionForm
     modal_title = _("Update Competition")
     template_name = ADD_EDIT_TEMPLATE.format("competition")
@@ -981,6 +1298,108 @@ class CompetitionsInscribeMember(FstbAdminLoginRequiredMixin, FormView):
         return get_success_response(self, member, _("Inscribed Member: {model}"))
 
 
+# ----- Competition dashboard views -------------------------------------
+class CompetitionDashboardCardsView(FstbAdminLoginRequiredMixin, CardTemplateView):
+    model = CompetitionRegistration
+    template_name = "admin/cards/competition_dashboard.html"
+    card_title = _("Competitions dashboard")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["card_body_url"] = reverse_lazy("competition_dashboard")
+        return context
+
+
+class CompetitionDashboardView(FstbAdminLoginRequiredMixin, TemplateView):
+    """The registration counts, read from the counts kept by core/dashboard.py"""
+
+    template_name = "datatable/competition_dashboard.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context.update(get_competition_dashboard())
+        return context
+
+
+# ----- Job views -------------------------------------------------------
+class JobStatusView(AdminLoginRequiredMixin, View):
+    """The progress of a job, polled by the fragment until the job is finished."""
+
+    template_name = "datatable/job_status.html"
+
+    def get(self, request, pk):
+        jobs = Job.objects.all()
+        if not is_user_fstb_admin(request.user):
+            jobs = jobs.filter(created_by=request.user)
+
+        return render_fragment(self.template_name, {"job": get_object_or_404(jobs, pk=pk)})
+
+
+class JobEnqueueView(FstbAdminLoginRequiredMixin, View):
+    """Queue a job run by `python manage.py run_jobs`, answered with its status."""
+
+    job_names = [
+        "archive_history",
+        "rebuild_search_index",
+        "rebuild_member_rows",
+        "rebuild_registration_counts",
+        "close_competitions",
+    ]
+
+    def post(self, request, name):
+        if name not in self.job_names:
+            raise Http404
+
+        return render_fragment(JobStatusView.template_name, {"job": enqueue(name, user=request.user)})
+
+
+# ----- Trash views -------------------------------------------------------
+class TrashCardsView(AdminLoginRequiredMixin, CardTemplateView):
+    model = Member
+    template_name = "admin/cards/trash.html"
+    card_title = _("Deleted")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["card_body_url"] = reverse_lazy("trash")
+        context["list_changed_event"] = CHANGED_EVENT.format("trash")
+        return context
+
+
+class TrashView(AdminLoginRequiredMixin, TemplateView):
+    """The deleted rows still to be purged, that can be restored."""
+
+    template_name = "datatable/trash.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["trash"] = get_trash(self.request.user)
+        return context
+
+
+class TrashRestoreView(AdminLoginRequiredMixin, View):
+    def post(self, request, model_name, pk):
+        model = get_trash_model(model_name)
+        if model is None:
+            raise Http404
+
+        instance = get_object_or_404(get_deleted(model, request.user), pk=pk)
+        restore(instance)
+
+        return HttpResponse(
+            status=204,
+            headers={
+                "HX-Trigger": json.dumps(
+                    {
+                        CHANGED_EVENT.format(model_name): None,
+                        CHANGED_EVENT.format("trash"): None,
+                        SHOW_MESSAGE: RESTORED_MESSAGE.format(model=instance),
+                    }
+                )
+            },
+        )
+
+
 # ----- Teams views ----------------------------------------------------
 class TeamsCardsView(AdminLoginRequiredMixin, CardTemplateView):
     model = Team
@@ -990,24 +1409,19 @@ class TeamsCardsView(AdminLoginRequiredMixin, CardTemplateView):
 
 class TeamsListView(AdminLoginRequiredMixin, DatatableListView):
     model = Team
+    etag_models = [Team, Member, Club]
+    club_scoped = True
     template_name = "datatable/teams.html"
 
     def get_queryset(self):
-        logged_user = self.request.user
-        if is_user_fstb_admin(logged_user):
-            return Team.objects.all()
-        else:
-            club_to_admin = get_user_club(logged_user)
-
-            return Team.objects.filter(
-                club=club_to_admin,
-            ).all()
+        return Team.objects.for_user(self.request.user)
 
 
 class TeamsCreateView(AdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/team_create_form.html"
     form_class = TeamForm
     model = Team
+    list_view_class = TeamsListView
     modal_title = _("Team")
     club_select_label = _("Select Club")
 
@@ -1064,20 +1478,21 @@ class TeamsCreateView(AdminLoginRequiredMixin, DatatableCreateView):
             # make club_select field disabled and set the initial value to the club of the logged user
             form.fields["club"].initial = logged_user_club
             form.fields["club"].disabled = True
-            form.fields["members"].queryset = (Member.objects.filter(
-                membership__club=logged_user_club,
-                membership__transfer_date__isnull=True)
-                                               .prefetch_related("membership_set__club"))
+            form.fields["members"].queryset = (
+                Member.objects.for_user(logged_user).prefetch_related("membership_set__club")
+            )
 
         return form
 
 
 class TeamsDeleteView(AdminLoginRequiredMixin, DatatableDeleteView):
     model = Team
+    list_view_class = TeamsListView
 
 
 class TeamsUpdateView(AdminLoginRequiredMixin, DatatableUpdateView):
     model = Team
+    list_view_class = TeamsListView
     form_class = TeamForm
     modal_title = _("Update team")
     template_name = ADD_EDIT_TEMPLATE.format("team")
@@ -1135,10 +1550,9 @@ class TeamsUpdateView(AdminLoginRequiredMixin, DatatableUpdateView):
             # make club_select field disabled and set the initial value to the club of the logged user
             form.fields["club"].initial = logged_user_club
             form.fields["club"].disabled = True
-            form.fields["members"].queryset = (Member.objects.filter(
-                membership__club=logged_user_club,
-                membership__transfer_date__isnull=True)
-                                               .prefetch_related("membership_set__club"))
+            form.fields["members"].queryset = (
+                Member.objects.for_user(logged_user).prefetch_related("membership_set__club")
+            )
 
         return form
 
@@ -1152,24 +1566,19 @@ class CompetitionRegistrationsCardsView(AdminLoginRequiredMixin, CardTemplateVie
 
 class CompetitionRegistrationListView(AdminLoginRequiredMixin, DatatableListView):
     model = CompetitionRegistration
+    etag_models = [CompetitionRegistration, Competition, Discipline, Division, Team, Member, Club]
+    club_scoped = True
     template_name = "datatable/competition_registration.html"
 
     def get_queryset(self):
-        logged_user = self.request.user
-        if is_user_fstb_admin(logged_user):
-            return CompetitionRegistration.objects.all()
-        else:
-            club_to_admin = get_user_club(logged_user)
-
-            return CompetitionRegistration.objects.filter(
-                team__club=club_to_admin,
-            ).all()
+        return CompetitionRegistration.objects.for_user(self.request.user)
 
 
 class CompetitionRegistrationCreateView(AdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/competition_registration_create_form.html"
     form_class = CompetitionRegistrationForm
     model = CompetitionRegistration
+    list_view_class = CompetitionRegistrationListView
     modal_title = _("Subscribe team to competition")
 
     def form_valid(self, form):
@@ -1205,8 +1614,7 @@ class CompetitionRegistrationCreateView(AdminLoginRequiredMixin, DatatableCreate
                 status = "Draft"
 
         if division is not None:
-            year_rules = YearRule.objects.filter(division__year_rules__division=division)
-            errors = check_ages(year_rules, members)
+            errors = check_ages(division.year_rules.all(), members)
             if len(errors) > 0:
                 status = "Draft"
 
@@ -1233,9 +1641,7 @@ class CompetitionRegistrationCreateView(AdminLoginRequiredMixin, DatatableCreate
         logged_user = self.request.user
 
         if is_user_club_admin(logged_user):
-            logged_user_club = get_user_club(logged_user)
-            form.fields["team"].queryset = (Team.objects.filter(
-                club=logged_user_club)).all()
+            form.fields["team"].queryset = Team.objects.for_user(logged_user)
 
         return form
 
@@ -1243,16 +1649,16 @@ class CompetitionRegistrationCreateView(AdminLoginRequiredMixin, DatatableCreate
 class GetNotPassedRulesView(AdminLoginRequiredMixin, TemplateView):
     template_name = "datatable/structure/warning_box.html"
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         discipline_id = request.GET.get("discipline")
         division_id = request.GET.get("division")
         team_id = request.GET.get("team")
 
-        discipline = Discipline.objects.filter(pk=discipline_id).first()
-        division = Division.objects.filter(pk=division_id).first()
-        team = Team.objects.filter(pk=team_id).first()
+        discipline = await Discipline.objects.filter(pk=discipline_id).afirst()
+        division = await Division.objects.filter(pk=division_id).afirst()
+        team = await Team.objects.filter(pk=team_id).afirst()
 
-        members = Member.objects.filter(team=team)
+        members = [member async for member in Member.objects.filter(team=team)]
 
         rules = []
 
@@ -1265,7 +1671,7 @@ class GetNotPassedRulesView(AdminLoginRequiredMixin, TemplateView):
                 rules.append("max_error_message")
 
         if division is not None:
-            year_rules = YearRule.objects.filter(division__year_rules__division=division)
+            year_rules = [rule async for rule in division.year_rules.all()]
             errors = check_ages(year_rules, members)
 
             for error in errors:
@@ -1277,29 +1683,27 @@ class GetNotPassedRulesView(AdminLoginRequiredMixin, TemplateView):
         context["container_ccs_classes"] = "col-12"
         context["rules"] = rules
 
-        return render(
-            request,
-            self.template_name,
-            context,
-        )
+        return render_fragment(self.template_name, context)
 
 
 class LoadDisciplinesView(AdminLoginRequiredMixin, TemplateView):
     template_name = "datatable/structure/discipline_select_field.html"
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         competition_id = request.GET.get("competition")
 
         # if competition_id is empty, return no template
         if not competition_id:
             return HttpResponse()
 
-        competition = Competition.objects.filter(pk=competition_id).first()
-
         form = CompetitionRegistrationForm()
-        disciplines = Discipline.objects.filter(competition=competition).all()
+        disciplines = Discipline.objects.filter(
+            competition_id=competition_id, competition__in=Competition.objects.open()
+        )
         choices_list = [('', '---------')]
-        choices_list += [(discipline.id, discipline.name) for discipline in disciplines]
+        choices_list += [
+            (pk, name) async for pk, name in disciplines.values_list("id", "name")
+        ]
 
         form.fields["discipline"].choices = choices_list
         form.fields["discipline"].required = False
@@ -1308,35 +1712,33 @@ class LoadDisciplinesView(AdminLoginRequiredMixin, TemplateView):
         context["form"] = form
         context["container_ccs_classes"] = "col-12"
 
-        return render(
-            request,
-            self.template_name,
-            context,
-        )
+        return render_fragment(self.template_name, context)
 
 
 class LoadDivisionsView(AdminLoginRequiredMixin, TemplateView):
     template_name = "datatable/structure/division_select_field.html"
 
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         discipline_id = request.GET.get("discipline")
 
         # if discipline_id is empty, return no template
         if not discipline_id:
             return HttpResponse()
 
-        _discipline = Discipline.objects.filter(pk=discipline_id).first()
-        competition = Competition.objects.filter(pk=_discipline.competition_id).first()
+        _discipline = await Discipline.objects.filter(pk=discipline_id).afirst()
 
-        disciplines = Discipline.objects.filter(competition=competition).all()
+        disciplines = Discipline.objects.filter(competition_id=_discipline.competition_id)
         choices_list_discipline = [('', '---------')]
-        choices_list_discipline += [(discipline.id, discipline.name) for discipline in disciplines]
-        print("choices", choices_list_discipline)
+        choices_list_discipline += [
+            (pk, name) async for pk, name in disciplines.values_list("id", "name")
+        ]
 
         form = CompetitionRegistrationForm()
-        divisions = Division.objects.filter(discipline=_discipline).all()
+        divisions = Division.objects.filter(discipline=_discipline)
         choices_list = [('', '---------')]
-        choices_list += [(division.id, division.name) for division in divisions]
+        choices_list += [
+            (pk, name) async for pk, name in divisions.values_list("id", "name")
+        ]
 
         form.fields["discipline"].choices = choices_list_discipline
         form.fields["discipline"].required = False
@@ -1347,19 +1749,73 @@ class LoadDivisionsView(AdminLoginRequiredMixin, TemplateView):
         context["form"] = form
         context["container_ccs_classes"] = "col-12"
 
-        return render(
-            request,
-            self.template_name,
-            context,
+        return render_fragment(self.template_name, context)
+
+
+class CompetitionRegistrationBulkCreateView(AdminLoginRequiredMixin, FormView):
+    """Register several teams of the club to an open competition at once."""
+
+    template_name = "datatable/competition_registration_bulk_form.html"
+    result_template_name = "datatable/competition_registration_bulk_result.html"
+    form_class = BulkCompetitionRegistrationForm
+    modal_title = _("Register teams")
+
+    def get_competition(self):
+        if not hasattr(self, "_competition"):
+            self._competition = get_object_or_404(Competition.objects.open(), pk=self.kwargs["pk"])
+        return self._competition
+
+    def get_matrix(self):
+        # the rules of every cell are checked once, for the form and the registrations
+        if not hasattr(self, "_matrix"):
+            teams = Team.objects.for_user(self.request.user).order_by("name", "pk")
+            self._matrix = get_eligibility_matrix(self.get_competition(), teams)
+        return self._matrix
+
+    def get_form_kwargs(self):
+        kwargs = super().get_form_kwargs()
+        kwargs["matrix"] = self.get_matrix()
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["modal_title"] = self.modal_title
+        context["competition"] = self.get_competition()
+        context.update(self.get_matrix())
+        return context
+
+    def form_valid(self, form):
+        results = register_teams(
+            self.get_competition(),
+            self.get_matrix(),
+            form.cleaned_data["registrations"],
+            form.cleaned_data["status"],
         )
 
+        response = render(
+            self.request,
+            self.result_template_name,
+            {"modal_title": self.modal_title, "competition": self.get_competition(), "results": results},
+        )
+        response["HX-Trigger"] = json.dumps(
+            {
+                CHANGED_EVENT.format(CompetitionRegistration.__name__.lower()): None,
+                SHOW_MESSAGE: _("{count} registrations added").format(
+                    count=sum(1 for result in results if result["status"])
+                ),
+            }
+        )
+        return response
+
 
 class CompetitionRegistrationDeleteView(AdminLoginRequiredMixin, DatatableDeleteView):
     model = CompetitionRegistration
+    list_view_class = CompetitionRegistrationListView
 
 
 class CompetitionRegistrationUpdateView(AdminLoginRequiredMixin, DatatableUpdateView):
     model = CompetitionRegistration
+    list_view_class = CompetitionRegistrationListView
     form_class = CompetitionRegistrationForm
     modal_title = _("Update registration")
     template_name = ADD_EDIT_TEMPLATE.format("competition_registration")
@@ -1398,8 +1854,7 @@ class CompetitionRegistrationUpdateView(AdminLoginRequiredMixin, DatatableUpdate
                 status = "Draft"
 
         if registration.division is not None:
-            year_rules = YearRule.objects.filter(division__year_rules__division=registration.division)
-            errors = check_ages(year_rules, members)
+            errors = check_ages(registration.division.year_rules.all(), members)
             if len(errors) > 0:
                 status = "Draft"
 
@@ -1424,9 +1879,7 @@ class CompetitionRegistrationUpdateView(AdminLoginRequiredMixin, DatatableUpdate
         logged_user = self.request.user
 
         if is_user_club_admin(logged_user):
-            logged_user_club = get_user_club(logged_user)
-            form.fields["team"].queryset = (Team.objects.filter(
-                club=logged_user_club)).all()
+            form.fields["team"].queryset = Team.objects.for_user(logged_user)
 
         return form
 
@@ -1447,6 +1900,7 @@ class ValidCompetitionRegistrationsCardsView(AdminLoginRequiredMixin, CardTempla
 
 class ValidCompetitionRegistrationListView(AdminLoginRequiredMixin, DatatableListView):
     model = CompetitionRegistration
+    etag_models = [CompetitionRegistration, Competition, Team, Member, Club]
     template_name = "datatable/valid_competition_registration.html"
 
     def get_queryset(self):
@@ -1478,6 +1932,7 @@ class DivisionCardsView(FstbAdminLoginRequiredMixin, CardTemplateView):
 
 class DivisionListView(FstbAdminLoginRequiredMixin, DatatableListView):
     model = Division
+    etag_models = [Division, Discipline, Exam, YearRule]
     template_name = "datatable/rules.html"
 
 
@@ -1485,6 +1940,7 @@ class DivisionCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/rule_create_form.html"
     form_class = DivisionForm
     model = Division
+    list_view_class = DivisionListView
     modal_title = _("Add Division")
 
     def form_valid(self, form):
@@ -1519,10 +1975,12 @@ class DivisionCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
 
 class DivisionDeleteView(FstbAdminLoginRequiredMixin, DatatableDeleteView):
     model = Division
+    list_view_class = DivisionListView
 
 
 class DivisionUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
     model = Division
+    list_view_class = DivisionListView
     form_class = DivisionForm
     modal_title = _("Update division")
     template_name = ADD_EDIT_TEMPLATE.format("rule")
@@ -1575,6 +2033,7 @@ class YearRuleCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/year_rule_create_form.html"
     form_class = YearRuleForm
     model = YearRule
+    list_view_class = YearRulesListView
     modal_title = _("Rule")
 
     def form_valid(self, form):
@@ -1599,6 +2058,8 @@ class YearRuleCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
             option=form.cleaned_data["option"],
             condition=form.cleaned_data["condition"],
             value=form.cleaned_data["value"],
+            band_min=form.cleaned_data["band_min"],
+            band_max=form.cleaned_data["band_max"],
             description=form.cleaned_data["description"],
         )
 
@@ -1607,10 +2068,12 @@ class YearRuleCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
 
 class YearRuleDeleteView(FstbAdminLoginRequiredMixin, DatatableDeleteView):
     model = YearRule
+    list_view_class = YearRulesListView
 
 
 class YearRuleUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
     model = YearRule
+    list_view_class = YearRulesListView
     form_class = YearRuleForm
     modal_title = _("Update year rule")
     template_name = ADD_EDIT_TEMPLATE.format("year_rule")
@@ -1639,6 +2102,8 @@ class YearRuleUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
         rule.option = form.cleaned_data["option"]
         rule.condition = form.cleaned_data["condition"]
         rule.value = form.cleaned_data["value"]
+        rule.band_min = form.cleaned_data["band_min"]
+        rule.band_max = form.cleaned_data["band_max"]
         rule.description = form.cleaned_data["description"]
         rule.save()
 
@@ -1654,6 +2119,7 @@ class DisciplinesCardsView(FstbAdminLoginRequiredMixin, CardTemplateView):
 
 class DisciplinesListView(FstbAdminLoginRequiredMixin, DatatableListView):
     model = Discipline
+    etag_models = [Discipline, Competition]
     template_name = "datatable/disciplines.html"
 
 
@@ -1661,6 +2127,7 @@ class DisciplinesCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
     template_name = "datatable/disciplines_create_form.html"
     form_class = DisciplinesForm
     model = Discipline
+    list_view_class = DisciplinesListView
     modal_title = _("Add Disciplines")
 
     def form_valid(self, form):
@@ -1693,10 +2160,12 @@ class DisciplinesCreateView(FstbAdminLoginRequiredMixin, DatatableCreateView):
 
 class DisciplinesDeleteView(FstbAdminLoginRequiredMixin, DatatableDeleteView):
     model = Discipline
+    list_view_class = DisciplinesListView
 
 
 class DisciplinesUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
     model = Discipline
+    list_view_class = DisciplinesListView
     form_class = DisciplinesForm
     modal_title = _("Update disciplines")
     template_name = ADD_EDIT_TEMPLATE.format("disciplines")
@@ -1729,3 +2198,11 @@ class DisciplinesUpdateView(FstbAdminLoginRequiredMixin, DatatableUpdateView):
         disciplines.save()
 
         return disciplines
+
+
+# ----- Monitoring -------------------------------------------------------------
+class DatabaseMetricsView(FstbAdminLoginRequiredMixin, View):
+    """Connection metrics of the process serving the request."""
+
+    def get(self, request):
+        return JsonResponse(get_connection_metrics())
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",  # before any middleware reading the database
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",  # after SessionMiddleware and before CommonMiddleware
     "django.middleware.common.CommonMiddleware",
@@ -85,16 +86,63 @@ WSGI_APPLICATION = "gafst.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.mysql",
+        "ENGINE": "core.db.backends.mysql",
         "NAME": "fstbadmin$gafst",
         "USER": "fstbadmin",
         "PASSWORD": "ZYah-Fqhv-pfHF-vXSZ-draj-zmPg",
         "HOST": "fstbadmin.mysql.pythonanywhere-services.com",
         "PORT": "3306",
         "OPTIONS": {"init_command": "SET sql_mode='STRICT_TRANS_TABLES'"},
+        # keep the connection of each thread between requests, instead of paying
+        # the connection and init_command handshake every time, below the
+        # wait_timeout (300 seconds) of the MySQL server
+        "CONN_MAX_AGE": 240,
+        # ping a reused connection once per request, reconnect if it's broken
+        "CONN_HEALTH_CHECKS": True,
+        # to share a bounded set of connections between the threads of each
+        # process (e.g. under ASGI), return the connections to a pool at the
+        # end of every request instead:
+        # "CONN_MAX_AGE": 0,
+        # "POOL": {"MAX_SIZE": 4, "TIMEOUT": 10, "MAX_LIFETIME": 240},
     }
 }
 
+# Read replica
+# https://docs.djangoproject.com/en/4.2/topics/db/multi-db/
+
+# the reads of the read only requests go to the REPLICA_DATABASE_ALIAS database,
+# if configured, the primary is used for REPLICA_STICKY_SECONDS after a POST
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = 10
+
+# To read from a MySQL replica, add its alias to DATABASES:
+#     "replica": {**DATABASES["default"], "HOST": "<replica host>"},
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+# file based, to be shared between the worker processes
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "django_cache",
+    }
+}
+
+# Sessions and authentication
+# https://docs.djangoproject.com/en/4.2/topics/http/sessions/#using-cached-sessions
+
+# sessions read from the cache, written through to the database
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# users loaded from the cache with their groups, ModelBackend keeps the
+# sessions opened before CachedModelBackend valid
+AUTHENTICATION_BACKENDS = [
+    "core.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
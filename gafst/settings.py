@@ -26,7 +26,7 @@ SECRET_KEY = "django-insecure-6$87338wh6&5ovegh2=cbqwdwz-2h^2%msl!bxnevp&rw%=$on
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
- ALLOWED_HOSTS = ["192.168.1.45"]
+ALLOWED_HOSTS = ["192.168.1.45"]
 
 # Application definition
 
@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",  # before any middleware reading the database
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",  # after SessionMiddleware and before CommonMiddleware
     "django.middleware.common.CommonMiddleware",
@@ -102,6 +103,41 @@ DATABASES = {
 #     }
 # }
 
+# Read replica
+# https://docs.djangoproject.com/en/4.2/topics/db/multi-db/
+
+# the reads of the read only requests go to the REPLICA_DATABASE_ALIAS database,
+# if configured, the primary is used for REPLICA_STICKY_SECONDS after a POST
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+REPLICA_DATABASE_ALIAS = "replica"
+REPLICA_STICKY_SECONDS = 10
+
+# To try the replica locally, add a second SQLite alias to DATABASES holding a
+# copy of the database (cp mydatabase mydatabase_replica):
+#     "replica": {"ENGINE": "django.db.backends.sqlite3", "NAME": "mydatabase_replica"},
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+# Sessions and authentication
+# https://docs.djangoproject.com/en/4.2/topics/http/sessions/#using-cached-sessions
+
+# sessions read from the cache, written through to the database
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+# users loaded from the cache with their groups, ModelBackend keeps the
+# sessions opened before CachedModelBackend valid
+AUTHENTICATION_BACKENDS = [
+    "core.backends.CachedModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 